@@ -2,6 +2,15 @@ import pygame as pg
 import numpy as np
 import math
 import random
+import sys
+import time
+import multiprocessing
+import heapq
+import io
+import os
+import zlib
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 
 # Konstanten
 WIDTH, HEIGHT = 800, 600
@@ -21,9 +30,89 @@ ENEMY_BASE_SIZE_FACTOR = 2.0  # Grundgröße der Gegner relativ zur normalen Gr
 BULLET_MIN_SIZE = 10  # Garantierte Mindestgröße für Kugeln
 BULLET_BASE_SIZE_FACTOR = 1.5  # Grundgröße der Kugeln relativ zur normalen Größe
 BULLET_TRAIL_LENGTH = 8.0  # Länge des Schweifs hinter Kugeln (Multiplikator der Größe)
+ENEMY_SPRITE_SIZE_STEP = 4  # Gegnergrößen werden für den Sprite-Cache auf Vielfache davon gerundet
+ENEMY_GLOW_LEVELS = 4  # Anzahl vorgerenderter Stufen des pulsierenden Augen-Glows
+SPRITE_CACHE_MAX_BYTES = 32 * 1024 * 1024  # Speicherobergrenze des Sprite-Caches
 ROT_SPEED = 0.025  # Langsamere Drehung für präziseres Zielen
 INVERT_ANGLES = True  # WICHTIG: Diese Konstante sorgt dafür, dass alle Gegner korrekt bewegt werden
 
+# KONSTANTEN FÜR RAYCASTING
+# "scalar" = cast_ray() einzeln pro Spalte, "batch" = alle Spalten gleichzeitig mit NumPy,
+# "adaptive" = nur Stichproben mit cast_ray, Zwischenspalten analytisch auf gleicher Wandfläche,
+# "segments" = Schnitt mit zusammengefassten Wandflächen statt Rasterschritten (große, offene Karten)
+RAYCAST_ENGINE = "batch"
+MAX_RAY_STEPS = 500  # Maximale Anzahl von DDA-Schritten pro Strahl
+ADAPTIVE_RAY_STEP = 8  # "adaptive": nur jede N-te Spalte casten, dazwischen nur an Kanten verfeinern
+RAY_CACHE_ENABLED = True  # 360°-Strahlcache: reine Drehungen casten keine Strahlen neu
+STRIP_RENDER_WORKERS = 0  # >0: Wandspalten in Streifen auf so viele Prozesse verteilen (0 = aus)
+
+# KONSTANTEN FÜR DYNAMISCHE AUFLÖSUNG
+DYNAMIC_RESOLUTION = False  # 3D-Ansicht in adaptiver interner Auflösung rendern und hochskalieren
+DYNRES_TARGET_FPS = 60  # Ziel-Bildrate (z.B. 60 oder 144)
+DYNRES_MIN_SCALE = 0.5  # Kleinster Skalierungsfaktor der internen Auflösung
+DYNRES_MAX_SCALE = 1.0  # Größter Skalierungsfaktor der internen Auflösung
+DYNRES_ADJUST_INTERVAL = 10  # Anzahl Frames zwischen zwei Anpassungen
+
+# KONSTANTEN FÜR DIE SIMULATION
+# Alle Geschwindigkeiten, Timer und Cooldowns sind pro Tick bei SIM_REFERENCE_RATE angegeben
+# und werden bei anderen Tickraten entsprechend skaliert (Spielgeschwindigkeit bleibt gleich)
+SIM_REFERENCE_RATE = 60
+SIM_TICK_RATE = 60  # Simulationsschritte pro Sekunde (z.B. 30 für große Gegnermengen)
+MAX_FRAME_RATE = 60  # Obergrenze der Bildrate (0 = unbegrenzt, Simulation bleibt im festen Takt)
+MAX_SIM_STEPS_PER_FRAME = 5  # Mehr Rückstand wird verworfen (verhindert die "Todesspirale")
+
+# KONSTANTEN FÜR PFADSUCHE
+PATH_CACHE_SIZE = 256  # Maximale Anzahl zwischengespeicherter A*-Pfade
+PATH_SEARCH_BUDGET = 4  # Maximale Anzahl neuer A*-Suchen pro Tick
+PATH_MAX_EXPANSIONS = 4096  # Suche bricht danach ab (Ziel gilt als unerreichbar)
+WAYPOINT_REACHED_DISTANCE = 0.3  # Ab diesem Abstand gilt ein Wegpunkt als erreicht
+VISIBILITY_RADIUS = 16  # Sichtbarkeitsfeld: maximaler Abstand (in Zellen) um die Spielerzelle
+PVS_BUILD_WORKERS = 0  # Prozesse für den PVS-Aufbau beim Spielstart (0 = im Hauptprozess)
+PVS_ROWS_PER_TASK = 4  # Kartenzeilen pro Teilaufgabe beim parallelen PVS-Aufbau
+PVS_CELLS_PER_BATCH = 64  # Ursprungszellen, deren Sichtlinien gemeinsam verfolgt werden
+
+# KONSTANTEN FÜR DIE KI-DETAILSTUFEN
+# Verfolgende und nahe Gegner laufen jeden Tick, alle anderen seltener und im Zeitbudget
+AI_NEAR_DISTANCE = 8.0  # Gegner innerhalb dieses Abstands werden jeden Tick aktualisiert
+AI_FAR_DISTANCE = 20.0  # Ab diesem Abstand gilt die niedrigste Frequenz
+AI_IDLE_RATE = 10  # Aktualisierungen pro Sekunde für wartende Gegner
+AI_MOVING_RATE = 30  # ... für patrouillierende/fliehende Gegner in mittlerer Entfernung
+AI_FAR_RATE = 10  # ... für alle Gegner jenseits von AI_FAR_DISTANCE
+AI_TICK_BUDGET_MS = 2.0  # Zeitbudget pro Tick für die nicht zwingend fälligen Gegner
+AI_BATCH_SIZE = 256  # Gegner pro Teilschritt innerhalb des Budgets
+AI_MAX_CATCHUP = 12  # Höchstens so viele Referenz-Ticks werden nachgeholt (Rest verfällt)
+
+# KONSTANTEN FÜR PROJEKTILE
+BULLET_POOL_SIZE = 4096  # Maximale Anzahl gleichzeitiger Kugeln (danach wird die älteste ersetzt)
+BULLET_SPEED = 0.2  # Flugstrecke pro Referenz-Tick (beliebig groß, die Strecke wird durchgeprüft)
+BULLET_LIFETIME = 200  # Lebensdauer in Referenz-Ticks
+BULLET_HIT_FRAMES = 30  # So lange bleibt eine Kugel nach einem Treffer sichtbar
+BULLET_DAMAGE = 25  # Schaden pro Treffer
+BULLET_HIT_RADIUS = 0.5  # Trefferradius der Gegner
+BULLET_WALL_OFFSET = 0.05  # Abstand, mit dem eine Kugel vor der Wand stehen bleibt
+BULLET_SWEEP_SPACING = 1.0  # Abstand der Gitterabfragen entlang der Flugstrecke
+
+# KONSTANTEN FÜR GROSSE KARTEN
+# Abgeleitete Felder arbeiten nur in einem Fenster um den Spieler, damit der
+# Speicherbedarf nicht mit der Kartengröße wächst
+CHUNK_SIZE = 64  # Kantenlänge einer Kachel in Zellen (Zweierpotenz)
+CHUNK_CACHE_SIZE = 256  # Maximale Anzahl Kacheln im Speicher (256 x 4 KB = 1 MB)
+FLOW_FIELD_RADIUS = 40  # Flussfeld: Fenstergröße (in Zellen) um die Zielzelle
+MINIMAP_VIEW_CELLS = 40  # Die Minimap zeigt höchstens so viele Zellen um den Spieler
+SPAWN_SEARCH_RADIUS = 24  # Gegner erscheinen höchstens so weit vom Spieler entfernt
+MAP_CHANGE_LOG = 256  # So viele Einzeländerungen merkt sich die Karte für inkrementelle Updates
+
+# KONSTANTEN FÜR DAS ÜBERSPRINGEN LEERER BEREICHE
+# Ein Chebyshev-Distanzfeld gibt für jede freie Zelle an, wie weit das nächste
+# Hindernis mindestens entfernt ist - Strahlen springen so über leere Flächen
+RAY_SKIP_EMPTY = True  # Strahlen überspringen freie Bereiche mit dem Distanzfeld
+DISTANCE_FIELD_MAX = 16  # Distanzen werden hier gekappt (= größter Sprung in Zellen + 1)
+RAY_SKIP_MIN_DISTANCE = 3  # Erst ab diesem Feldwert springen (kurze Sprünge kosten mehr als sie sparen)
+
+# KONSTANTEN FÜR DEN SEGMENT-RENDERER (RAYCAST_ENGINE = "segments")
+WALL_SEGMENT_TILE = 64  # Wandflächen werden je Kachel dieser Kantenlänge zusammengefasst (Zweierpotenz)
+WALL_SEGMENT_CACHE = 256  # Maximale Anzahl Kacheln mit Wandflächen im Speicher
+
 # Spieler-Position und Blickrichtung
 player_x, player_y = 5, 5
 player_angle = 0
@@ -32,73 +121,973 @@ player_ammo = 50
 player_score = 0
 
 # Schussobjekte
-class Bullet:
-    def __init__(self, x, y, angle):
-        self.x = x
-        self.y = y
-        self.angle = angle
-        self.speed = 0.2
-        self.lifetime = 200  # DEUTLICH erhöhte Lebensdauer
-        self.active = True
-        self.hit_wall = False  # Flag für Wandkollision
-        self.hit_pos_x = 0  # Position der Wandkollision
-        self.hit_pos_y = 0
-        self.hit_frames = 30  # Frames, die die Kugel nach Wandtreffer noch sichtbar bleibt
-    
-    def update(self):
-        if not self.active:
-            return False
-        
-        # Wenn Kugel eine Wand getroffen hat, zeige sie noch für eine Weile
-        if self.hit_wall:
-            self.hit_frames -= 1
-            if self.hit_frames <= 0:
-                self.active = False
-                return False
-            return True  # Kugel bleibt aktiv, aber bewegt sich nicht mehr
-        
+class BulletPool:
+    """
+    Projektile in einem Pool fester Größe (Struct-of-Arrays).
+
+    Freie Slots liegen auf einem Stapel, ein Schuss belegt nur einen Slot statt
+    ein neues Objekt anzulegen. update() bewegt alle Kugeln eines Ticks in einem
+    Durchlauf und prüft die gesamte Flugstrecke (DDA gegen die Karte, Gitter
+    gegen die Gegner), so dass auch schnelle Kugeln nichts durchschlagen.
+    """
+
+    FIELDS = {
+        'x': np.float64, 'y': np.float64,
+        'prev_x': np.float64, 'prev_y': np.float64,
+        'dir_x': np.float64, 'dir_y': np.float64, 'angle': np.float64,
+        'speed': np.float64, 'lifetime': np.float64,
+        'hit_frames': np.float64,  # Ticks, die die Kugel nach einem Treffer noch sichtbar bleibt
+        'hit_wall': np.bool_,  # Getroffen (Wand oder Gegner) - Kugel steht still
+        'active': np.bool_,
+    }
+
+    def __init__(self, capacity=BULLET_POOL_SIZE):
+        for name, dtype in self.FIELDS.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+        self.free = list(range(capacity - 1, -1, -1))  # Stapel freier Slots
+
+    def clear(self):
+        """Verwirft alle Kugeln (z.B. beim Neustart)"""
+        self.active[:] = False
+        self.free = list(range(len(self.x) - 1, -1, -1))
+
+    def active_indices(self):
+        """Indizes aller aktiven Kugeln"""
+        return np.flatnonzero(self.active)
+
+    def spawn(self, x, y, angle, speed=BULLET_SPEED):
+        """Belegt einen Slot mit einer neuen Kugel und gibt seinen Index zurück"""
+        if self.free:
+            slot = self.free.pop()
+        else:
+            # Pool voll: Kugel mit der kürzesten Restlebensdauer ersetzen
+            # (getroffene Kugeln haben Lebensdauer 0 und kommen zuerst dran)
+            slot = int(np.argmin(self.lifetime))
+        self.x[slot] = self.prev_x[slot] = x
+        self.y[slot] = self.prev_y[slot] = y
+        self.angle[slot] = angle
+        self.dir_x[slot] = math.cos(angle)
+        self.dir_y[slot] = math.sin(angle)
+        self.speed[slot] = speed
+        self.lifetime[slot] = BULLET_LIFETIME
+        self.hit_frames[slot] = BULLET_HIT_FRAMES
+        self.hit_wall[slot] = False
+        self.active[slot] = True
+        return slot
+
+    def _release(self, idx):
+        """Gibt Slots an den Pool zurück"""
+        self.active[idx] = False
+        self.free.extend(idx.tolist())
+
+    def interpolated_positions(self, alpha):
+        """Zwischen vorherigem und aktuellem Tick überblendete Positionen aller Slots"""
+        return (self.prev_x + (self.x - self.prev_x) * alpha,
+                self.prev_y + (self.y - self.prev_y) * alpha)
+
+    def update(self, elapsed=1.0):
+        """Bewegt alle aktiven Kugeln um `elapsed` Referenz-Ticks weiter"""
+        idx = self.active_indices()
+        if len(idx) == 0:
+            return
+        self.prev_x[idx] = self.x[idx]
+        self.prev_y[idx] = self.y[idx]
+
+        # Getroffene Kugeln bleiben noch eine Weile sichtbar, bewegen sich aber nicht mehr
+        impacted = idx[self.hit_wall[idx]]
+        self.hit_frames[impacted] -= elapsed
+        self._release(impacted[self.hit_frames[impacted] <= 0])
+
         # Normale Lebensdauer verringern
-        self.lifetime -= 1
-        if self.lifetime <= 0:
-            self.active = False
+        flying = idx[~self.hit_wall[idx]]
+        self.lifetime[flying] -= elapsed
+        expired = self.lifetime[flying] <= 0
+        self._release(flying[expired])
+        flying = flying[~expired]
+        if len(flying) == 0:
+            return
+
+        x, y = self.x[flying], self.y[flying]
+        dir_x, dir_y = self.dir_x[flying], self.dir_y[flying]
+        travel = self.speed[flying] * elapsed
+
+        # Flugstrecke gegen die Karte und danach gegen die Gegner bis zur Wand prüfen
+        wall_dist, hit_wall = sweep_walls(x, y, dir_x, dir_y, travel)
+        target, enemy_dist = self._sweep_enemies(x, y, dir_x, dir_y, wall_dist)
+        hit_enemy = target >= 0
+        hit_wall &= ~hit_enemy
+
+        # Kugel bleibt knapp vor der Wand bzw. am Eintrittspunkt in den Gegner stehen
+        stop = np.where(hit_wall, np.maximum(wall_dist - BULLET_WALL_OFFSET, 0.0), travel)
+        stop = np.where(hit_enemy, enemy_dist, stop)
+        self.x[flying] = x + dir_x * stop
+        self.y[flying] = y + dir_y * stop
+
+        hit = flying[hit_wall | hit_enemy]
+        self.hit_wall[hit] = True
+        self.lifetime[hit] = 0
+
+        # Debug-Ausgabe nur bei seltenen Gelegenheiten (10% aller Wandtreffer)
+        for slot in flying[hit_wall].tolist():
+            if random.random() < 0.1:
+                print(f"Kugel trifft Wand bei ({self.x[slot]:.1f}, {self.y[slot]:.1f})")
+
+        if hit_enemy.any():
+            self._damage_enemies(target[hit_enemy])
+
+    def _sweep_enemies(self, x, y, dir_x, dir_y, length):
+        """
+        Erster Gegner entlang jeder Strecke (x, y) + t * dir, 0 <= t <= length.
+
+        Die Strecken werden in Abständen von BULLET_SWEEP_SPACING abgetastet und
+        die Stützpunkte im Gitter abgefragt, die Kandidaten dann exakt gegen die
+        Strecke geschnitten.
+
+        Rückgabe: (Slot des getroffenen Gegners oder -1, Abstand bis zum Eintritt)
+        """
+        target = np.full(len(x), -1, dtype=np.intp)
+        hit_dist = length.copy()
+        radius = BULLET_HIT_RADIUS
+
+        # Stützpunkte in der Mitte gleich langer Abschnitte jeder Strecke
+        counts = np.maximum(1, np.ceil(length / BULLET_SWEEP_SPACING)).astype(np.intp)
+        bullet = np.repeat(np.arange(len(x)), counts)
+        part = np.arange(len(bullet)) - np.repeat(np.cumsum(counts) - counts, counts)
+        t = np.minimum((part + 0.5) * BULLET_SWEEP_SPACING, length[bullet])
+        query_index, slots, _, _, _ = enemy_store.spatial_grid().query_pairs(
+            x[bullet] + dir_x[bullet] * t, y[bullet] + dir_y[bullet] * t,
+            BULLET_SWEEP_SPACING / 2 + radius)
+        if len(slots) == 0:
+            return target, hit_dist
+        keep = enemy_store.active[slots]
+        bullet, slots = bullet[query_index[keep]], slots[keep]
+
+        # Exakter Schnitt Strecke/Kreis: Eintrittspunkt entlang der Flugrichtung
+        offset_x = enemy_store.x[slots] - x[bullet]
+        offset_y = enemy_store.y[slots] - y[bullet]
+        along = offset_x * dir_x[bullet] + offset_y * dir_y[bullet]
+        half_chord_sq = radius * radius - (offset_x * offset_x + offset_y * offset_y - along * along)
+        half_chord = np.sqrt(np.maximum(half_chord_sq, 0.0))
+        crosses = ((half_chord_sq > 0) & (along + half_chord >= 0)
+                   & (along - half_chord <= length[bullet]))
+        bullet, slots = bullet[crosses], slots[crosses]
+        entry = np.maximum(along[crosses] - half_chord[crosses], 0.0)
+
+        # Pro Kugel der früheste Eintritt
+        order = np.lexsort((entry, bullet))
+        bullet, slots, entry = bullet[order], slots[order], entry[order]
+        first = np.ones(len(bullet), dtype=bool)
+        first[1:] = bullet[1:] != bullet[:-1]
+        target[bullet[first]] = slots[first]
+        hit_dist[bullet[first]] = entry[first]
+        return target, hit_dist
+
+    def _damage_enemies(self, slots):
+        """Verteilt den Schaden aller Treffer eines Ticks auf die Gegner"""
+        global player_score
+        hit_slots, hit_counts = np.unique(slots, return_counts=True)
+        enemy_store.health[hit_slots] -= BULLET_DAMAGE * hit_counts
+        for slot in hit_slots.tolist():
+            # Treffer-Meldung mit Namen des Gegners
+            name = enemy_store.names[slot]
+            print(f"{name} wurde getroffen! Verbleibende Gesundheit: {enemy_store.health[slot]}")
+            if enemy_store.health[slot] <= 0:
+                enemy_store.release(slot)
+                player_score += 100
+                # Todes-Meldung
+                print(f"{name} wurde besiegt!")
+
+
+class SpatialGrid:
+    """
+    Räumlicher Hash über die Kartenzellen für Radiusabfragen.
+
+    rebuild() sortiert alle Punkte nach dem Hash ihrer Gitterzelle (Counting
+    Sort), so dass jeder Eintrag der Hashtabelle ein zusammenhängender Bereich
+    in `order` ist. Die Tabelle hat etwa zwei Einträge pro Punkt, der Speicher
+    hängt also nur von der Anzahl der Punkte ab, nicht von der Kartengröße.
+    Abfragen prüfen nur die Zellen im Umkreis des Radius, der Aufwand hängt
+    von der lokalen Dichte ab statt von der Gesamtzahl der Punkte.
+    """
+
+    def __init__(self, cell_size=1.0):
+        self.cell_size = cell_size
+        self.mask = 0
+        self.ids = np.zeros(0, dtype=np.intp)
+        self.x = np.zeros(0)
+        self.y = np.zeros(0)
+        self.row = np.zeros(0, dtype=np.intp)
+        self.col = np.zeros(0, dtype=np.intp)
+        self.order = np.zeros(0, dtype=np.intp)
+        self.cell_start = np.zeros(1, dtype=np.intp)
+
+    def _cells(self, x, y):
+        """Gitterzeile und -spalte für Positionen"""
+        col = np.floor(np.asarray(x) / self.cell_size).astype(np.intp)
+        row = np.floor(np.asarray(y) / self.cell_size).astype(np.intp)
+        return row, col
+
+    def _bucket(self, row, col):
+        """Eintrag der Hashtabelle für Gitterzellen"""
+        return ((row * 73856093) ^ (col * 19349663)) & self.mask
+
+    def rebuild(self, x, y, ids):
+        """Baut die Tabelle für die Punkte (x, y) mit den Kennungen ids neu auf"""
+        self.ids = np.asarray(ids, dtype=np.intp)
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        size = 1 << max(4, (2 * len(self.ids)).bit_length())
+        self.mask = size - 1
+
+        self.row, self.col = self._cells(self.x, self.y)
+        bucket = self._bucket(self.row, self.col)
+        self.order = np.argsort(bucket, kind='stable')
+        counts = np.bincount(bucket, minlength=size)
+        self.cell_start = np.concatenate(([0], np.cumsum(counts)))
+
+    def query_pairs(self, qx, qy, radius):
+        """
+        Alle Paare (Abfragepunkt, Gitterpunkt) mit Abstand < radius.
+
+        Rückgabe: (query_index, ids, dx, dy, dist) als Arrays, wobei dx/dy
+        vom Abfragepunkt zum gefundenen Punkt zeigen
+        """
+        qx = np.atleast_1d(np.asarray(qx, dtype=np.float64))
+        qy = np.atleast_1d(np.asarray(qy, dtype=np.float64))
+        empty = np.zeros(0, dtype=np.intp)
+        if len(self.ids) == 0 or len(qx) == 0:
+            return empty, empty, np.zeros(0), np.zeros(0), np.zeros(0)
+
+        reach = int(math.ceil(radius / self.cell_size))
+        row, col = self._cells(qx, qy)
+        query_parts = []
+        member_parts = []
+        for off_row in range(-reach, reach + 1):
+            for off_col in range(-reach, reach + 1):
+                nrow = row + off_row
+                ncol = col + off_col
+                bucket = self._bucket(nrow, ncol)
+                start = self.cell_start[bucket]
+                counts = self.cell_start[bucket + 1] - start
+                total = int(counts.sum())
+                if total == 0:
+                    continue
+                # Für jeden Abfragepunkt alle Einträge seiner Nachbarzelle aufzählen
+                offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+                query = np.repeat(np.arange(len(qx)), counts)
+                member = self.order[np.repeat(start, counts) + offsets]
+                # Hash-Kollisionen: nur Punkte, die wirklich in dieser Nachbarzelle liegen
+                exact = (self.row[member] == nrow[query]) & (self.col[member] == ncol[query])
+                query_parts.append(query[exact])
+                member_parts.append(member[exact])
+        if not query_parts:
+            return empty, empty, np.zeros(0), np.zeros(0), np.zeros(0)
+
+        query_index = np.concatenate(query_parts)
+        member = np.concatenate(member_parts)
+        dx = self.x[member] - qx[query_index]
+        dy = self.y[member] - qy[query_index]
+        dist = np.hypot(dx, dy)
+        hit = dist < radius
+        return query_index[hit], self.ids[member[hit]], dx[hit], dy[hit], dist[hit]
+
+    def query(self, x, y, radius):
+        """Kennungen aller Punkte mit Abstand < radius um (x, y), aufsteigend sortiert"""
+        return np.sort(self.query_pairs(x, y, radius)[1])
+
+
+class FlowField:
+    """
+    Gemeinsames Flussfeld für alle verfolgenden Gegner.
+
+    Eine Breitensuche ab der Zelle des Spielers liefert die Schrittdistanz
+    jeder freien Zelle, daraus wird pro Zelle der Schritt zum Nachbarn mit der
+    kleinsten Distanz abgeleitet. Neu berechnet wird nur, wenn der Spieler
+    die Zelle wechselt oder sich game_map ändert - jeder Gegner liest seinen
+    nächsten Schritt dann in O(1) ab.
+
+    Betrachtet wird nur ein Fenster im Umkreis `radius` um die Zielzelle
+    (Ursprung row_lo/col_lo), damit Kosten und Speicher nicht mit der
+    Kartengröße wachsen. Gegner außerhalb laufen direkt auf das Ziel zu.
+    """
+
+    # (dy, dx) der acht Nachbarzellen
+    NEIGHBORS = ((-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1))
+    UNREACHABLE = np.iinfo(np.int32).max
+
+    def __init__(self, radius=FLOW_FIELD_RADIUS):
+        self.radius = radius
+        self.key = None
+        self.row_lo = 0  # Weltzelle der linken oberen Ecke des Fensters
+        self.col_lo = 0
+        self.distance = None  # Schrittdistanz zur Zielzelle, -1 = unerreichbar/Wand
+        self.step_dx = None   # Schritt zur nächsten Zelle pro Zelle (0, 0 = kein Schritt)
+        self.step_dy = None
+
+    def update(self, goal_x, goal_y):
+        """Berechnet das Feld neu, falls Zielzelle oder Karte sich geändert haben"""
+        rows, cols = game_map.shape
+        goal_col = min(cols - 1, max(0, int(goal_x)))
+        goal_row = min(rows - 1, max(0, int(goal_y)))
+        key = (goal_col, goal_row, game_map.version, game_map.shape)
+        if key == self.key:
             return False
-        
-        next_x = self.x + math.cos(self.angle) * self.speed
-        next_y = self.y + math.sin(self.angle) * self.speed
-        
-        # Kollision mit Wänden - Kugel bleibt an der Wand sichtbar
-        if game_map[int(next_y)][int(next_x)] > 0:
-            self.hit_wall = True
-            self.hit_pos_x = self.x  # Speichere die letzte Position vor dem Wandtreffer
-            self.hit_pos_y = self.y
-            # Debug-Ausgabe nur bei seltenen Gelegenheiten
-            if random.random() < 0.1:  # Nur 10% aller Treffer werden geloggt
-                print(f"Kugel trifft Wand bei ({self.x:.1f}, {self.y:.1f})")
-            return True  # Kugel bleibt aktiv
-        
-        # Kollision mit Gegnern
-        for enemy in enemies:
-            if enemy.active and math.sqrt((enemy.x - next_x)**2 + (enemy.y - next_y)**2) < 0.5:
-                enemy.health -= 25
-                # Treffer-Meldung mit Namen des Gegners
-                print(f"{enemy.name} wurde getroffen! Verbleibende Gesundheit: {enemy.health}")
-                
-                if enemy.health <= 0:
-                    enemy.active = False
-                    global player_score
-                    player_score += 100
-                    # Todes-Meldung
-                    print(f"{enemy.name} wurde besiegt!")
-                
-                # Kugel bleibt kurz sichtbar bei Treffer
-                self.hit_wall = True
-                self.hit_pos_x = self.x
-                self.hit_pos_y = self.y
-                return True
-        
-        self.x, self.y = next_x, next_y
+        self.key = key
+
+        # Fenster um die Zielzelle (außerhalb der Karte gilt als Wand)
+        self.row_lo = goal_row - self.radius
+        self.col_lo = goal_col - self.radius
+        rows = cols = 2 * self.radius + 1
+        free = game_map.window(self.row_lo, self.row_lo + rows, self.col_lo, self.col_lo + cols) == 0
+        goal_row = goal_col = self.radius
+
+        # BREITENSUCHE mit dünn besetzter Wellenfront auf dem flachen, mit Wand
+        # umrandeten Gitter (jeder Schritt kostet nur so viel wie die Front groß ist)
+        padded_cols = cols + 2
+        flat_free = np.pad(free, 1, constant_values=False).ravel()
+        flat_distance = np.full(flat_free.size, -1, dtype=np.int32)
+        offsets = np.array([-1, 1, -padded_cols, padded_cols])
+        if free[goal_row, goal_col]:
+            start = (goal_row + 1) * padded_cols + goal_col + 1
+            flat_distance[start] = 0
+            frontier = np.array([start])
+            steps = 0
+            while len(frontier):
+                steps += 1
+                candidates = (frontier[:, None] + offsets).ravel()
+                candidates = candidates[flat_free[candidates] & (flat_distance[candidates] < 0)]
+                frontier = np.unique(candidates)
+                flat_distance[frontier] = steps
+        distance = flat_distance.reshape(rows + 2, padded_cols)[1:-1, 1:-1]
+        self.distance = distance
+
+        # RICHTUNGSFELD: Nachbar mit kleinster Distanz (Diagonalen nur ohne Eckenschneiden)
+        reached = np.where(distance >= 0, distance, self.UNREACHABLE)
+        padded = np.pad(reached, 1, constant_values=self.UNREACHABLE)
+        free_padded = np.pad(free, 1, constant_values=False)
+        best = np.full((rows, cols), self.UNREACHABLE, dtype=np.int32)
+        best_dx = np.zeros((rows, cols), dtype=np.int8)
+        best_dy = np.zeros((rows, cols), dtype=np.int8)
+        for dy, dx in self.NEIGHBORS:
+            neighbor = padded[1+dy:1+dy+rows, 1+dx:1+dx+cols]
+            if dy and dx:
+                open_corner = (free_padded[1+dy:1+dy+rows, 1:1+cols] &
+                               free_padded[1:1+rows, 1+dx:1+dx+cols])
+                neighbor = np.where(open_corner, neighbor, self.UNREACHABLE)
+            better = neighbor < best
+            best = np.where(better, neighbor, best)
+            best_dx[better] = dx
+            best_dy[better] = dy
+
+        has_step = (distance > 0) & (best < distance)
+        self.step_dx = np.where(has_step, best_dx, 0).astype(np.int8)
+        self.step_dy = np.where(has_step, best_dy, 0).astype(np.int8)
         return True
 
+    def directions(self, x, y):
+        """
+        Einheitsvektoren von den Positionen (x, y) zur Mitte der jeweils
+        nächsten Zelle auf dem kürzesten Weg.
+
+        Rückgabe: (dir_x, dir_y, routed) - routed ist False in der Zielzelle,
+        in Zellen ohne Weg zum Ziel und außerhalb des Fensters (dort ist die
+        Richtung (0, 0))
+        """
+        rows, cols = self.distance.shape
+        col = np.asarray(x).astype(np.intp)
+        row = np.asarray(y).astype(np.intp)
+        local_col = col - self.col_lo
+        local_row = row - self.row_lo
+        inside = (local_col >= 0) & (local_col < cols) & (local_row >= 0) & (local_row < rows)
+        local_col = np.clip(local_col, 0, cols - 1)
+        local_row = np.clip(local_row, 0, rows - 1)
+        step_dx = np.where(inside, self.step_dx[local_row, local_col], 0)
+        step_dy = np.where(inside, self.step_dy[local_row, local_col], 0)
+        routed = (step_dx != 0) | (step_dy != 0)
+
+        dir_x = col + step_dx + 0.5 - x
+        dir_y = row + step_dy + 0.5 - y
+        length = np.hypot(dir_x, dir_y)
+        length[~routed | (length < 1e-9)] = 1.0
+        return np.where(routed, dir_x / length, 0.0), np.where(routed, dir_y / length, 0.0), routed
+
+
+class PathService:
+    """
+    A*-Pfadsuche auf dem Kartengitter mit LRU-Cache.
+
+    Pfade werden pro (Startzelle, Zielzelle) zwischengespeichert und bei
+    jeder Kartenänderung verworfen. Pro Tick sind nur `search_budget` neue
+    Suchen erlaubt - weitere Anfragen liefern None und werden im nächsten
+    Tick erneut gestellt, so verteilt sich ein Schwall von Anfragen.
+    """
+
+    # (dy, dx, Kosten) der acht Nachbarzellen
+    NEIGHBORS = ((-1, 0, 1.0), (1, 0, 1.0), (0, -1, 1.0), (0, 1, 1.0),
+                 (-1, -1, math.sqrt(2)), (-1, 1, math.sqrt(2)),
+                 (1, -1, math.sqrt(2)), (1, 1, math.sqrt(2)))
+
+    def __init__(self, max_entries=PATH_CACHE_SIZE, search_budget=PATH_SEARCH_BUDGET,
+                 max_expansions=PATH_MAX_EXPANSIONS):
+        self.max_entries = max_entries
+        self.search_budget = search_budget
+        self.max_expansions = max_expansions
+        self.cache = OrderedDict()
+        self.cache_version = None
+        self.searches_left = search_budget
+        self.hits = 0
+        self.misses = 0
+
+    def begin_tick(self):
+        """Setzt das Suchbudget für einen neuen Tick zurück"""
+        self.searches_left = self.search_budget
+
+    def find_path(self, start_x, start_y, goal_x, goal_y):
+        """
+        Pfad von der Zelle von (start_x, start_y) zur Zelle von (goal_x, goal_y).
+
+        Rückgabe:
+        - Liste von Zellen (col, row) inklusive Start- und Zielzelle
+        - [] wenn das Ziel nicht erreichbar ist
+        - None wenn das Suchbudget dieses Ticks aufgebraucht ist
+        """
+        if self.cache_version != game_map.version:
+            self.cache.clear()
+            self.cache_version = game_map.version
+
+        key = ((int(start_x), int(start_y)), (int(goal_x), int(goal_y)))
+        path = self.cache.get(key)
+        if path is not None:
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return path
+
+        if self.searches_left <= 0:
+            return None
+        self.searches_left -= 1
+        self.misses += 1
+
+        path = self._search(*key)
+        self.cache[key] = path
+        if len(self.cache) > self.max_entries:
+            self.cache.popitem(last=False)  # Am längsten nicht genutzter Eintrag
+        return path
+
+    def _search(self, start, goal):
+        """A* mit Oktil-Heuristik, Diagonalen nur ohne Eckenschneiden"""
+        rows, cols = game_map.shape
+
+        def free(col, row):
+            return 0 <= col < cols and 0 <= row < rows and game_map.cell(col, row) == 0
+
+        if not free(*start) or not free(*goal):
+            return []
+
+        def heuristic(cell):
+            dx = abs(cell[0] - goal[0])
+            dy = abs(cell[1] - goal[1])
+            return max(dx, dy) + (math.sqrt(2) - 1) * min(dx, dy)
+
+        open_heap = [(heuristic(start), 0.0, start)]
+        came_from = {start: None}
+        cost_so_far = {start: 0.0}
+        expansions = 0
+        while open_heap:
+            _, cost, cell = heapq.heappop(open_heap)
+            if cell == goal:
+                break
+            if cost > cost_so_far[cell]:
+                continue  # Veralteter Heap-Eintrag
+            expansions += 1
+            if expansions > self.max_expansions:
+                return []  # Zu weit entfernt - wie unerreichbar behandeln
+
+            col, row = cell
+            for dy, dx, step_cost in self.NEIGHBORS:
+                neighbor = (col + dx, row + dy)
+                if not free(*neighbor):
+                    continue
+                if dx and dy and not (free(col + dx, row) and free(col, row + dy)):
+                    continue
+                new_cost = cost + step_cost
+                if new_cost < cost_so_far.get(neighbor, math.inf):
+                    cost_so_far[neighbor] = new_cost
+                    came_from[neighbor] = cell
+                    heapq.heappush(open_heap, (new_cost + heuristic(neighbor), new_cost, neighbor))
+        else:
+            return []
+
+        # Pfad rückwärts vom Ziel zum Start zusammensetzen
+        path = []
+        cell = goal
+        while cell is not None:
+            path.append(cell)
+            cell = came_from[cell]
+        path.reverse()
+        return path
+
+
+# Gegnerzustände als kleine Integer (Index = Zustand im Struct-of-Arrays-Speicher)
+ENEMY_STATES = ("idle", "patrol", "chase", "retreat")
+STATE_IDLE, STATE_PATROL, STATE_CHASE, STATE_RETREAT = range(len(ENEMY_STATES))
+
+
+class EnemyStore:
+    """
+    Struct-of-Arrays-Speicher für alle Gegner.
+
+    Positionen, Ziele, Timer, Gesundheit und Zustände liegen in NumPy-Arrays,
+    damit update() alle Gegner eines Ticks in einem vektorisierten Durchlauf
+    weiterschalten kann. Enemy-Objekte sind nur noch Sichten auf einen Slot.
+    """
+
+    FIELDS = {
+        'x': np.float64, 'y': np.float64,
+        'prev_x': np.float64, 'prev_y': np.float64,
+        'target_x': np.float64, 'target_y': np.float64,
+        'speed': np.float64, 'min_attack_distance': np.float64,
+        'health': np.int32, 'attack_cooldown': np.float64, 'attack_damage': np.int32,
+        'state': np.int8, 'state_timer': np.float64, 'path_timer': np.float64,
+        'waypoint_x': np.float64, 'waypoint_y': np.float64,
+        'has_path': np.bool_, 'needs_path': np.bool_,
+        'ai_pending': np.float64,
+        'ai_step': np.float64,  # Dauer des letzten Updates in Referenz-Ticks (0 = noch keins)
+        'active': np.bool_,
+    }
+    SPATIAL_FIELDS = ('x', 'y', 'active')  # Änderungen daran machen das Gitter ungültig
+
+    # Verwaltung der Slots (überlebt die Freigabe, wird beim Belegen nicht zurückgesetzt)
+    REGISTRY_FIELDS = {
+        'generation': np.uint32,  # Wird bei jeder Freigabe erhöht, alte Sichten werden ungültig
+        'dense_index': np.intp,  # Position des Slots in `live`
+        'live': np.intp,  # Dicht gepackte Liste der belegten Slots (erste live_count Einträge)
+    }
+
+    def __init__(self, capacity=64):
+        self.count = 0  # Höchster je belegter Slot + 1
+        self.free = []  # Freigegebene Slots (Stapel), werden vor neuen Slots wiederverwendet
+        self.live_count = 0
+        self.live_enemies = []  # Enemy-Sichten parallel zu live[:live_count]
+        self.names = []
+        self.paths = []  # Verbleibende Wegpunkte pro Slot (letzter Eintrag = nächster)
+        self.rng = np.random.default_rng()
+        self.grid = SpatialGrid()
+        self.grid_dirty = True
+        for name, dtype in {**self.FIELDS, **self.REGISTRY_FIELDS}.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+    def allocate(self, view=None):
+        """Reserviert einen Slot (bevorzugt einen freigegebenen) und gibt seinen Index zurück"""
+        if self.free:
+            slot = self.free.pop()
+            self.names[slot] = ""
+            self.paths[slot] = []
+        else:
+            if self.count == len(self.x):
+                # Kapazität verdoppeln, bestehende Daten übernehmen
+                for name in (*self.FIELDS, *self.REGISTRY_FIELDS):
+                    old = getattr(self, name)
+                    grown = np.zeros(len(old) * 2, dtype=old.dtype)
+                    grown[:len(old)] = old
+                    setattr(self, name, grown)
+            slot = self.count
+            self.count += 1
+            self.names.append("")
+            self.paths.append([])
+        # Wiederverwendete Slots dürfen keine alten Werte behalten
+        for name in self.FIELDS:
+            getattr(self, name)[slot] = 0
+        self.active[slot] = True
+        self.dense_index[slot] = self.live_count
+        self.live[self.live_count] = slot
+        self.live_count += 1
+        self.live_enemies.append(view)
+        self.grid_dirty = True
+        return slot
+
+    def release(self, slots):
+        """Gibt Slots frei: aus der dichten Liste entfernen und zur Wiederverwendung vormerken"""
+        for slot in np.atleast_1d(slots).tolist():
+            if not self.active[slot]:
+                continue
+            # Letzten Eintrag der dichten Liste in die Lücke verschieben
+            last = self.live_count - 1
+            hole = self.dense_index[slot]
+            moved = self.live[last]
+            self.live[hole] = moved
+            self.dense_index[moved] = hole
+            self.live_enemies[hole] = self.live_enemies[last]
+            self.live_enemies.pop()
+            self.live_count = last
+
+            self.active[slot] = False
+            self.generation[slot] += 1
+            self.paths[slot] = []
+            self.free.append(slot)
+        self.grid_dirty = True
+
+    def is_alive(self, slot, generation):
+        """True, solange der Slot noch von derselben Belegung (Generation) gehalten wird"""
+        return bool(self.active[slot]) and self.generation[slot] == generation
+
+    def clear(self):
+        """Verwirft alle Gegner (z.B. beim Neustart)"""
+        self.generation[:self.count] += 1
+        self.count = 0
+        self.free = []
+        self.live_count = 0
+        self.live_enemies = []
+        self.names = []
+        self.paths = []
+        self.active[:] = False
+        self.grid_dirty = True
+
+    def active_indices(self):
+        """Slots aller aktiven Gegner (dicht gepackt, in der Reihenfolge von live_enemies)"""
+        return self.live[:self.live_count].copy()
+
+    def interpolated_positions(self, alpha, tick_elapsed=1.0):
+        """
+        Überblendete Positionen aller Slots. Jeder Gegner wird über die Dauer
+        seines letzten Updates (ai_step) von prev nach x geführt, seltener
+        aktualisierte Gegner (AIScheduler) laufen also gleichmäßig statt in
+        Sprüngen. ai_pending ist die seitdem vergangene Zeit, alpha der
+        Bruchteil des laufenden Ticks (tick_elapsed Referenz-Ticks).
+        """
+        since = self.ai_pending + alpha * tick_elapsed
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.where(self.ai_step > 0, np.minimum(since / self.ai_step, 1.0), 1.0)
+        return (self.prev_x + (self.x - self.prev_x) * fraction,
+                self.prev_y + (self.y - self.prev_y) * fraction)
+
+    def spatial_grid(self):
+        """Gitter über alle aktiven Gegner, bei Bedarf neu aufgebaut"""
+        if self.grid_dirty:
+            idx = self.active_indices()
+            self.grid.rebuild(self.x[idx], self.y[idx], idx)
+            self.grid_dirty = False
+        return self.grid
+
+    def neighbors(self, x, y, radius):
+        """Slots aller aktiven Gegner mit Abstand < radius um (x, y), aufsteigend sortiert"""
+        slots = self.spatial_grid().query(x, y, radius)
+        return slots[self.active[slots]]
+
+    def _random_targets(self, idx, min_dist, max_dist):
+        """Wählt zufällige Ziele in der Nähe und begrenzt sie auf die Karte"""
+        angle = self.rng.uniform(0, 2 * math.pi, len(idx))
+        distance = self.rng.uniform(min_dist, max_dist, len(idx))
+        self.target_x[idx] = np.clip(self.x[idx] + np.cos(angle) * distance, 1.0, MAP_SIZE-2.0)
+        self.target_y[idx] = np.clip(self.y[idx] + np.sin(angle) * distance, 1.0, MAP_SIZE-2.0)
+        self.retarget(idx)
+
+    def retarget(self, idx):
+        """Verwirft die Wegpunkte nach einem Zielwechsel, der Pfad wird neu angefragt"""
+        self.has_path[idx] = False
+        self.needs_path[idx] = True
+
+    def _plan_paths(self, idx):
+        """Fragt Pfade für Gegner mit neuem Ziel beim PathService an (im Rahmen des Budgets)"""
+        for i in idx[self.needs_path[idx]].tolist():
+            path = path_service.find_path(self.x[i], self.y[i], self.target_x[i], self.target_y[i])
+            if path is None:
+                continue  # Budget erschöpft - im nächsten Tick erneut, bis dahin direkt laufen
+            self.needs_path[i] = False
+            if not path:
+                # Ziel unerreichbar: Ziel auf den Standort setzen, damit sofort neu gewählt wird
+                self.target_x[i] = self.x[i]
+                self.target_y[i] = self.y[i]
+                continue
+            # Startzelle überspringen, Wegpunkte rückwärts für billiges pop()
+            self.paths[i] = path[:0:-1]
+            self.has_path[i] = True
+            self._advance_waypoint(i)
+
+    def _advance_waypoint(self, i):
+        """Nächsten Wegpunkt setzen: Zellmitte, in der Zielzelle das Ziel selbst"""
+        path = self.paths[i]
+        if len(path) > 1:
+            col, row = path.pop()
+            self.waypoint_x[i] = col + 0.5
+            self.waypoint_y[i] = row + 0.5
+        else:
+            path.clear()
+            self.waypoint_x[i] = self.target_x[i]
+            self.waypoint_y[i] = self.target_y[i]
+
+    def _randint(self, idx, low, high):
+        """Zufällige Ganzzahlen im Bereich [low, high] wie random.randint"""
+        return self.rng.integers(low, high + 1, len(idx))
+
+    def update(self, origin_x, origin_y, indices=None, elapsed=1.0):
+        """
+        Schaltet die angegebenen Gegner (Standard: alle aktiven) um einen Tick weiter.
+
+        Entspricht dem bisherigen Verhalten von Enemy.update (Zustandswechsel
+        idle/patrol/chase/retreat, Bewegung mit Ausweichen und Wandgleiten,
+        Angriff), nur für alle Gegner gleichzeitig. Alle Gegner sehen dabei
+        die Positionen vom Anfang des Ticks.
+
+        `elapsed` ist die vergangene Zeit in Referenz-Ticks (SIM_REFERENCE_RATE),
+        als Skalar oder als Array passend zu `indices`.
+
+        Rückgabe: Schaden, den der Spieler in diesem Tick erleidet
+        """
+        if indices is None:
+            idx = self.active_indices()
+            elapsed = np.broadcast_to(np.asarray(elapsed, dtype=np.float64), idx.shape)
+        else:
+            idx = np.asarray(indices, dtype=np.intp)
+            elapsed = np.broadcast_to(np.asarray(elapsed, dtype=np.float64), idx.shape)
+            alive = self.active[idx]
+            idx = idx[alive]
+            elapsed = elapsed[alive]
+        if len(idx) == 0:
+            return 0
+
+        # Ausgangspunkt der Render-Interpolation (siehe interpolated_positions)
+        self.prev_x[idx] = self.x[idx]
+        self.prev_y[idx] = self.y[idx]
+        self.ai_step[idx] = elapsed
+
+        x = self.x[idx]
+        y = self.y[idx]
+        state = self.state[idx]
+
+        # Abstand zum Spieler berechnen
+        dx = origin_x - x
+        dy = origin_y - y
+        dist_to_player = np.hypot(dx, dy)
+
+        # Wahrnehmung: Spieler nur entdecken, wenn die Sichtlinie frei ist (Lookup im Sichtfeld)
+        visibility_field.update(origin_x, origin_y)
+        sees_player = visibility_field.lookup(x, y)
+
+        # Timer für Zustandswechsel aktualisieren
+        self.state_timer[idx] -= elapsed
+        self.path_timer[idx] -= elapsed
+
+        # ZUSTANDSBASIERTE KI-LOGIK (Masken beziehen sich auf den alten Zustand)
+        switching = self.state_timer[idx] <= 0
+        roll = self.rng.random(len(idx))
+        new_state = state.copy()
+
+        # Idle: Spieler in der Nähe -> verfolgen, sonst kurze Patrouille
+        idle = switching & (state == STATE_IDLE)
+        to_chase = idle & (dist_to_player < 5.0) & sees_player
+        to_patrol = idle & ~to_chase
+        new_state[to_chase] = STATE_CHASE
+        self.path_timer[idx[to_chase]] = self._randint(idx[to_chase], 180, 300)
+        new_state[to_patrol] = STATE_PATROL
+        self.path_timer[idx[to_patrol]] = self._randint(idx[to_patrol], 120, 240)
+        self._random_targets(idx[to_patrol], 2.0, 4.0)
+
+        # Patrouille: Spieler gesichtet -> verfolgen, sonst kurze Pause
+        patrol = switching & (state == STATE_PATROL)
+        spotted = patrol & (dist_to_player < 4.0) & sees_player
+        new_state[spotted] = STATE_CHASE
+        self.path_timer[idx[spotted]] = self._randint(idx[spotted], 180, 300)
+        new_state[patrol & ~spotted] = STATE_IDLE
+        for i in idx[spotted].tolist():
+            print(f"Gegner '{self.names[i]}' bei ({self.x[i]:.1f}, {self.y[i]:.1f}) hat Spieler entdeckt")
+
+        # Verfolgung: Spieler zu weit weg -> meist Rückzug, sehr nah -> manchmal taktischer Rückzug
+        chase = switching & (state == STATE_CHASE)
+        too_far = chase & (dist_to_player > 8.0)
+        too_close = chase & ~too_far & (dist_to_player < 1.0)
+        rest = too_far & (roll < 0.7)
+        keep_chasing = too_far & ~rest
+        flee = too_close & (roll < 0.3)
+        new_state[rest | flee] = STATE_RETREAT
+        self.path_timer[idx[rest]] = self._randint(idx[rest], 60, 120)
+        self.target_x[idx[rest]] = x[rest]  # Ziel ist aktueller Standort (Ausruhen)
+        self.target_y[idx[rest]] = y[rest]
+        self.retarget(idx[rest])
+        self.path_timer[idx[keep_chasing]] = self._randint(idx[keep_chasing], 120, 180)
+        self.path_timer[idx[flee]] = self._randint(idx[flee], 30, 60)
+        retreat_dist = self.rng.uniform(1.5, 3.0, int(flee.sum()))
+        retreat_angle = np.arctan2(-dy[flee], -dx[flee])
+        self.target_x[idx[flee]] = np.clip(x[flee] + np.cos(retreat_angle) * retreat_dist, 1.0, MAP_SIZE-2.0)
+        self.target_y[idx[flee]] = np.clip(y[flee] + np.sin(retreat_angle) * retreat_dist, 1.0, MAP_SIZE-2.0)
+        self.retarget(idx[flee])
+        continue_chase = chase & ~too_far & ~too_close
+        self.path_timer[idx[continue_chase]] = self._randint(idx[continue_chase], 120, 240)
+
+        # Rückzug: danach immer Idle
+        new_state[switching & (state == STATE_RETREAT)] = STATE_IDLE
+
+        # Timer zurücksetzen (3-5 Sekunden)
+        self.state_timer[idx[switching]] = self._randint(idx[switching], 180, 300)
+        state = new_state
+        self.state[idx] = state
+
+        # BEWEGUNGSBERECHNUNG basierend auf aktuellem Zustand
+        move_dir_x = np.zeros(len(idx))
+        move_dir_y = np.zeros(len(idx))
+        speed = self.speed[idx]
+        move_speed = np.zeros(len(idx))
+
+        # Idle: minimale zufällige Bewegung, sehr langsam
+        idle = state == STATE_IDLE
+        move_dir_x[idle] = self.rng.uniform(-0.1, 0.1, int(idle.sum()))
+        move_dir_y[idle] = self.rng.uniform(-0.1, 0.1, int(idle.sum()))
+        move_speed[idle] = speed[idle] * 0.2
+
+        # Patrouille und Rückzug: über zwischengespeicherte Wegpunkte zum Ziel bewegen
+        towards_target = (state == STATE_PATROL) | (state == STATE_RETREAT)
+        self._plan_paths(idx[towards_target])
+        target_dx = self.target_x[idx] - x
+        target_dy = self.target_y[idx] - y
+        target_dist = np.hypot(target_dx, target_dy)
+        arrived = towards_target & (target_dist < 0.2)
+        walking = towards_target & ~arrived
+
+        # Erreichte Wegpunkte weiterschalten (nur die wenigen betroffenen Gegner)
+        following = walking & self.has_path[idx]
+        waypoint_dist = np.hypot(self.waypoint_x[idx] - x, self.waypoint_y[idx] - y)
+        for i in idx[following & (waypoint_dist < WAYPOINT_REACHED_DISTANCE)].tolist():
+            self._advance_waypoint(i)
+
+        # Ohne Pfad (noch nicht berechnet) direkt auf das Ziel zu
+        steer_dx = np.where(following, self.waypoint_x[idx] - x, target_dx)
+        steer_dy = np.where(following, self.waypoint_y[idx] - y, target_dy)
+        steer_dist = np.hypot(steer_dx, steer_dy)
+        steering = walking & (steer_dist > 1e-9)
+        move_dir_x[steering] = steer_dx[steering] / steer_dist[steering]
+        move_dir_y[steering] = steer_dy[steering] / steer_dist[steering]
+
+        patrol = state == STATE_PATROL
+        move_speed[patrol] = speed[patrol] * 1.0
+        patrol_arrived = arrived & patrol
+        if patrol_arrived.any():
+            # Ziel erreicht: neues Patrouillenziel, kürzere Timer für häufigere Aktionen
+            self._random_targets(idx[patrol_arrived], 1.5, 3.0)
+            self.path_timer[idx[patrol_arrived]] = self._randint(idx[patrol_arrived], 90, 180)
+            self.state_timer[idx[patrol_arrived]] = self._randint(idx[patrol_arrived], 60, 120)
+
+        retreat = state == STATE_RETREAT
+        move_speed[retreat] = speed[retreat] * 1.2
+        self.path_timer[idx[arrived & retreat]] = 0  # Erzwingt Zustandswechsel
+
+        # Verfolgung: entlang des Flussfelds um Hindernisse herum, Tempo je nach Entfernung
+        # (Richtung mit dem Spielerabstand gewichtet wie der bisherige direkte Vektor,
+        # in der Zielzelle oder ohne Weg direkt zum Spieler)
+        chase = state == STATE_CHASE
+        if chase.any():
+            flow_field.update(origin_x, origin_y)
+            flow_x, flow_y, routed = flow_field.directions(x[chase], y[chase])
+            move_dir_x[chase] = np.where(routed, flow_x * dist_to_player[chase], dx[chase])
+            move_dir_y[chase] = np.where(routed, flow_y * dist_to_player[chase], dy[chase])
+        chase_factor = np.where(dist_to_player > 6, 2.0, np.where(dist_to_player < 1.5, 0.8, 1.5))
+        move_speed[chase] = speed[chase] * chase_factor[chase]
+
+        # KOLLISIONSVERMEIDUNG zwischen Gegnern
+        avoid_x, avoid_y = self._separation(idx, x, y)
+        move_dir_x -= avoid_x
+        move_dir_y -= avoid_y
+
+        # BEWEGUNGSANWENDUNG: Normalisieren, leichte Zufallsbewegung, renormalisieren
+        move_length = np.hypot(move_dir_x, move_dir_y)
+        moving = np.flatnonzero(move_length > 0.0001)
+        if len(moving):
+            dir_x = move_dir_x[moving] / move_length[moving]
+            dir_y = move_dir_y[moving] / move_length[moving]
+            jitter = 0.1  # Kleiner Zufallsfaktor
+            dir_x += self.rng.uniform(-jitter, jitter, len(moving))
+            dir_y += self.rng.uniform(-jitter, jitter, len(moving))
+            jitter_length = np.hypot(dir_x, dir_y)
+            renorm = jitter_length > 0.0001
+            dir_x[renorm] /= jitter_length[renorm]
+            dir_y[renorm] /= jitter_length[renorm]
+
+            # Garantierte Mindestgeschwindigkeit
+            step = np.maximum(move_speed[moving], 0.02) * elapsed[moving]
+            self._move(idx[moving], x[moving], y[moving],
+                       x[moving] + dir_x * step, y[moving] + dir_y * step, state[moving])
+
+        # SPIELER-INTERAKTION (Angriff) nur im Verfolgungs-Modus, nah am Spieler und ohne Cooldown
+        cooldown = self.attack_cooldown[idx]
+        attacking = chase & (dist_to_player < self.min_attack_distance[idx]) & (cooldown <= 0)
+        damage = int(self.attack_damage[idx[attacking]].sum())
+        self.attack_cooldown[idx[attacking]] = 60  # 1 Sekunde zwischen Angriffen
+        for i in idx[attacking].tolist():
+            if random.random() < 0.1:  # 10% der Angriffe werden geloggt
+                print(f"Gegner '{self.names[i]}' greift an! Schaden: {self.attack_damage[i]}, "
+                      f"Spieler hat noch {player_health - damage} Leben")
+
+        # Cooldown-Timer aktualisieren
+        self.attack_cooldown[idx] = np.maximum(self.attack_cooldown[idx] - elapsed, 0)
+        return damage
+
+    def _separation(self, idx, x, y):
+        """Summe der Abstoßungsvektoren aller aktiven Nachbarn im Radius 1.2"""
+        query_index, others, other_dx, other_dy, other_dist = self.spatial_grid().query_pairs(x, y, 1.2)
+
+        # Sich selbst (und deckungsgleiche Gegner ohne Richtung) ausnehmen
+        keep = (others != idx[query_index]) & (other_dist > 0) & self.active[others]
+        query_index, other_dx, other_dy, other_dist = (
+            a[keep] for a in (query_index, other_dx, other_dy, other_dist))
+
+        # Stärkeres Ausweichen für natürlichere Gruppenbewegung
+        strength = (1.2 - other_dist) * 1.5 / other_dist
+        avoid_x = np.bincount(query_index, weights=other_dx * strength, minlength=len(idx))
+        avoid_y = np.bincount(query_index, weights=other_dy * strength, minlength=len(idx))
+        return avoid_x, avoid_y
+
+    def _move(self, idx, x, y, next_x, next_y, state):
+        """Kollisionsprüfung mit Karte und Grenzen, getrennt für Y und X (Gleiten an Wänden)"""
+        inside = (1 < next_x) & (next_x < MAP_SIZE-2) & (1 < next_y) & (next_y < MAP_SIZE-2)
+
+        # Außerhalb der Karte: Patrouille und Rückzug suchen ein neues Ziel
+        outside = ~inside & ((state == STATE_PATROL) | (state == STATE_RETREAT))
+        self.path_timer[idx[outside]] = 0
+
+        idx, x, y, next_x, next_y, state = (a[inside] for a in (idx, x, y, next_x, next_y, state))
+        if len(idx) == 0:
+            return
+
+        # Prüfe Y-Bewegung, bei Kollision nur einen kleinen Korrekturschritt
+        cell_x = x.astype(np.intp)
+        cell_y = y.astype(np.intp)
+        free_y = game_map.gather(next_y.astype(np.intp), cell_x) == 0
+        nudge_down = ~free_y & (next_y > y) & (game_map.gather(np.minimum(cell_y + 1, MAP_SIZE-1), cell_x) == 0)
+        nudge_up = ~free_y & ~nudge_down & (next_y < y) & (game_map.gather(np.maximum(cell_y - 1, 0), cell_x) == 0)
+        y = np.where(free_y, next_y, y + 0.1 * nudge_down - 0.1 * nudge_up)
+
+        # Prüfe X-Bewegung mit der bereits aktualisierten Y-Position
+        cell_y = y.astype(np.intp)
+        free_x = game_map.gather(cell_y, next_x.astype(np.intp)) == 0
+        nudge_right = ~free_x & (next_x > x) & (game_map.gather(cell_y, np.minimum(cell_x + 1, MAP_SIZE-1)) == 0)
+        nudge_left = ~free_x & ~nudge_right & (next_x < x) & (game_map.gather(cell_y, np.maximum(cell_x - 1, 0)) == 0)
+        x = np.where(free_x, next_x, x + 0.1 * nudge_right - 0.1 * nudge_left)
+
+        self.x[idx] = x
+        self.y[idx] = y
+        self.grid_dirty = True
+
+        # Bei Kollision neues Ziel suchen im Patrouillen-Modus
+        blocked = ((x != next_x) | (y != next_y)) & (state == STATE_PATROL)
+        self.path_timer[idx[blocked]] = 0
+
+
+def _enemy_field(name):
+    """Property, die ein Feld des Gegners im EnemyStore liest und schreibt"""
+    def getter(self):
+        return getattr(enemy_store, name)[self.slot].item()
+
+    def setter(self, value):
+        getattr(enemy_store, name)[self.slot] = value
+        if name in EnemyStore.SPATIAL_FIELDS:
+            enemy_store.grid_dirty = True
+        if name in ('x', 'y'):
+            # Direkt gesetzte Positionen springen (keine Interpolation)
+            getattr(enemy_store, 'prev_' + name)[self.slot] = value
+        if name in ('target_x', 'target_y'):
+            enemy_store.retarget(self.slot)
+
+    return property(getter, setter)
+
+
 # Gegner
 class Enemy:
     # Liste der möglichen Namen für Gegner
@@ -109,13 +1098,54 @@ class Enemy:
         "Banshee", "Ghast", "Doom", "Phantom", "Torment", "Agony", "Sorrow",
         "Horror", "Dread", "Nachtmahr", "Geist", "Schatten", "Wüterich", "Berserker"
     ]
+
+    # Simulationszustand liegt im EnemyStore, das Objekt ist nur eine Sicht auf seinen Slot
+    x = _enemy_field('x')
+    y = _enemy_field('y')
+    target_x = _enemy_field('target_x')
+    target_y = _enemy_field('target_y')
+    speed = _enemy_field('speed')
+    health = _enemy_field('health')
+    attack_cooldown = _enemy_field('attack_cooldown')
+    attack_damage = _enemy_field('attack_damage')
+    min_attack_distance = _enemy_field('min_attack_distance')
+    state_timer = _enemy_field('state_timer')
+    path_timer = _enemy_field('path_timer')
+
+    @property
+    def name(self):
+        return enemy_store.names[self.slot]
+
+    @name.setter
+    def name(self, value):
+        enemy_store.names[self.slot] = value
+
+    @property
+    def active(self):
+        # Die Sicht ist ein Handle (Slot + Generation): nach der Freigabe ungültig,
+        # auch wenn der Slot inzwischen von einem neuen Gegner belegt ist
+        return enemy_store.is_alive(self.slot, self.generation)
+
+    @active.setter
+    def active(self, value):
+        if not value and self.active:
+            enemy_store.release(self.slot)
+
+    @property
+    def movement_state(self):
+        return ENEMY_STATES[enemy_store.state[self.slot]]
+
+    @movement_state.setter
+    def movement_state(self, value):
+        enemy_store.state[self.slot] = ENEMY_STATES.index(value)
     
     def __init__(self, x, y):
+        self.slot = enemy_store.allocate(self)
+        self.generation = int(enemy_store.generation[self.slot])
         self.x = x
         self.y = y
         self.speed = 0.02  # Höhere Geschwindigkeit für bessere Sichtbarkeit der Bewegung
         self.health = 50
-        self.active = True
         self.attack_cooldown = 180  # 3 Sekunden Cooldown zu Beginn
         self.attack_damage = 3  # Noch weniger Schaden
         self.min_attack_distance = 1.0  # Muss noch näher sein für Angriff
@@ -153,315 +1183,831 @@ class Enemy:
         print(f"Neuer Gegner '{self.name}' bei ({self.x:.1f}, {self.y:.1f})")
     
     def update(self):
-        if not self.active:
-            return
-            
-        # Abstand zum Spieler berechnen
-        dx = player_x - self.x
-        dy = player_y - self.y
-        dist_to_player = math.sqrt(dx*dx + dy*dy)
-        
-        # Timer für Zustandswechsel aktualisieren
-        self.state_timer -= 1
-        self.path_timer -= 1
-        
-        # ZUSTANDSBASIERTE KI-LOGIK
-        # Zustandswechsel basierend auf Timer oder Spielerabstand
-        if self.state_timer <= 0:
-            # Zeit für einen möglichen Zustandswechsel
-            if self.movement_state == "idle":
-                # Nach Idle entweder patrouillieren oder verfolgen
-                if dist_to_player < 5.0:  # Spieler in der Nähe, direkt verfolgen
-                    self.movement_state = "chase"
-                    self.path_timer = random.randint(180, 300)  # Längere Verfolgung
-                else:
-                    # Beginne zufällige Patrouille
-                    self.movement_state = "patrol"
-                    self.path_timer = random.randint(120, 240)
-                    # Wähle zufälligen Patrouillienpunkt in der Nähe
-                    angle = random.uniform(0, 2 * math.pi)
-                    distance = random.uniform(2.0, 4.0)  # Kurze Patrouillendistanz
-                    self.target_x = self.x + math.cos(angle) * distance
-                    self.target_y = self.y + math.sin(angle) * distance
-                    # Stelle sicher, dass der Zielpunkt innerhalb der Karte liegt
-                    self.target_x = max(1.0, min(MAP_SIZE-2.0, self.target_x))
-                    self.target_y = max(1.0, min(MAP_SIZE-2.0, self.target_y))
-                    
-            elif self.movement_state == "patrol":
-                # Nach Patrouille entweder zurück zu Idle oder verfolgen
-                if dist_to_player < 4.0:  # Spieler gesichtet
-                    self.movement_state = "chase"
-                    self.path_timer = random.randint(180, 300)
-                    print(f"Gegner '{self.name}' bei ({self.x:.1f}, {self.y:.1f}) hat Spieler entdeckt")
-                else:
-                    # Zurück zu Idle für kurze Pause
-                    self.movement_state = "idle"
-                    self.state_timer = random.randint(60, 120)  # Kurze Pause
-                    
-            elif self.movement_state == "chase":
-                # Nach Verfolgung entweder zurückziehen oder weiter verfolgen
-                if dist_to_player > 8.0:  # Spieler zu weit weg, verliert Interesse
-                    if random.random() < 0.7:  # 70% Chance auf Rückzug
-                        self.movement_state = "retreat"
-                        self.path_timer = random.randint(60, 120)
-                        # Ziel ist aktueller Standort (Ausruhen)
-                        self.target_x = self.x
-                        self.target_y = self.y
-                    else:  # 30% Chance weiter zu verfolgen
-                        self.path_timer = random.randint(120, 180)
-                elif dist_to_player < 1.0:  # Spieler sehr nah, manchmal zurückziehen
-                    if random.random() < 0.3:  # 30% Chance auf taktischen Rückzug
-                        self.movement_state = "retreat"
-                        self.path_timer = random.randint(30, 60)  # Kurzer Rückzug
-                        # Fluchtrichtung ist weg vom Spieler
-                        retreat_angle = math.atan2(-dy, -dx)
-                        retreat_dist = random.uniform(1.5, 3.0)
-                        self.target_x = self.x + math.cos(retreat_angle) * retreat_dist
-                        self.target_y = self.y + math.sin(retreat_angle) * retreat_dist
-                        # Stelle sicher, dass der Zielpunkt innerhalb der Karte liegt
-                        self.target_x = max(1.0, min(MAP_SIZE-2.0, self.target_x))
-                        self.target_y = max(1.0, min(MAP_SIZE-2.0, self.target_y))
-                else:  # Fortsetzung der Verfolgung
-                    self.path_timer = random.randint(120, 240)
-                
-            elif self.movement_state == "retreat":
-                # Nach Rückzug immer zu Idle
-                self.movement_state = "idle"
-                self.state_timer = random.randint(60, 120)  # Pause nach Rückzug
-            
-            # Timer zurücksetzen
-            self.state_timer = random.randint(180, 300)  # 3-5 Sekunden
-            # Debug-Ausgaben mit Namen des Gegners
-            if random.random() < 0.001:  # Nur 0.1% der Zustandswechsel werden geloggt
-                print(f"Gegner '{self.name}' bei ({self.x:.1f}, {self.y:.1f}) wechselt zu Zustand: {self.movement_state}")
-        
-        # BEWEGUNGSBERECHNUNG basierend auf aktuellem Zustand
-        move_dir_x = 0
-        move_dir_y = 0
-        
-        if self.movement_state == "idle":
-            # Im Idle-Zustand minimale zufällige Bewegung
-            move_dir_x = random.uniform(-0.1, 0.1)
-            move_dir_y = random.uniform(-0.1, 0.1)
-            move_speed = self.speed * 0.2  # Sehr langsam im Idle
-            
-        elif self.movement_state == "patrol":
-            # Zum Patrouillenziel bewegen
-            target_dx = self.target_x - self.x
-            target_dy = self.target_y - self.y
-            target_dist = math.sqrt(target_dx*target_dx + target_dy*target_dy)
-            
-            if target_dist < 0.2:  # Ziel erreicht
-                # Neues Patrouillenziel wählen - direkt hier um schneller zu reagieren
-                angle = random.uniform(0, 2 * math.pi)
-                distance = random.uniform(1.5, 3.0)
-                self.target_x = self.x + math.cos(angle) * distance
-                self.target_y = self.y + math.sin(angle) * distance
-                # Sicherstellen, dass das Ziel innerhalb der Karte liegt
-                self.target_x = max(1.0, min(MAP_SIZE-2.0, self.target_x))
-                self.target_y = max(1.0, min(MAP_SIZE-2.0, self.target_y))
-                
-                # Extrem reduzierte Debug-Ausgaben für bessere Performance
-                if random.random() < 0.001:  # Nur 0.1% der Zielerreichungen werden geloggt
-                    print(f"Gegner '{self.name}' bei ({self.x:.1f}, {self.y:.1f}) hat Ziel erreicht, neues Ziel: ({self.target_x:.1f}, {self.target_y:.1f})")
-                
-                # Timers zurücksetzen mit kürzerer Dauer für häufigere Aktionen
-                self.path_timer = random.randint(90, 180)
-                self.state_timer = random.randint(60, 120)
-            else:
-                # Zum Ziel bewegen
-                move_dir_x = target_dx / target_dist
-                move_dir_y = target_dy / target_dist
-                
-            # Schnellere Geschwindigkeit für bessere Sichtbarkeit
-            move_speed = self.speed * 1.0  # Volle Geschwindigkeit
-            
-        elif self.movement_state == "chase":
-            # Spieler direkt verfolgen aber mit leichtem Ausweichverhalten
-            # für realistischere Bewegung
-            # WICHTIG: dx und dy sind bereits relativ zur Spielerposition berechnet
-            # (dx = player_x - self.x und dy = player_y - self.y)
-            # Daher führt diese Bewegung direkt zum Spieler, unabhängig vom Spielerblickwinkel
-            move_dir_x = dx
-            move_dir_y = dy
-            
-            # Geschwindigkeit je nach Entfernung anpassen - SCHNELLER für bessere Sichtbarkeit
-            if dist_to_player > 6:
-                move_speed = self.speed * 2.0  # Deutlich schneller wenn weit weg
-            elif dist_to_player < 1.5:
-                move_speed = self.speed * 0.8  # Langsamer wenn nah dran, aber nicht zu langsam
-            else:
-                move_speed = self.speed * 1.5  # Generell schneller
-                
-        elif self.movement_state == "retreat":
-            # Zum Rückzugsziel bewegen
-            target_dx = self.target_x - self.x
-            target_dy = self.target_y - self.y
-            target_dist = math.sqrt(target_dx*target_dx + target_dy*target_dy)
-            
-            if target_dist < 0.2:  # Ziel erreicht
-                self.path_timer = 0  # Erzwingt Zustandswechsel
-            else:
-                # Zum Ziel bewegen
-                move_dir_x = target_dx / target_dist
-                move_dir_y = target_dy / target_dist
-            
-            # Schneller zurückziehen
-            move_speed = self.speed * 1.2
-        
-        # KOLLISIONSVERMEIDUNG zwischen Gegnern
-        for other in enemies:
-            if other != self and other.active:
-                other_dx = other.x - self.x
-                other_dy = other.y - self.y
-                other_dist = math.sqrt(other_dx*other_dx + other_dy*other_dy)
-                
-                # Stärkeres Ausweichen für natürlichere Gruppenbewegung
-                if other_dist < 1.2:  # Größerer Ausweichradius
-                    avoid_strength = max(0, (1.2 - other_dist)) * 1.5  # Stärkere Abstoßung
-                    move_dir_x -= other_dx / other_dist * avoid_strength
-                    move_dir_y -= other_dy / other_dist * avoid_strength
-        
-        # BEWEGUNGSANWENDUNG und KOLLISIONSPRÜFUNG
-        # Normalisieren des Bewegungsvektors
-        move_length = math.sqrt(move_dir_x*move_dir_x + move_dir_y*move_dir_y)
-        if move_length > 0.0001:  # Verhindere Division durch Null
-            # Normalisieren
-            move_dir_x /= move_length
-            move_dir_y /= move_length
-            
-            # Leichte Zufallsbewegung für natürlicheres Verhalten
-            jitter = 0.1  # Kleiner Zufallsfaktor
-            move_dir_x += random.uniform(-jitter, jitter)
-            move_dir_y += random.uniform(-jitter, jitter)
-            
-            # Renormalisieren nach Zufallskomponente
-            move_length = math.sqrt(move_dir_x*move_dir_x + move_dir_y*move_dir_y)
-            if move_length > 0.0001:
-                move_dir_x /= move_length
-                move_dir_y /= move_length
-            
-            # HIER WAR DER FEHLER: Move-Speed war zu klein
-            # Erhöhe die Bewegungsgeschwindigkeit für sichtbare Bewegung
-            move_speed = max(move_speed, 0.02)  # Garantierte Mindestgeschwindigkeit
-            
-            # Neue Position berechnen - ABSOLUT IN WELTKOORDINATEN!
-            # Wichtig: Diese Position ist unabhängig vom Spielerwinkel und Kamerablick
-            next_x = self.x + move_dir_x * move_speed
-            next_y = self.y + move_dir_y * move_speed
-            
-            # DEBUGGING: Zeige gelegentlich die absoluten Weltkoordinaten der Gegner an
-            if random.random() < 0.001:  # 0.1% Chance pro Frame
-                print(f"Gegner '{self.name}' absolute Weltposition: ({self.x:.2f}, {self.y:.2f}) -> " +
-                      f"Nächste Position: ({next_x:.2f}, {next_y:.2f}), " +
-                      f"Unabhängig vom Spielerwinkel: {player_angle:.2f}")
-            
-            # Bewegungsvektoren gelegentlich anzeigen
-            if random.random() < 0.0005:  # 0.05% Chance pro Frame
-                print(f"Gegner '{self.name}' bei ({self.x:.2f}, {self.y:.2f}) bewegt sich: dx={move_dir_x:.2f}, dy={move_dir_y:.2f}, " +
-                      f"speed={move_speed:.4f}")
-                if self.movement_state == "patrol":
-                    print(f"  Patrouilliert zu Ziel: ({self.target_x:.2f}, {self.target_y:.2f})")
-            
-            # Kollisionsprüfung mit Karte und Grenzen
-            if 1 < next_x < MAP_SIZE-2 and 1 < next_y < MAP_SIZE-2:
-                # Separate Prüfung für X und Y ermöglicht Gleiten entlang von Wänden
-                # Prüfe Y-Bewegung
-                if game_map[int(next_y)][int(self.x)] == 0:
-                    # Freier Weg, normal bewegen
-                    self.y = next_y
-                else:
-                    # Y-Bewegung kollidiert - versuche leichte Korrektur
-                    # Teste etwas nach oben oder unten
-                    if next_y > self.y and game_map[int(self.y) + 1][int(self.x)] == 0:
-                        # Nur einen kleinen Schritt in die richtige Richtung
-                        self.y += 0.1
-                    elif next_y < self.y and game_map[int(self.y) - 1][int(self.x)] == 0:
-                        # Nur einen kleinen Schritt in die richtige Richtung
-                        self.y -= 0.1
-                
-                # Prüfe X-Bewegung
-                if game_map[int(self.y)][int(next_x)] == 0:
-                    # Freier Weg, normal bewegen
-                    self.x = next_x
-                else:
-                    # X-Bewegung kollidiert - versuche leichte Korrektur
-                    # Teste etwas nach links oder rechts
-                    if next_x > self.x and game_map[int(self.y)][int(self.x) + 1] == 0:
-                        # Nur einen kleinen Schritt in die richtige Richtung
-                        self.x += 0.1
-                    elif next_x < self.x and game_map[int(self.y)][int(self.x) - 1] == 0:
-                        # Nur einen kleinen Schritt in die richtige Richtung
-                        self.x -= 0.1
-                    
-                # Bei Kollision neues Ziel suchen im Patrouillen-Modus
-                if (self.x != next_x or self.y != next_y) and self.movement_state == "patrol":
-                    self.path_timer = 0  # Erzwingt neue Zielsetzung
-                    
-                    # Extrem reduziertes Logging
-                    if random.random() < 0.0005:  # Nur 0.05% der Kollisionen loggen
-                        print(f"Gegner '{self.name}' kollidiert mit Wand bei ({self.x:.1f}, {self.y:.1f}), sucht neues Ziel")
-            else:
-                # Außerhalb der Karte, Ziel ändern
-                if self.movement_state == "patrol" or self.movement_state == "retreat":
-                    self.path_timer = 0  # Neues Ziel setzen
-                    # Extrem reduziertes Logging
-                    if random.random() < 0.0001:  # Nur 0.01% der Fälle loggen
-                        print(f"Gegner '{self.name}' außerhalb der Karte bei ({self.x:.1f}, {self.y:.1f}), sucht neues Ziel")
-        
-        # SPIELER-INTERAKTION (Angriff)
-        # Angriff nur wenn im Verfolgungs-Modus, nah am Spieler und Cooldown abgelaufen
-        if self.movement_state == "chase" and dist_to_player < self.min_attack_distance and self.attack_cooldown <= 0:
-            global player_health
-            player_health -= self.attack_damage
-            self.attack_cooldown = 60  # 1 Sekunde zwischen Angriffen
-            # Angemessene Debug-Ausgabe für Angriffe
-            if random.random() < 0.1:  # 10% der Angriffe werden geloggt
-                print(f"Gegner '{self.name}' greift an! Schaden: {self.attack_damage}, Spieler hat noch {player_health} Leben")
-                # Zeige Entfernung zum Spieler für bessere Diagnose
-                print(f"  Abstand zum Spieler: {dist_to_player:.2f}, Position: ({self.x:.2f}, {self.y:.2f})")
-        
-        # Cooldown-Timer aktualisieren
-        if self.attack_cooldown > 0:
-            self.attack_cooldown -= 1
+        """Aktualisiert nur diesen Gegner (Einzelaufruf des vektorisierten Kernels)"""
+        global player_health
+        player_health -= enemy_store.update(player_x, player_y, [self.slot])
 
-# Karte (0 = freier Platz, 1 = Wand)
-MAP_SIZE = 10
-game_map = np.zeros((MAP_SIZE, MAP_SIZE), dtype=int)
-game_map[0, :] = 1  # Obere Wand
-game_map[:, 0] = 1  # Linke Wand
-game_map[MAP_SIZE-1, :] = 1  # Untere Wand
-game_map[:, MAP_SIZE-1] = 1  # Rechte Wand
-game_map[5, 5] = 1  # Ein Hindernis in der Mitte
+class AIScheduler:
+    """
+    Detailstufen für die Gegner-KI mit Zeitbudget pro Tick.
 
-# Gegner und Projektile
-enemies = []
-bullets = []
+    Verfolgende und nahe Gegner laufen jeden Tick. Alle anderen bekommen je nach
+    Zustand und Entfernung eine eigene Frequenz (z.B. wartende Gegner 10 Hz) und
+    werden, sobald fällig, in Teilschritten abgearbeitet, bis das Zeitbudget
+    verbraucht ist. Nicht bediente Gegner behalten ihre Zeit in `ai_pending` und
+    holen sie beim nächsten Update nach.
+    """
 
-# Schusssound
-shoot_sound = None
+    def __init__(self, budget_ms=AI_TICK_BUDGET_MS, batch_size=AI_BATCH_SIZE):
+        self.budget = budget_ms / 1000.0
+        self.batch_size = batch_size
+        self.updated = 0  # Statistik des letzten Ticks
+        self.deferred = 0
 
-# Farben
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-RED = (255, 0, 0)
-GREEN = (0, 255, 0)
-BLUE = (0, 0, 255)
-DARKGRAY = (60, 60, 60)
-YELLOW = (255, 255, 0)
+    def intervals(self, state, dist):
+        """Aktualisierungsabstand in Referenz-Ticks je Gegner (0 = jeden Tick)"""
+        interval = np.where(state == STATE_IDLE,
+                            SIM_REFERENCE_RATE / AI_IDLE_RATE,
+                            SIM_REFERENCE_RATE / AI_MOVING_RATE)
+        far = dist >= AI_FAR_DISTANCE
+        interval[far] = np.maximum(interval[far], SIM_REFERENCE_RATE / AI_FAR_RATE)
+        interval[(state == STATE_CHASE) | (dist < AI_NEAR_DISTANCE)] = 0.0
+        return interval
 
-# Hilfsfunktion für Winkelberechnungen
-def normalize_angle(angle):
-    """Normalisiert einen Winkel auf den Bereich [-π, π]"""
-    while angle < -math.pi:
-        angle += 2 * math.pi
-    while angle > math.pi:
-        angle -= 2 * math.pi
-    return angle
+    def _run(self, store, batch, origin_x, origin_y):
+        """Schaltet einen Teilschritt mit der jeweils angesammelten Zeit weiter"""
+        elapsed = store.ai_pending[batch]
+        store.ai_pending[batch] = 0.0
+        self.updated += len(batch)
+        return store.update(origin_x, origin_y, batch, elapsed)
 
-def compute_screen_x(world_x, world_y, player_x, player_y, player_angle, fov, screen_width):
-    """
-    Berechnet die X-Position auf dem Bildschirm für ein Objekt in Weltkoordinaten.
+    def update(self, store, origin_x, origin_y, elapsed=1.0):
+        """Aktualisiert alle fälligen Gegner, Rückgabe: Schaden für den Spieler"""
+        self.updated = 0
+        self.deferred = 0
+        idx = store.active_indices()
+        if len(idx) == 0:
+            return 0
+
+        pending = np.minimum(store.ai_pending[idx] + elapsed, AI_MAX_CATCHUP)
+        store.ai_pending[idx] = pending
+        dist = np.hypot(store.x[idx] - origin_x, store.y[idx] - origin_y)
+        interval = self.intervals(store.state[idx], dist)
+        due = pending >= interval
+
+        # Zwingend fällige Gegner außerhalb des Budgets
+        urgent = interval == 0.0
+        damage = self._run(store, idx[urgent], origin_x, origin_y) if urgent.any() else 0
+
+        # Rest: am stärksten überfällige zuerst, in Teilschritten bis das Budget erschöpft ist
+        rest = due & ~urgent
+        if rest.any():
+            overdue = pending[rest] / interval[rest]
+            queue = idx[rest][np.argsort(-overdue, kind='stable')]
+            deadline = time.perf_counter() + self.budget
+            for start in range(0, len(queue), self.batch_size):
+                # Mindestens ein Teilschritt pro Tick, damit nichts verhungert
+                if start and time.perf_counter() >= deadline:
+                    self.deferred = len(queue) - start
+                    break
+                damage += self._run(store, queue[start:start + self.batch_size],
+                                    origin_x, origin_y)
+        return damage
+
+
+class GameMap:
+    """
+    Spielkarte als kompaktes uint8-Raster (0 = freier Platz, 1 = Wand).
+
+    Vektorisierte Verbraucher arbeiten direkt auf `cells` (Zeile, Spalte).
+    Python-Schleifen nutzen is_wall()/cell(): sie lesen über eine flache
+    memoryview auf denselben Speicher und bekommen ein normales int statt
+    einer temporären Zeilensicht plus NumPy-Skalar.
+
+    `version` wird bei jeder Änderung erhöht, damit abgeleitete Caches
+    (Strahlcache, Flussfeld, Pfade, Sichtbarkeit) wissen, wann sie veraltet sind.
+    Wer `cells` direkt beschreibt, muss danach mark_changed() aufrufen.
+    `changes` protokolliert die letzten Änderungen als (version, (col, row)),
+    damit das Distanzfeld nur betroffene Kacheln neu berechnen muss.
+    """
+
+    def __init__(self, size, cells=None):
+        self.version = 0
+        self.changes = deque(maxlen=MAP_CHANGE_LOG)
+        self._assign(np.zeros((size, size), dtype=np.uint8) if cells is None else cells)
+
+    def _assign(self, cells):
+        self.cells = np.ascontiguousarray(cells, dtype=np.uint8)  # Kopie nur bei anderem Typ
+        self.height, self.width = self.cells.shape
+        self._flat = memoryview(self.cells.reshape(-1))
+
+    @property
+    def shape(self):
+        return self.cells.shape
+
+    def reset(self, size):
+        """Leere Karte der Größe size x size mit Außenwänden"""
+        self._assign(np.zeros((size, size), dtype=np.uint8))
+        self.cells[0, :] = 1  # Obere Wand
+        self.cells[:, 0] = 1  # Linke Wand
+        self.cells[size-1, :] = 1  # Untere Wand
+        self.cells[:, size-1] = 1  # Rechte Wand
+        self.mark_changed()
+
+    def mark_changed(self, cell=None):
+        """
+        Markiert die Karte als geändert (invalidiert alle abgeleiteten Caches).
+        cell = (col, row) bei einer einzelnen Zelle, None bei beliebigen Änderungen.
+        """
+        self.version += 1
+        self.changes.append((self.version, cell))
+
+    def cell(self, col, row):
+        """Zellwert ohne Bereichsprüfung (schneller Skalarzugriff für Python-Schleifen)"""
+        return self._flat[row * self.width + col]
+
+    def set_cell(self, col, row, value):
+        """Setzt eine Zelle und erhöht die Version"""
+        self._flat[row * self.width + col] = value
+        self.mark_changed((col, row))
+
+    def is_wall(self, x, y):
+        """True für Wände und alles außerhalb der Karte (Weltkoordinaten)"""
+        col, row = int(x), int(y)
+        if 0 <= col < self.width and 0 <= row < self.height:
+            return self._flat[row * self.width + col] != 0
+        return True
+
+    def gather(self, rows, cols):
+        """Zellwerte für Index-Arrays (vektorisiert, Zellen müssen in der Karte liegen)"""
+        return self.cells[rows, cols]
+
+    def window(self, row_lo, row_hi, col_lo, col_hi):
+        """Dichter Ausschnitt [row_lo, row_hi) x [col_lo, col_hi), außerhalb der Karte Wand"""
+        out = np.ones((row_hi - row_lo, col_hi - col_lo), dtype=np.uint8)
+        r0, r1 = max(row_lo, 0), min(row_hi, self.height)
+        c0, c1 = max(col_lo, 0), min(col_hi, self.width)
+        if r0 < r1 and c0 < c1:
+            out[r0-row_lo:r1-row_lo, c0-col_lo:c1-col_lo] = self.cells[r0:r1, c0:c1]
+        return out
+
+
+class TileGrid:
+    """
+    Gemeinsame Lesezugriffe für Raster aus quadratischen Kacheln.
+
+    Unterklassen rufen _init_tiles() auf und liefern mit _load_tile(cx, cy)
+    eine Kachel als uint8-Array chunk_size x chunk_size. chunk() hält davon
+    höchstens `cache_size` im LRU-Cache; cell, gather und window bauen
+    darauf auf und fassen jede Kachel nur einmal an.
+    """
+
+    def _init_tiles(self, width, height, chunk_size):
+        if chunk_size & (chunk_size - 1):
+            raise ValueError(f"Kachelgröße {chunk_size} ist keine Zweierpotenz")
+        self.width, self.height = width, height
+        self.chunk_size = chunk_size
+        self.shift = chunk_size.bit_length() - 1
+        self.mask = chunk_size - 1
+        self.chunks_x = -(-width // chunk_size)
+        self.chunks_y = -(-height // chunk_size)
+        self._last_key = None  # Zuletzt gelesene Kachel für den Skalarzugriff
+        self._last_tile = None
+
+    def chunk(self, cx, cy):
+        """Kachel (cx, cy) als Array, bei Bedarf nachgeladen (LRU)"""
+        key = (cy, cx)
+        tile = self.cache.get(key)
+        if tile is None:
+            tile = self._load_tile(cx, cy)
+            self.cache[key] = tile
+            self.loads += 1
+            if len(self.cache) > self.cache_size:
+                self.cache.popitem(last=False)
+        else:
+            self.cache.move_to_end(key)
+        return tile
+
+    def cell(self, col, row):
+        """Zellwert ohne Bereichsprüfung (schneller Skalarzugriff für Python-Schleifen)"""
+        key = (row >> self.shift) * self.chunks_x + (col >> self.shift)
+        if key != self._last_key:
+            self._last_tile = memoryview(self.chunk(col >> self.shift, row >> self.shift).reshape(-1))
+            self._last_key = key
+        return self._last_tile[((row & self.mask) << self.shift) | (col & self.mask)]
+
+    def gather(self, rows, cols):
+        """Zellwerte für Index-Arrays (vektorisiert, Zellen müssen in der Karte liegen)"""
+        rows = np.asarray(rows, dtype=np.intp)
+        cols = np.asarray(cols, dtype=np.intp)
+        values = np.empty(rows.shape, dtype=np.uint8)
+        if rows.size == 0:
+            return values
+        # Nach Kachel gruppieren, jede Kachel nur einmal anfassen
+        keys = ((rows >> self.shift) * self.chunks_x + (cols >> self.shift)).ravel()
+        first = int(keys[0])
+        if (keys == first).all():  # Häufigster Fall: alle Zellen in einer Kachel
+            tile = self.chunk(first % self.chunks_x, first // self.chunks_x)
+            return tile[rows & self.mask, cols & self.mask]
+        order = np.argsort(keys, kind='stable')
+        sorted_keys = keys[order]
+        bounds = np.flatnonzero(np.diff(sorted_keys)) + 1
+        flat_rows, flat_cols, flat_values = rows.ravel(), cols.ravel(), values.reshape(-1)
+        for group in np.split(order, bounds):
+            key = int(keys[group[0]])
+            tile = self.chunk(key % self.chunks_x, key // self.chunks_x)
+            flat_values[group] = tile[flat_rows[group] & self.mask, flat_cols[group] & self.mask]
+        return values
+
+    def window(self, row_lo, row_hi, col_lo, col_hi):
+        """Dichter Ausschnitt [row_lo, row_hi) x [col_lo, col_hi), außerhalb der Karte Wand"""
+        out = np.ones((row_hi - row_lo, col_hi - col_lo), dtype=np.uint8)
+        r0, r1 = max(row_lo, 0), min(row_hi, self.height)
+        c0, c1 = max(col_lo, 0), min(col_hi, self.width)
+        size = self.chunk_size
+        for cy in range(r0 >> self.shift, ((r1 - 1) >> self.shift) + 1 if r0 < r1 else 0):
+            tile_r0, tile_r1 = max(r0, cy * size), min(r1, (cy + 1) * size)
+            for cx in range(c0 >> self.shift, ((c1 - 1) >> self.shift) + 1 if c0 < c1 else 0):
+                tile_c0, tile_c1 = max(c0, cx * size), min(c1, (cx + 1) * size)
+                tile = self.chunk(cx, cy)
+                out[tile_r0-row_lo:tile_r1-row_lo, tile_c0-col_lo:tile_c1-col_lo] = \
+                    tile[tile_r0-cy*size:tile_r1-cy*size, tile_c0-cx*size:tile_c1-cx*size]
+        return out
+
+
+class ChunkedMap(TileGrid):
+    """
+    Große Karte in Kacheln fester Größe, gespeichert in einer Binärdatei (numpy.memmap).
+
+    Dateiformat: 32 Byte Kopf (MAGIC, Breite, Höhe, Kachelgröße), danach alle
+    Kacheln zeilenweise als zusammenhängende uint8-Blöcke chunk_size x chunk_size.
+    Kacheln am Rand sind mit Wand aufgefüllt.
+
+    Gelesen wird ausschließlich über chunk(): ein LRU-Cache hält höchstens
+    `cache_size` Kacheln, weitere werden bei Bedarf aus der Datei nachgeladen.
+    Schnittstelle wie GameMap (shape, version, cell, is_wall, gather, window,
+    set_cell), aber ohne dichtes `cells`-Array - der Speicherbedarf hängt
+    damit nicht von der Kartengröße ab.
+
+    Die Datei wird copy-on-write geöffnet: set_cell ändert nur die Karte im
+    Speicher (Änderungen in `edits`), die Kartendatei schreiben nur create()
+    und save().
+    """
+
+    MAGIC = b"DOOMPMAP"
+    HEADER = np.dtype([('magic', 'S8'), ('width', '<u4'), ('height', '<u4'),
+                       ('chunk_size', '<u4'), ('reserved', 'V12')])
+
+    def __init__(self, path, cache_size=CHUNK_CACHE_SIZE):
+        header = np.fromfile(path, dtype=self.HEADER, count=1)
+        if len(header) == 0 or header[0]['magic'] != self.MAGIC:
+            raise ValueError(f"{path} ist keine DooMP-Kartendatei")
+        self.path = path
+        self._init_tiles(int(header[0]['width']), int(header[0]['height']),
+                         int(header[0]['chunk_size']))
+        self.tiles = np.memmap(path, dtype=np.uint8, mode='c', offset=self.HEADER.itemsize,
+                               shape=(self.chunks_y, self.chunks_x, self.chunk_size, self.chunk_size))
+        self.edits = {}  # Noch nicht gespeicherte Änderungen: (col, row) -> Wert
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.version = 0
+        self.changes = deque(maxlen=MAP_CHANGE_LOG)
+        self.loads = 0  # Statistik: aus der Datei nachgeladene Kacheln
+
+    @classmethod
+    def create(cls, path, width, height, chunk_size=CHUNK_SIZE, fill=None):
+        """
+        Legt eine neue Kartendatei mit Außenwänden an und öffnet sie.
+
+        fill(tile, row, col) kann jede Kachel vor dem Schreiben befüllen
+        (row, col = Weltzelle der linken oberen Ecke). Es liegt immer nur
+        eine Kachel im Speicher.
+        """
+        chunks_x = -(-width // chunk_size)
+        chunks_y = -(-height // chunk_size)
+        header = np.zeros(1, dtype=cls.HEADER)
+        header['magic'] = cls.MAGIC
+        header['width'], header['height'], header['chunk_size'] = width, height, chunk_size
+        with open(path, 'wb') as f:
+            header.tofile(f)
+            f.truncate(cls.HEADER.itemsize + chunks_y * chunks_x * chunk_size * chunk_size)
+
+        tiles = np.memmap(path, dtype=np.uint8, mode='r+', offset=cls.HEADER.itemsize,
+                          shape=(chunks_y, chunks_x, chunk_size, chunk_size))
+        offsets = np.arange(chunk_size)
+        for cy in range(chunks_y):
+            rows = cy * chunk_size + offsets
+            for cx in range(chunks_x):
+                cols = cx * chunk_size + offsets
+                tile = np.zeros((chunk_size, chunk_size), dtype=np.uint8)
+                if fill is not None:
+                    fill(tile, cy * chunk_size, cx * chunk_size)
+                # Außenwände und Auffüllung jenseits des Kartenrands
+                tile[(rows == 0) | (rows >= height - 1), :] = 1
+                tile[:, (cols == 0) | (cols >= width - 1)] = 1
+                tiles[cy, cx] = tile
+        tiles.flush()
+        del tiles
+        # Ein PVS der alten Datei gehört nicht zur neuen Karte
+        if os.path.exists(path + ".pvs"):
+            os.remove(path + ".pvs")
+        return cls(path)
+
+    def save(self):
+        """Schreibt die Änderungen aus `edits` in die Kartendatei"""
+        if not self.edits:
+            return
+        tiles = np.memmap(self.path, dtype=np.uint8, mode='r+', offset=self.HEADER.itemsize,
+                          shape=self.tiles.shape)
+        for (col, row), value in self.edits.items():
+            tiles[row >> self.shift, col >> self.shift, row & self.mask, col & self.mask] = value
+        tiles.flush()
+        del tiles
+        self.edits = {}
+        # Das PVS beschreibt die Karte vor den Änderungen
+        if os.path.exists(self.path + ".pvs"):
+            os.remove(self.path + ".pvs")
+
+    def fingerprint(self):
+        """
+        (CRC32, Größe) der Kartendatei - unterscheidet auch neu erzeugte Karten
+        gleicher Größe. Mit ungespeicherten Änderungen (0, 0), die Karte
+        entspricht dann keiner Datei.
+        """
+        if self.edits:
+            return 0, 0
+        crc = 0
+        with open(self.path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                crc = zlib.crc32(block, crc)
+        return crc, os.path.getsize(self.path)
+
+    @property
+    def shape(self):
+        return (self.height, self.width)
+
+    def mark_changed(self, cell=None):
+        """
+        Markiert die Karte als geändert (invalidiert alle abgeleiteten Caches).
+        cell = (col, row) bei einer einzelnen Zelle, None bei beliebigen Änderungen.
+        """
+        self.version += 1
+        self.changes.append((self.version, cell))
+
+    def _load_tile(self, cx, cy):
+        """Liest eine Kachel mit einer zusammenhängenden Leseoperation aus der Datei"""
+        return np.array(self.tiles[cy, cx])
+
+    def set_cell(self, col, row, value):
+        """Setzt eine Zelle im Speicher (nicht in der Datei, siehe save) und erhöht die Version"""
+        cy, cx = row >> self.shift, col >> self.shift
+        self.tiles[cy, cx, row & self.mask, col & self.mask] = value
+        self.edits[(col, row)] = value
+        tile = self.cache.get((cy, cx))
+        if tile is not None:
+            tile[row & self.mask, col & self.mask] = value
+        self._last_key = None
+        self.mark_changed((col, row))
+
+    def is_wall(self, x, y):
+        """True für Wände und alles außerhalb der Karte (Weltkoordinaten)"""
+        col, row = int(x), int(y)
+        if 0 <= col < self.width and 0 <= row < self.height:
+            return self.cell(col, row) != 0
+        return True
+
+
+# Karte
+MAP_SIZE = 10
+game_map = GameMap(MAP_SIZE)
+game_map.reset(MAP_SIZE)
+game_map.set_cell(5, 5, 1)  # Ein Hindernis in der Mitte
+
+def load_level(path):
+    """
+    Öffnet eine gekachelte Kartendatei (siehe ChunkedMap) als aktuelle Karte,
+    samt vorberechnetem PVS aus DATEI.pvs, falls vorhanden (python main.py
+    --build-pvs DATEI).
+    """
+    global game_map, MAP_SIZE, potentially_visible_set
+    level = ChunkedMap(path)
+    if level.width != level.height:
+        raise ValueError(f"{path}: nur quadratische Karten werden unterstützt")
+    game_map = level
+    MAP_SIZE = level.width
+
+    potentially_visible_set = None
+    if os.path.exists(path + ".pvs"):
+        pvs = PotentiallyVisibleSet.load(path + ".pvs", source=level)
+        # Gleiche Größe reicht nicht: die Karte kann seit dem Aufbau neu erzeugt oder geändert worden sein
+        if (pvs.width, pvs.height) == (level.width, level.height) and pvs.fingerprint == level.fingerprint():
+            potentially_visible_set = pvs
+        else:
+            print(f"{path}.pvs passt nicht zur Karte und wird ignoriert")
+
+def generate_level(path, size, density=0.06, seed=None):
+    """
+    Erzeugt eine große Zufallskarte als Kacheldatei (Aufruf: python main.py
+    --make-level DATEI [GRÖSSE]). Die Mitte bleibt für den Spieler frei.
+    """
+    rng = np.random.default_rng(seed)
+    center = size // 2
+
+    def fill(tile, row, col):
+        tile[rng.random(tile.shape) < density] = 1
+        # Freie Fläche um den Startpunkt in der Kartenmitte
+        rows = np.arange(row, row + tile.shape[0])[:, None]
+        cols = np.arange(col, col + tile.shape[1])[None, :]
+        tile[(np.abs(rows - center) <= 3) & (np.abs(cols - center) <= 3)] = 0
+
+    return ChunkedMap.create(path, size, size, fill=fill)
+
+
+class DistanceField(TileGrid):
+    """
+    Gekapptes Chebyshev-Distanzfeld zu game_map für das Überspringen leerer Bereiche.
+
+    Wert 0 = Wand, Wert k > 0 = das nächste Hindernis ist k Zellen entfernt
+    (Maximum-Norm, höchstens max_distance). Alle Zellen im Quadrat mit
+    Radius k - 1 um die Zelle sind damit frei. Außerhalb der Karte gilt
+    alles als Wand.
+
+    Für eine ChunkedMap wird das Feld kachelweise bei Bedarf berechnet und
+    im LRU-Cache gehalten, für eine GameMap liegt es (wie die Karte selbst)
+    als eine einzige Kachel vor. Einzelne Zelländerungen (GameMap.changes)
+    berechnen nur das Quadrat im Umkreis von max_distance - 1 neu, alles
+    andere verwirft das Feld komplett.
+    """
+
+    def __init__(self, max_distance=DISTANCE_FIELD_MAX, chunk_size=CHUNK_SIZE,
+                 cache_size=CHUNK_CACHE_SIZE):
+        self.max_distance = max_distance
+        self.tile_size = chunk_size  # Kachelgröße für gekachelte Karten
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.loads = 0  # Statistik: berechnete Kacheln
+        self.source = None  # Karte, zu der das Feld gehört
+        self.version = None
+        self._init_tiles(0, 0, chunk_size)
+
+    def sync(self):
+        """Gleicht das Feld mit game_map ab (billig, wenn sich nichts geändert hat)"""
+        if self.source is game_map and self.version == game_map.version:
+            return
+        if self.source is game_map:
+            new = [cell for version, cell in game_map.changes if version > self.version]
+            if len(new) == game_map.version - self.version and None not in new:
+                for col, row in new:
+                    self.update_cell(col, row)
+                self.version = game_map.version
+                return
+        # Andere Karte, Massenänderung oder Protokoll übergelaufen: alles verwerfen
+        self.source = game_map
+        self.version = game_map.version
+        self.cache.clear()
+        if isinstance(game_map, ChunkedMap):
+            tile_size = self.tile_size
+        else:
+            tile_size = 1 << (max(game_map.width, game_map.height) - 1).bit_length()
+        self._init_tiles(game_map.width, game_map.height, tile_size)
+
+    def update_cell(self, col, row):
+        """Berechnet nach einer Änderung von (col, row) die abhängigen Werte in geladenen Kacheln neu"""
+        reach = self.max_distance - 1
+        row_lo, row_hi = max(row - reach, 0), min(row + reach + 1, self.height)
+        col_lo, col_hi = max(col - reach, 0), min(col + reach + 1, self.width)
+        values = None
+        size = self.chunk_size
+        for cy in range(row_lo >> self.shift, ((row_hi - 1) >> self.shift) + 1):
+            for cx in range(col_lo >> self.shift, ((col_hi - 1) >> self.shift) + 1):
+                tile = self.cache.get((cy, cx))
+                if tile is None:
+                    continue  # Wird beim nächsten Zugriff ohnehin neu berechnet
+                if values is None:
+                    values = self._compute(row_lo, row_hi, col_lo, col_hi)
+                r0, r1 = max(row_lo, cy * size), min(row_hi, (cy + 1) * size)
+                c0, c1 = max(col_lo, cx * size), min(col_hi, (cx + 1) * size)
+                tile[r0 - cy*size:r1 - cy*size, c0 - cx*size:c1 - cx*size] = \
+                    values[r0 - row_lo:r1 - row_lo, c0 - col_lo:c1 - col_lo]
+
+    def _load_tile(self, cx, cy):
+        """Berechnet eine ganze Kachel"""
+        size = self.chunk_size
+        return self._compute(cy * size, (cy + 1) * size, cx * size, (cx + 1) * size)
+
+    def _compute(self, row_lo, row_hi, col_lo, col_hi):
+        """Distanzen für [row_lo, row_hi) x [col_lo, col_hi) aus einem Kartenausschnitt mit Rand"""
+        reach, limit = self.max_distance - 1, self.max_distance
+        walls = self.source.window(row_lo - reach, row_hi + reach, col_lo - reach, col_hi + reach) != 0
+        dist = np.where(walls, 0, limit).astype(np.uint8)
+
+        # Wandmenge schrittweise um eine Zelle wachsen lassen (3x3-Maximum,
+        # getrennt nach Achsen) - neu erreichte Zellen haben Abstand k
+        grown = walls
+        for k in range(1, limit):
+            if grown.all():
+                break
+            rows = grown.copy()
+            rows[1:] |= grown[:-1]
+            rows[:-1] |= grown[1:]
+            grown = rows.copy()
+            grown[:, 1:] |= rows[:, :-1]
+            grown[:, :-1] |= rows[:, 1:]
+            dist[grown & (dist == limit)] = k
+        return dist[reach:dist.shape[0] - reach, reach:dist.shape[1] - reach].copy()
+
+
+class WallSegments(TileGrid):
+    """
+    Wandflächen von game_map als zusammengefasste Segmente für RAYCAST_ENGINE = "segments".
+
+    Eine Fläche liegt zwischen einer Wand und einer freien Zelle (beide in
+    der Karte). Benachbarte Flächen auf derselben Gitterlinie und mit
+    derselben Ausrichtung werden je Kachel zu einem Segment verschmolzen.
+    chunk() liefert hier statt Zellwerten ein float64-Array N x 5 mit
+    (Seite, Linie, Anfang, Ende, Richtung): Seite 0 = senkrecht (x = Linie),
+    Seite 1 = waagerecht (y = Linie). Richtung +1 heißt, die Fläche wird von
+    Strahlen in positiver Achsrichtung getroffen.
+
+    Kacheln liegen wie beim Distanzfeld im LRU-Cache; Einzeländerungen
+    verwerfen nur die Kacheln der Zelle und ihrer Nachbarn.
+    """
+
+    def __init__(self, chunk_size=WALL_SEGMENT_TILE, cache_size=WALL_SEGMENT_CACHE):
+        self.cache = OrderedDict()
+        self.cache_size = cache_size
+        self.loads = 0  # Statistik: extrahierte Kacheln
+        self.source = None  # Karte, zu der die Segmente gehören
+        self.version = None
+        self._init_tiles(0, 0, chunk_size)
+
+    def sync(self):
+        """Gleicht die Segmente mit game_map ab (billig, wenn sich nichts geändert hat)"""
+        if self.source is game_map and self.version == game_map.version:
+            return
+        if self.source is game_map:
+            new = [cell for version, cell in game_map.changes if version > self.version]
+            if len(new) == game_map.version - self.version and None not in new:
+                for col, row in new:
+                    # Die Flächen der Zelle und ihrer vier Nachbarn können sich ändern
+                    for c, r in ((col, row), (col - 1, row), (col + 1, row), (col, row - 1), (col, row + 1)):
+                        self.cache.pop((r >> self.shift, c >> self.shift), None)
+                self.version = game_map.version
+                return
+        # Andere Karte, Massenänderung oder Protokoll übergelaufen: alles verwerfen
+        self.source = game_map
+        self.version = game_map.version
+        self.cache.clear()
+        self._init_tiles(game_map.width, game_map.height, self.chunk_size)
+
+    def _load_tile(self, cx, cy):
+        """Extrahiert und verschmilzt die Wandflächen einer Kachel"""
+        size = self.chunk_size
+        row_lo, col_lo = cy * size, cx * size
+        row_hi, col_hi = min(row_lo + size, self.height), min(col_lo + size, self.width)
+        walls = self.source.window(row_lo - 1, row_hi + 1, col_lo - 1, col_hi + 1) != 0
+
+        # Außerhalb der Karte gibt es keine Flächen: dort verlassen Strahlen die Karte (DEPTH)
+        rows = np.arange(row_lo - 1, row_hi + 1)
+        cols = np.arange(col_lo - 1, col_hi + 1)
+        free = ~walls & ((rows >= 0) & (rows < self.height))[:, None] & ((cols >= 0) & (cols < self.width))
+        core = walls[1:-1, 1:-1]
+        return np.concatenate((self._merge(core & free[1:-1, :-2], 0, col_lo, row_lo, 1.0),
+                               self._merge(core & free[1:-1, 2:], 0, col_lo + 1, row_lo, -1.0),
+                               self._merge(core & free[:-2, 1:-1], 1, row_lo, col_lo, 1.0),
+                               self._merge(core & free[2:, 1:-1], 1, row_lo + 1, col_lo, -1.0)))
+
+    @staticmethod
+    def _merge(faces, side, line_offset, run_offset, facing):
+        """Fasst benachbarte Flächen einer Gitterlinie zu Segmenten (Seite, Linie, Anfang, Ende, Richtung) zusammen"""
+        if side == 0:
+            faces = faces.T  # Senkrechte Flächen: Läufe entlang der Zeilen einer Spalte
+        padded = np.zeros((faces.shape[0], faces.shape[1] + 2), dtype=np.int8)
+        padded[:, 1:-1] = faces
+        edges = np.diff(padded, axis=1)
+        line, start = np.nonzero(edges == 1)
+        stop = np.nonzero(edges == -1)[1]
+        segments = np.empty((line.size, 5))
+        segments[:, 0] = side
+        segments[:, 1] = line + line_offset
+        segments[:, 2] = start + run_offset
+        segments[:, 3] = stop + run_offset
+        segments[:, 4] = facing
+        return segments
+
+    def cast(self, origin_x, origin_y, ray_dir_x, ray_dir_y):
+        """
+        Entfernungen und Seiten wie cast_rays_batch, aber ohne Rasterschritte.
+
+        Die Kacheln werden in Ringen von einer Kachelbreite nach Abstand zum
+        Ursprung abgearbeitet (von vorne nach hinten). Pro Ring werden nur
+        Kacheln geprüft, die ein noch offener Strahl vor seinem bisher besten
+        Treffer durchquert; ein Strahl ist fertig, sobald sein Treffer vor dem
+        nächsten Ring liegt. Treffer mit mehr als MAX_RAY_STEPS DDA-Schritten
+        werden wie dort zu DEPTH, nur deren Seite kann dann abweichen.
+        """
+        self.sync()
+        num = ray_dir_x.size
+        start_col, start_row = int(origin_x), int(origin_y)
+
+        # Grenzparameter wie in cast_rays_batch, damit Treffer an Gitterecken gleich ausfallen
+        with np.errstate(divide='ignore', invalid='ignore'):
+            delta_x = np.where(ray_dir_x == 0, np.inf, np.abs(1.0 / ray_dir_x))
+            delta_y = np.where(ray_dir_y == 0, np.inf, np.abs(1.0 / ray_dir_y))
+            first_x = np.where(ray_dir_x < 0, (origin_x - start_col) * delta_x,
+                               (start_col + 1.0 - origin_x) * delta_x)
+            first_y = np.where(ray_dir_y < 0, (origin_y - start_row) * delta_y,
+                               (start_row + 1.0 - origin_y) * delta_y)
+
+            # Ohne Treffer: DEPTH mit der Seite, über die der Strahl die Karte verlässt
+            exit_x = np.where(ray_dir_x > 0, (self.width - origin_x) / ray_dir_x,
+                              np.where(ray_dir_x < 0, -origin_x / ray_dir_x, np.inf))
+            exit_y = np.where(ray_dir_y > 0, (self.height - origin_y) / ray_dir_y,
+                              np.where(ray_dir_y < 0, -origin_y / ray_dir_y, np.inf))
+        dda = (first_x, first_y, delta_x, delta_y,
+               np.where(ray_dir_x < 0, -1, 1), np.where(ray_dir_y < 0, -1, 1))
+        sides = (exit_y <= exit_x).astype(np.intp)
+
+        # Weiter als bis zum Kartenrand bzw. MAX_RAY_STEPS + 2 kommt kein Strahl
+        # (pro Längeneinheit wird mindestens eine Zellgrenze überquert)
+        best = np.minimum(np.minimum(exit_x, exit_y), MAX_RAY_STEPS + 2.0)
+        best_key = np.full(num, np.inf)  # Grenzparameter des Treffers (Reihenfolge wie im DDA)
+        best_side = sides.copy()
+        best_steps = np.full(num, MAX_RAY_STEPS + 1, dtype=np.intp)
+
+        # Kacheln im Umkreis nach Ring (Abstand zum Ursprung in Kachelbreiten) ordnen
+        size = self.chunk_size
+        reach = float(best.max()) if num else 0.0
+        cx_lo = max(int(origin_x - reach) >> self.shift, 0)
+        cx_hi = min(int(origin_x + reach) >> self.shift, self.chunks_x - 1)
+        cy_lo = max(int(origin_y - reach) >> self.shift, 0)
+        cy_hi = min(int(origin_y + reach) >> self.shift, self.chunks_y - 1)
+        tile_y, tile_x = np.mgrid[cy_lo:cy_hi + 1, cx_lo:cx_hi + 1]
+        tile_x, tile_y = tile_x.ravel(), tile_y.ravel()
+        box_x0, box_y0 = tile_x * size, tile_y * size
+        box_x1, box_y1 = np.minimum(box_x0 + size, self.width), np.minimum(box_y0 + size, self.height)
+        tile_dist = np.hypot(np.maximum(np.maximum(box_x0 - origin_x, origin_x - box_x1), 0),
+                             np.maximum(np.maximum(box_y0 - origin_y, origin_y - box_y1), 0))
+        rings = (tile_dist // size).astype(np.intp)
+        order = np.argsort(rings, kind='stable')
+        order = order[tile_dist[order] < reach]
+        ring_ids, ring_starts = np.unique(rings[order], return_index=True)
+
+        # Richtungen ohne Nullkomponente für den Kachel-Test (Schnitt mit achsparallelen Boxen)
+        slab_x = np.where(ray_dir_x == 0, 1e-30, ray_dir_x)
+        slab_y = np.where(ray_dir_y == 0, 1e-30, ray_dir_y)
+
+        # Offene Strahlen bleiben nach Winkel sortiert (für die Winkelbereiche der Segmente)
+        ray_angles = np.arctan2(ray_dir_y, ray_dir_x)
+        active = np.argsort(ray_angles, kind='stable')
+        for ring, group in zip(ring_ids.tolist(), np.split(order, ring_starts[1:])):
+            # Treffer vor diesem Ring kann keine spätere Kachel mehr verdecken
+            active = active[best[active] > ring * size - 1e-6]
+            if not active.size:
+                break
+
+            # Nur Kacheln, die ein offener Strahl vor seinem bisher besten Treffer durchquert
+            tx0 = (box_x0[group] - 1e-6 - origin_x) / slab_x[active, None]
+            tx1 = (box_x1[group] + 1e-6 - origin_x) / slab_x[active, None]
+            ty0 = (box_y0[group] - 1e-6 - origin_y) / slab_y[active, None]
+            ty1 = (box_y1[group] + 1e-6 - origin_y) / slab_y[active, None]
+            near = np.maximum(np.minimum(tx0, tx1), np.minimum(ty0, ty1))
+            far = np.minimum(np.maximum(tx0, tx1), np.maximum(ty0, ty1))
+            tiles = group[((far >= np.maximum(near, 0)) & (near <= best[active, None] + 1e-6)).any(axis=0)]
+            if not tiles.size:
+                continue
+            segments = np.concatenate([self.chunk(cx, cy)
+                                       for cx, cy in zip(tile_x[tiles].tolist(), tile_y[tiles].tolist())])
+
+            key, dist, side, steps = self._intersect(origin_x, origin_y, ray_dir_x, ray_dir_y, dda,
+                                                     active, ray_angles[active], segments)
+            better = key < best_key[active]
+            updated = active[better]
+            best_key[updated] = key[better]
+            best[updated] = dist[better]
+            best_side[updated] = side[better]
+            best_steps[updated] = steps[better]
+
+        distances = np.full(num, float(DEPTH))
+        counted = best_steps <= MAX_RAY_STEPS
+        distances[counted] = np.minimum(best[counted], DEPTH)
+        sides[counted] = best_side[counted]
+        return distances, sides
+
+    @staticmethod
+    def _intersect(origin_x, origin_y, ray_dir_x, ray_dir_y, dda, rays, ray_angles, segments):
+        """
+        Erster Treffer der Strahlen `rays` (nach Winkel sortiert, Winkel in
+        ray_angles) auf den Segmenten. Wie die Spaltenspanne einer Wand wird
+        jedes Segment nur gegen die Strahlen in seinem Winkelbereich geprüft.
+
+        Ob eine Fläche getroffen wird und welcher Treffer zuerst kommt, wird
+        mit den Grenzparametern des DDA (dda) entschieden - so fallen auch
+        Strahlen genau durch Gitterecken wie in cast_rays_batch aus.
+        Rückgabe pro Strahl: (Grenzparameter oder inf, Entfernung, Seite, DDA-Schritte)
+        """
+        count = rays.size
+        keys = np.full(count, np.inf)
+        dist_out = np.full(count, np.inf)
+        side_out = np.zeros(count, dtype=np.intp)
+        steps_out = np.zeros(count, dtype=np.intp)
+
+        side, line, lo, hi, facing = segments.T
+        vertical = side == 0
+        along_origin = np.where(vertical, origin_x, origin_y)
+        # Rückseiten zeigen vom Ursprung weg und werden nie getroffen
+        front = np.flatnonzero(facing * (line - along_origin) >= 0)
+        if not front.size:
+            return keys, dist_out, side_out, steps_out
+        side, line, lo, hi, facing = segments[front].T
+        vertical, along_origin = vertical[front], along_origin[front]
+
+        # Winkelbereich vom Ursprung aus: kürzerer Bogen zwischen den Endpunkten
+        # (liegt der Ursprung auf der Linie des Segments, alle Strahlen)
+        angle_start = np.arctan2(np.where(vertical, lo, line) - origin_y, np.where(vertical, line, lo) - origin_x)
+        angle_end = np.arctan2(np.where(vertical, hi, line) - origin_y, np.where(vertical, line, hi) - origin_x)
+        span = (angle_end - angle_start) % (2 * math.pi)
+        reverse = span > math.pi
+        first = np.where(reverse, angle_end, angle_start) - 1e-9
+        span = np.where(reverse, 2 * math.pi - span, span) + 2e-9
+        on_line = line == along_origin
+        first = np.where(on_line, -math.pi, (first + math.pi) % (2 * math.pi) - math.pi)
+        last = np.where(on_line, math.pi, first + span)
+
+        # Strahlbereiche; über +pi hinausreichende Bögen setzen bei -pi fort
+        begin = np.searchsorted(ray_angles, first)
+        stop = np.searchsorted(ray_angles, np.minimum(last, math.pi), side='right')
+        wrap_stop = np.where(last > math.pi, np.searchsorted(ray_angles, last - 2 * math.pi, side='right'), 0)
+        pair_begin = np.concatenate((begin, np.zeros_like(begin)))
+        counts = np.maximum(np.concatenate((stop, wrap_stop)) - pair_begin, 0)
+        total = int(counts.sum())
+        if not total:
+            return keys, dist_out, side_out, steps_out
+        pair_seg = np.repeat(np.tile(np.arange(front.size), 2), counts)
+        pair_pos = np.repeat(pair_begin - np.cumsum(counts) + counts, counts) + np.arange(total)
+        pair_ray = rays[pair_pos]
+
+        # Achse quer zur Fläche (along) und entlang der Fläche (across) je Paar
+        first_x, first_y, delta_x, delta_y, step_x, step_y = (values[pair_ray] for values in dda)
+        start_col, start_row = int(origin_x), int(origin_y)
+        pair_vertical = vertical[pair_seg]
+        along_dir = np.where(pair_vertical, ray_dir_x[pair_ray], ray_dir_y[pair_ray])
+        along_first, across_first = np.where(pair_vertical, first_x, first_y), np.where(pair_vertical, first_y, first_x)
+        along_delta, across_delta = np.where(pair_vertical, delta_x, delta_y), np.where(pair_vertical, delta_y, delta_x)
+        along_step, across_step = np.where(pair_vertical, step_x, step_y), np.where(pair_vertical, step_y, step_x)
+        across_start = np.where(pair_vertical, start_row, start_col)
+
+        # Anzahl Grenzen bis in die Wandzelle und Parameter der letzten Grenze (wie im DDA)
+        back = (facing < 0).astype(np.float64)
+        cell = (line - back)[pair_seg]
+        along_count = ((cell - np.where(pair_vertical, start_col, start_row)) * along_step).astype(np.intp)
+        with np.errstate(invalid='ignore'):
+            key = along_first + (along_count - 1) * along_delta
+        # Davor überquerte Grenzen der anderen Achse; bei Gleichstand kommt die y-Grenze zuerst
+        across_count = _crossings_below_batch(across_first, across_delta, np.zeros(total, dtype=np.intp), key)
+        with np.errstate(invalid='ignore'):
+            across_count += pair_vertical & (across_first + across_count * across_delta == key)
+        across_cell = across_start + across_count * across_step
+        hit = ((facing[pair_seg] * along_dir > 0) & (along_count >= 1) &
+               (across_cell >= lo[pair_seg]) & (across_cell < hi[pair_seg]))
+        key = np.where(hit, key, np.inf)
+        np.minimum.at(keys, pair_pos, key)
+
+        # Gewinner pro Strahl; bei gleichem Parameter die waagerechte Fläche (wie im DDA)
+        winners = np.flatnonzero(hit & (key == keys[pair_pos]))
+        winners = winners[np.lexsort((-side[pair_seg[winners]], pair_pos[winners]))]
+        positions, first_winner = np.unique(pair_pos[winners], return_index=True)
+        winners = winners[first_winner]
+        seg = pair_seg[winners]
+        # Entfernung wie in cast_rays_batch: (Wandzelle - Ursprung + (1 - step) / 2) / Richtung
+        dist_out[positions] = (cell[winners] - along_origin[seg] + back[seg]) / along_dir[winners]
+        side_out[positions] = side[seg]
+        steps_out[positions] = along_count[winners] + across_count[winners]
+        return keys, dist_out, side_out, steps_out
+
+
+# Projektile (die Gegner verwaltet der EnemyStore)
+bullet_pool = BulletPool()
+
+# Spielerzustand des vorherigen Ticks (für die Render-Interpolation)
+prev_player_x, prev_player_y, prev_player_angle = player_x, player_y, player_angle
+enemy_store = EnemyStore()
+flow_field = FlowField()
+path_service = PathService()
+ai_scheduler = AIScheduler()
+distance_field = DistanceField()
+wall_segments = WallSegments()
+
+# Schusssound
+shoot_sound = None
+
+# Farben
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+DARKGRAY = (60, 60, 60)
+YELLOW = (255, 255, 0)
+
+# Wandfarben für den Frame-Puffer (Index = getroffene Seite)
+WALL_COLORS = np.array([
+    (200, 200, 200),  # Weiß
+    (150, 150, 150),  # Grau (dunklere Seite)
+], dtype=np.float64)
+
+# Hilfsfunktion für Winkelberechnungen
+def normalize_angle(angle):
+    """Normalisiert einen Winkel auf den Bereich [-π, π]"""
+    while angle < -math.pi:
+        angle += 2 * math.pi
+    while angle > math.pi:
+        angle -= 2 * math.pi
+    return angle
+
+def compute_screen_x(world_x, world_y, player_x, player_y, player_angle, fov, screen_width):
+    """
+    Berechnet die X-Position auf dem Bildschirm für ein Objekt in Weltkoordinaten.
     
     Diese Funktion implementiert den Kernalgorithmus der perspektivischen Projektion
     und wird für das Debugging verwendet, um die korrekte Projektion zu überprüfen.
@@ -507,11 +2053,70 @@ def compute_screen_x(world_x, world_y, player_x, player_y, player_angle, fov, sc
     return screen_x, rel_angle
 
 
+def project_sprites(world_x, world_y, origin_x, origin_y, view_angle):
+    """
+    Vektorisierte Sprite-Projektion für alle Gegner und Schüsse eines Frames.
+
+    Parameter:
+    - world_x, world_y: NumPy-Arrays mit den Weltpositionen der Sprites
+    - origin_x, origin_y: Position des Betrachters
+    - view_angle: Blickwinkel des Betrachters (in Radiant)
+
+    Rückgabe:
+    - order: Indizes der Sprites im Sichtfeld, von hinten nach vorne sortiert
+    - dist, rel_angle, dx, dy: Arrays über alle Sprites (ungefiltert)
+    """
+    dx = world_x - origin_x
+    dy = world_y - origin_y
+    dist = np.hypot(dx, dy)
+
+    # Relativer Winkel zur Kamera, in einem Schritt auf [-π, π) normalisiert
+    rel_angle = np.arctan2(dy, dx) - view_angle
+    rel_angle = (rel_angle + math.pi) % (2 * math.pi) - math.pi
+
+    # Nur Sprites im exakten Sichtfeld, entfernte zuerst (Painter's Algorithm)
+    in_fov = np.flatnonzero(np.abs(rel_angle) < HALF_FOV)
+    order = in_fov[np.argsort(-dist[in_fov], kind='stable')]
+    return order, dist, rel_angle, dx, dy
+
+
 def cast_ray(angle):
     """
     Erweiterte Version des Raycasting-Algorithmus mit größerer Sichtdistanz
     und verbesserter Leistung.
     """
+    wall_dist, side, _, _ = trace_ray(angle)
+    return wall_dist, side
+
+
+def _crossings_below(first, delta, count, limit):
+    """
+    Anzahl der Gittergrenzen mit Parameter first + i * delta < limit (mindestens
+    count), mit genau denselben Gleitkommawerten wie die DDA-Schleife.
+    """
+    if not first + count * delta < limit:  # Auch für delta = inf (nan-Vergleich)
+        return count
+    crossings = max(count + 1, math.ceil((limit - first) / delta))
+    # Rundung der Division korrigieren
+    if first + (crossings - 1) * delta >= limit:
+        crossings -= 1
+    elif first + crossings * delta < limit:
+        crossings += 1
+    return crossings
+
+
+def trace_ray(angle):
+    """
+    DDA-Kern von cast_ray, liefert zusätzlich die getroffene Map-Zelle.
+
+    Rückgabe: (wall_dist, side, map_x, map_y) - map_x/map_y sind None,
+    wenn keine Wand getroffen wurde (DEPTH).
+
+    Mit RAY_SKIP_EMPTY springt der Strahl über freie Quadrate des
+    Distanzfelds; übersprungene Zellen zählen als DDA-Schritte. Treffer
+    sind identisch, nur bei DEPTH nach MAX_RAY_STEPS kann der letzte
+    Sprung über die Grenze hinausgehen und eine andere Seite melden.
+    """
     # Richtungsvektor des Strahls
     ray_dir_x = math.cos(angle)
     ray_dir_y = math.sin(angle)
@@ -541,18 +2146,32 @@ def cast_ray(angle):
     # DDA Algorithmus mit Verbesserungen
     hit = 0
     side = 0  # x = 0, y = 1
-    max_steps = 500  # EXTREM erhöhte maximale Anzahl von Schritten für enorme Sichtweite!
+    max_steps = MAX_RAY_STEPS  # EXTREM erhöhte maximale Anzahl von Schritten für enorme Sichtweite!
     steps = 0
-    
+
+    # Grenzparameter werden immer als first + count * delta gebildet (nicht
+    # aufsummiert), damit Sprünge exakt dieselben Entscheidungen treffen
+    first_x, first_y = side_dist_x, side_dist_y
+    count_x = count_y = 0
+
+    field = None
+    if RAY_SKIP_EMPTY:
+        distance_field.sync()
+        field = distance_field
+        shift, mask, chunks_x = field.shift, field.mask, field.chunks_x
+        tile_key, tile = field._last_key, field._last_tile
+
     # Schleife mit erhöhter maximaler Schrittanzahl
     while hit == 0 and steps < max_steps:
         # Nächster Schritt in X oder Y-Richtung
         if side_dist_x < side_dist_y:
-            side_dist_x += delta_dist_x
+            count_x += 1
+            side_dist_x = first_x + count_x * delta_dist_x
             map_x += step_x
             side = 0
         else:
-            side_dist_y += delta_dist_y
+            count_y += 1
+            side_dist_y = first_y + count_y * delta_dist_y
             map_y += step_y
             side = 1
         
@@ -560,85 +2179,1586 @@ def cast_ray(angle):
         
         # Prüfen ob außerhalb der Karte (betrachte dies als einen "Hit" am Rand des Universums)
         if not (0 <= map_x < MAP_SIZE and 0 <= map_y < MAP_SIZE):
-            return DEPTH, side  # Strahl geht ins Nirgendwo
+            return DEPTH, side, None, None  # Strahl geht ins Nirgendwo
+        
+        if field is None:
+            # Prüfen ob Strahl eine Wand getroffen hat
+            if game_map.cell(map_x, map_y) > 0:
+                hit = 1
+            continue
+
+        # Distanzfeld: 0 = Wand, sonst freies Quadrat mit Radius free - 1
+        # (Kachelzugriff wie TileGrid.cell, hier ohne Methodenaufruf pro Schritt)
+        key = (map_y >> shift) * chunks_x + (map_x >> shift)
+        if key != tile_key:
+            tile = memoryview(field.chunk(map_x >> shift, map_y >> shift).reshape(-1))
+            tile_key = field._last_key = key
+            field._last_tile = tile
+        free = tile[((map_y & mask) << shift) | (map_x & mask)]
+        if free == 0:
+            hit = 1
+        elif free >= RAY_SKIP_MIN_DISTANCE:
+            # Alle Grenzen vor dem Verlassen des freien Quadrats auf einmal überqueren
+            reach = free - 1
+            exit_dist = min(first_x + (count_x + reach) * delta_dist_x,
+                            first_y + (count_y + reach) * delta_dist_y)
+            new_x = _crossings_below(first_x, delta_dist_x, count_x, exit_dist)
+            new_y = _crossings_below(first_y, delta_dist_y, count_y, exit_dist)
+            if new_x > count_x and new_y > count_y:
+                # Seite der zuletzt überquerten Grenze (bei Gleichstand kommt x zuletzt)
+                side = 1 if first_y + (new_y - 1) * delta_dist_y > first_x + (new_x - 1) * delta_dist_x else 0
+            else:
+                side = 0 if new_x > count_x else 1
+            map_x += (new_x - count_x) * step_x
+            map_y += (new_y - count_y) * step_y
+            steps += new_x - count_x + new_y - count_y
+            count_x, count_y = new_x, new_y
+            side_dist_x = first_x + count_x * delta_dist_x if count_x else first_x
+            side_dist_y = first_y + count_y * delta_dist_y if count_y else first_y
+    
+    # Wenn kein Treffer gefunden wurde, gib maximale Entfernung zurück
+    if hit == 0:
+        return DEPTH, side, None, None
+    
+    # Berechne die exakte Entfernung zur getroffenen Wand
+    if side == 0:  # X-Seite getroffen
+        wall_dist = (map_x - player_x + (1 - step_x) / 2) / ray_dir_x
+    else:  # Y-Seite getroffen
+        wall_dist = (map_y - player_y + (1 - step_y) / 2) / ray_dir_y
+    
+    # Distanz begrenzen auf vernünftige Werte
+    wall_dist = min(wall_dist, DEPTH)
+
+    return wall_dist, side, map_x, map_y
+
+
+def _crossings_below_batch(first, delta, count, limit):
+    """Vektorisierte Variante von _crossings_below"""
+    with np.errstate(invalid='ignore', divide='ignore'):
+        crossings = np.ceil((limit - first) / delta)
+        crossings = np.where(crossings > count, crossings, count).astype(np.intp)  # nan -> count
+        # Rundung der Division korrigieren
+        crossings = np.where((crossings > count) & (first + (crossings - 1) * delta >= limit),
+                             crossings - 1, crossings)
+        crossings = np.where(first + crossings * delta < limit, crossings + 1, crossings)
+    return crossings
+
+
+def cast_rays_batch(origin_x, origin_y, angles, directions=None):
+    """
+    Vektorisierte Variante von cast_ray: Alle Strahlen werden gemeinsam
+    Schritt für Schritt mit NumPy-Masken durch die Karte geführt.
+
+    Die Semantik entspricht exakt cast_ray (DEPTH bei Verlassen der Karte
+    oder nach MAX_RAY_STEPS Schritten ohne Treffer), einschließlich des
+    Überspringens freier Bereiche mit RAY_SKIP_EMPTY.
+
+    Parameter:
+    - origin_x, origin_y: Startpunkt der Strahlen (Spielerposition)
+    - angles: Array mit den absoluten Strahlwinkeln (in Radiant), darf None sein,
+      wenn directions angegeben ist
+    - directions: Optional vorberechnete Richtungsvektoren (ray_dir_x, ray_dir_y),
+      z.B. aus Camera.ray_directions - spart cos/sin pro Strahl
+
+    Rückgabe:
+    - distances: Array mit den Wandentfernungen (float64)
+    - sides: Array mit der getroffenen Seite (0 = x, 1 = y)
+    """
+    # Richtungsvektoren aller Strahlen
+    if directions is None:
+        angles = np.asarray(angles, dtype=np.float64)
+        ray_dir_x = np.cos(angles)
+        ray_dir_y = np.sin(angles)
+    else:
+        ray_dir_x = np.array(directions[0], dtype=np.float64)
+        ray_dir_y = np.array(directions[1], dtype=np.float64)
+
+    num = ray_dir_x.size
+    distances = np.full(num, float(DEPTH))
+    sides = np.zeros(num, dtype=np.intp)
+
+    # Alle Strahlen starten in der Map-Zelle des Spielers
+    start_x, start_y = int(origin_x), int(origin_y)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta_dist_x = np.where(ray_dir_x == 0, np.inf, np.abs(1.0 / ray_dir_x))
+        delta_dist_y = np.where(ray_dir_y == 0, np.inf, np.abs(1.0 / ray_dir_y))
+
+        # Schrittrichtung und Entfernung zur ersten x- bzw. y-Grenze
+        neg_x = ray_dir_x < 0
+        neg_y = ray_dir_y < 0
+        step_x = np.where(neg_x, -1, 1)
+        step_y = np.where(neg_y, -1, 1)
+        side_dist_x = np.where(neg_x, (origin_x - start_x) * delta_dist_x,
+                               (start_x + 1.0 - origin_x) * delta_dist_x)
+        side_dist_y = np.where(neg_y, (origin_y - start_y) * delta_dist_y,
+                               (start_y + 1.0 - origin_y) * delta_dist_y)
+
+    # Zustand der noch laufenden Strahlen (wird jede Runde verdichtet).
+    # Grenzparameter werden wie in trace_ray immer als first + count * delta gebildet
+    active = np.arange(num)
+    first_x, first_y = side_dist_x.copy(), side_dist_y.copy()
+    count_x = np.zeros(num, dtype=np.intp)  # Anzahl überquerter x- bzw. y-Grenzen
+    count_y = np.zeros(num, dtype=np.intp)
+    side = np.zeros(num, dtype=np.intp)
+    if RAY_SKIP_EMPTY:
+        distance_field.sync()
+
+    while active.size:
+        # Nächster Schritt in X- oder Y-Richtung für alle Strahlen gleichzeitig
+        take_x = side_dist_x < side_dist_y
+        take_y = ~take_x
+        count_x += take_x
+        count_y += take_y
+        with np.errstate(invalid='ignore'):  # count * inf in nicht genutzten Zweigen
+            side_dist_x = np.where(take_x, first_x + count_x * delta_dist_x, side_dist_x)
+            side_dist_y = np.where(take_y, first_y + count_y * delta_dist_y, side_dist_y)
+        map_x = start_x + count_x * step_x
+        map_y = start_y + count_y * step_y
+        side = take_y.astype(np.intp)
+
+        # Außerhalb der Karte: DEPTH bleibt als Entfernung stehen
+        outside = (map_x < 0) | (map_x >= MAP_SIZE) | (map_y < 0) | (map_y >= MAP_SIZE)
+
+        # Wandtreffer nur für Strahlen innerhalb der Karte prüfen
+        hit = np.zeros(active.size, dtype=bool)
+        inside = ~outside
+        if RAY_SKIP_EMPTY:
+            free = np.zeros(active.size, dtype=np.intp)
+            free[inside] = distance_field.gather(map_y[inside], map_x[inside])
+            hit[inside] = free[inside] == 0
+        else:
+            hit[inside] = game_map.gather(map_y[inside], map_x[inside]) > 0
+
+        if hit.any():
+            hit_x = hit & take_x
+            hit_y = hit & take_y
+            wall_dist = np.empty(active.size)
+            wall_dist[hit_x] = ((map_x[hit_x] - origin_x + (1 - step_x[hit_x]) / 2)
+                                / ray_dir_x[hit_x])
+            wall_dist[hit_y] = ((map_y[hit_y] - origin_y + (1 - step_y[hit_y]) / 2)
+                                / ray_dir_y[hit_y])
+            distances[active[hit]] = np.minimum(wall_dist[hit], DEPTH)
+
+        done = outside | hit
+        if RAY_SKIP_EMPTY:
+            # Alle Grenzen vor dem Verlassen des freien Quadrats auf einmal überqueren
+            skipping = np.flatnonzero(~done & (free >= RAY_SKIP_MIN_DISTANCE))
+            if skipping.size:
+                reach = free[skipping] - 1
+                fx, fy = first_x[skipping], first_y[skipping]
+                ddx, ddy = delta_dist_x[skipping], delta_dist_y[skipping]
+                cx, cy = count_x[skipping], count_y[skipping]
+                exit_dist = np.minimum(fx + (cx + reach) * ddx, fy + (cy + reach) * ddy)
+                new_x = _crossings_below_batch(fx, ddx, cx, exit_dist)
+                new_y = _crossings_below_batch(fy, ddy, cy, exit_dist)
+                moved_x, moved_y = new_x > cx, new_y > cy
+
+                # Seite der zuletzt überquerten Grenze (bei Gleichstand kommt x zuletzt)
+                with np.errstate(invalid='ignore'):
+                    last_x = fx + (new_x - 1) * ddx
+                    last_y = fy + (new_y - 1) * ddy
+                    side[skipping] = np.where(moved_x & moved_y, last_y > last_x, moved_y)
+                    side_dist_x[skipping] = np.where(moved_x, fx + new_x * ddx, side_dist_x[skipping])
+                    side_dist_y[skipping] = np.where(moved_y, fy + new_y * ddy, side_dist_y[skipping])
+                count_x[skipping], count_y[skipping] = new_x, new_y
+                map_x[skipping] = start_x + new_x * step_x[skipping]
+                map_y[skipping] = start_y + new_y * step_y[skipping]
+
+        # Strahlen ohne Treffer nach MAX_RAY_STEPS: DEPTH mit zuletzt getroffener Seite
+        done |= count_x + count_y >= MAX_RAY_STEPS
+        sides[active[done]] = side[done]
+
+        # Beendete Strahlen aus dem aktiven Satz entfernen
+        keep = ~done
+        active = active[keep]
+        side_dist_x, side_dist_y = side_dist_x[keep], side_dist_y[keep]
+        first_x, first_y = first_x[keep], first_y[keep]
+        count_x, count_y = count_x[keep], count_y[keep]
+        delta_dist_x, delta_dist_y = delta_dist_x[keep], delta_dist_y[keep]
+        step_x, step_y = step_x[keep], step_y[keep]
+        ray_dir_x, ray_dir_y = ray_dir_x[keep], ray_dir_y[keep]
+
+    return distances, sides
+
+
+def cast_rays_segments(origin_x, origin_y, angles, directions=None):
+    """
+    Gleiche Schnittstelle und Rückgabe wie cast_rays_batch, aber die Strahlen
+    werden mit den zusammengefassten Wandflächen (wall_segments) geschnitten
+    statt Zelle für Zelle durch das Raster geführt. Die Kosten hängen damit
+    von der Zahl der Wandflächen in Sichtrichtung ab, nicht von der Entfernung.
+    """
+    if directions is None:
+        angles = np.asarray(angles, dtype=np.float64)
+        ray_dir_x, ray_dir_y = np.cos(angles), np.sin(angles)
+    else:
+        ray_dir_x = np.asarray(directions[0], dtype=np.float64)
+        ray_dir_y = np.asarray(directions[1], dtype=np.float64)
+    return wall_segments.cast(origin_x, origin_y, ray_dir_x, ray_dir_y)
+
+
+def sweep_walls(origin_x, origin_y, dir_x, dir_y, max_dist):
+    """
+    DDA für viele kurze Strecken mit jeweils eigenem Startpunkt (z.B. Kugeln).
+
+    Jede Strecke wird Zellgrenze für Zellgrenze bis max_dist verfolgt; die
+    Startzelle selbst wird nicht geprüft. Außerhalb der Karte zählt als Wand.
+
+    Rückgabe:
+    - distances: Abstand bis zur ersten Wand bzw. max_dist ohne Treffer
+    - hit: True, wenn die Strecke vorher auf eine Wand trifft
+    """
+    origin_x = np.asarray(origin_x, dtype=np.float64)
+    origin_y = np.asarray(origin_y, dtype=np.float64)
+    max_dist = np.broadcast_to(np.asarray(max_dist, dtype=np.float64), origin_x.shape)
+    distances = max_dist.copy()
+    hit = np.zeros(origin_x.shape, dtype=bool)
+
+    map_x = np.floor(origin_x).astype(np.intp)
+    map_y = np.floor(origin_y).astype(np.intp)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        delta_dist_x = np.where(dir_x == 0, np.inf, np.abs(1.0 / dir_x))
+        delta_dist_y = np.where(dir_y == 0, np.inf, np.abs(1.0 / dir_y))
+        neg_x = dir_x < 0
+        neg_y = dir_y < 0
+        step_x = np.where(neg_x, -1, 1)
+        step_y = np.where(neg_y, -1, 1)
+        side_dist_x = np.where(neg_x, (origin_x - map_x) * delta_dist_x,
+                               (map_x + 1.0 - origin_x) * delta_dist_x)
+        side_dist_y = np.where(neg_y, (origin_y - map_y) * delta_dist_y,
+                               (map_y + 1.0 - origin_y) * delta_dist_y)
+
+    active = np.arange(origin_x.size)
+    limit = max_dist[active]
+    while active.size:
+        # Nächste Zellgrenze; liegt sie hinter dem Streckenende, ist die Strecke frei
+        take_x = side_dist_x < side_dist_y
+        crossing = np.where(take_x, side_dist_x, side_dist_y)
+        running = crossing < limit
+
+        map_x = np.where(take_x, map_x + step_x, map_x)
+        map_y = np.where(take_x, map_y, map_y + step_y)
+        side_dist_x = np.where(take_x, side_dist_x + delta_dist_x, side_dist_x)
+        side_dist_y = np.where(take_x, side_dist_y, side_dist_y + delta_dist_y)
+
+        outside = (map_x < 0) | (map_x >= MAP_SIZE) | (map_y < 0) | (map_y >= MAP_SIZE)
+        wall = outside.copy()
+        inside = running & ~outside
+        wall[inside] = game_map.gather(map_y[inside], map_x[inside]) > 0
+        wall &= running
+        distances[active[wall]] = crossing[wall]
+        hit[active[wall]] = True
+
+        keep = running & ~wall
+        active = active[keep]
+        limit = limit[keep]
+        map_x, map_y = map_x[keep], map_y[keep]
+        side_dist_x, side_dist_y = side_dist_x[keep], side_dist_y[keep]
+        delta_dist_x, delta_dist_y = delta_dist_x[keep], delta_dist_y[keep]
+        step_x, step_y = step_x[keep], step_y[keep]
+
+    return distances, hit
+
+
+def _segments_hit_boxes(start_x, start_y, dir_x, dir_y, x0, x1, y0, y1):
+    """True, wenn die Strecke start + t * dir (0 <= t <= 1) das Innere des Rechtecks schneidet"""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        enter = np.zeros(start_x.shape)
+        leave = np.ones(start_x.shape)
+        for start, direction, lo, hi in ((start_x, dir_x, x0, x1), (start_y, dir_y, y0, y1)):
+            t_lo, t_hi = (lo - start) / direction, (hi - start) / direction
+            inside = (lo < start) & (start < hi)  # Für Strecken parallel zur Achse
+            parallel = direction == 0
+            enter = np.maximum(enter, np.where(parallel, np.where(inside, -np.inf, np.inf),
+                                               np.minimum(t_lo, t_hi)))
+            leave = np.minimum(leave, np.where(parallel, np.where(inside, np.inf, -np.inf),
+                                               np.maximum(t_lo, t_hi)))
+    return enter < leave
+
+
+def _sight_lines(walls, walls_row, walls_col, start_x, start_y, target_x, target_y, margin=0.0):
+    """
+    Sichtlinien-Test auf dem dichten Wandausschnitt `walls` (linke obere Ecke
+    walls_row, walls_col): True, wenn die Strecke vom Start- zum Zielpunkt
+    keine Wand schneidet, bevor sie die Zielzelle erreicht. Die Zielzelle
+    selbst darf eine Wand sein (ihre Fläche ist dann sichtbar) und zählt für
+    ihre Nachbarn als frei.
+
+    Die Wände werden um `margin` geschrumpft: Seiten zu freien Zellen rücken
+    um margin nach innen, die Ecken werden um margin x margin gekappt. Jede
+    Strecke, die höchstens margin von einer freien Strecke abweicht, kommt
+    damit ebenfalls durch. `walls` muss dafür auch die Nachbarn aller Zellen
+    im Rechteck zwischen Start- und Zielzelle enthalten.
+
+    Anders als ein Strahl aus cast_rays_batch endet der Weg immer nach
+    |Spaltendifferenz| + |Zeilendifferenz| Schritten in der Zielzelle und
+    bleibt im Rechteck zwischen Start- und Zielzelle.
+    """
+    col, row = np.floor(start_x).astype(np.intp), np.floor(start_y).astype(np.intp)
+    target_col, target_row = np.floor(target_x).astype(np.intp), np.floor(target_y).astype(np.intp)
+    step_x, step_y = np.sign(target_col - col), np.sign(target_row - row)
+    remaining = np.abs(target_col - col) + np.abs(target_row - row)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        dir_x, dir_y = target_x - start_x, target_y - start_y
+        delta_x = np.where(dir_x == 0, np.inf, np.abs(1.0 / dir_x))
+        delta_y = np.where(dir_y == 0, np.inf, np.abs(1.0 / dir_y))
+        side_x = np.where(step_x < 0, (start_x - col) * delta_x, (col + 1.0 - start_x) * delta_x)
+        side_y = np.where(step_y < 0, (start_y - row) * delta_y, (row + 1.0 - start_y) * delta_y)
+
+    visible = np.ones(start_x.size, dtype=bool)
+    active = np.flatnonzero(remaining > 1)  # Ein Schritt führt direkt in die Zielzelle
+    state = [a[active] for a in (col, row, target_col, target_row, step_x, step_y,
+                                 delta_x, delta_y, side_x, side_y, remaining,
+                                 start_x, start_y, dir_x, dir_y)]
+    (col, row, target_col, target_row, step_x, step_y, delta_x, delta_y, side_x, side_y, remaining,
+     start_x, start_y, dir_x, dir_y) = state
+    while active.size:
+        # Bei Gleichstand zuerst die y-Grenze (wie im DDA), nie über die Zielspalte/-zeile hinaus
+        take_x = (col != target_col) & ((row == target_row) | (side_x < side_y))
+        col += take_x * step_x
+        row += ~take_x * step_y
+        side_x = np.where(take_x, side_x + delta_x, side_x)
+        side_y = np.where(take_x, side_y, side_y + delta_y)
+        remaining -= 1
+
+        blocked = walls[row - walls_row, col - walls_col] != 0
+        if margin > 0 and blocked.any():
+            hit = np.flatnonzero(blocked)
+            c, r, tc, tr = col[hit], row[hit], target_col[hit], target_row[hit]
+
+            def free(dc, dr):
+                """Nachbar frei (oder Zielzelle): diese Seite der Wand wird geschrumpft"""
+                return margin * ((walls[r + dr - walls_row, c + dc - walls_col] == 0)
+                                 | ((c + dc == tc) & (r + dr == tr)))
+
+            segment = (start_x[hit], start_y[hit], dir_x[hit], dir_y[hit])
+            # Geschrumpfte Wand mit gekappten Ecken = waagrechter und senkrechter Balken
+            blocked[hit] = (_segments_hit_boxes(*segment, c + free(-1, 0), c + 1 - free(1, 0),
+                                                r + margin, r + 1 - margin)
+                            | _segments_hit_boxes(*segment, c + margin, c + 1 - margin,
+                                                  r + free(0, -1), r + 1 - free(0, 1)))
+        visible[active[blocked]] = False
+        keep = ~blocked & (remaining > 1)
+        active = active[keep]
+        col, row, target_col, target_row = col[keep], row[keep], target_col[keep], target_row[keep]
+        step_x, step_y, delta_x, delta_y = step_x[keep], step_y[keep], delta_x[keep], delta_y[keep]
+        side_x, side_y, remaining = side_x[keep], side_y[keep], remaining[keep]
+        start_x, start_y, dir_x, dir_y = start_x[keep], start_y[keep], dir_x[keep], dir_y[keep]
+    return visible
+
+
+def compute_cells_visibility(cols, rows, radius, samples, walls, walls_row, walls_col):
+    """
+    Sichtbarkeit im Umkreis `radius` für mehrere Ursprungszellen auf einmal.
+
+    Eine Zelle gilt als sichtbar, wenn irgendeine Strecke von einem Punkt der
+    Ursprungszelle zu einem Punkt der Zelle frei ist. Geprüft werden die
+    Strecken zwischen samples x samples Rasterpunkten beider Zellen: jeder
+    Punkt einer Zelle liegt höchstens margin = sqrt(2) / (2 * samples) vom
+    nächsten Rasterpunkt entfernt, jede freie Strecke also höchstens margin
+    von einer Rasterstrecke. Gegen um margin geschrumpfte Wände getestet
+    (_sight_lines) ist das Ergebnis daher konservativ - Culling verwirft
+    nichts, was von irgendwo in der Ursprungszelle sichtbar ist. Dafür
+    gelten Zellen hinter zwei sich nur an einer Ecke berührenden Wänden
+    meist als sichtbar.
+
+    Die Punktpaare werden nacheinander geprüft, schon gesehene Zellen fallen
+    jeweils heraus. `walls` muss alle Zellen im Umkreis radius + 1 enthalten
+    (außerhalb der Karte Wand).
+
+    Rückgabe: bool-Array (Anzahl Zellen, 2 * radius + 1, 2 * radius + 1),
+    jeweils um die Ursprungszelle zentriert und nicht auf die Karte beschnitten.
+    """
+    cols = np.asarray(cols, dtype=np.intp)
+    rows = np.asarray(rows, dtype=np.intp)
+    grid = (np.arange(samples) + 0.5) / samples
+    offsets = [(x, y) for y in grid.tolist() for x in grid.tolist()]
+    margin = math.sqrt(2) / (2 * samples)
+    side = 2 * radius + 1
+    d_row, d_col = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+    target_row = rows[:, None] + d_row.ravel()
+    target_col = cols[:, None] + d_col.ravel()
+
+    # Erst ein Punktpaar für alle Zellen (in offenen Bereichen genügt das meist), dann
+    # die übrigen Paare in zwei Gruppen, jeweils nur für die noch nicht gesehenen Zellen
+    pairs = np.array([offset + sample for offset in offsets for sample in offsets])
+    seen = np.zeros(target_row.shape, dtype=bool)
+    for group in (pairs[:1], pairs[1:4], pairs[4:]):
+        cell, target = np.nonzero(~seen)
+        if not cell.size or not len(group):
+            break
+        offset_x, offset_y, sample_x, sample_y = group.T
+        clear = _sight_lines(walls, walls_row, walls_col,
+                             (cols[cell, None] + offset_x).ravel(), (rows[cell, None] + offset_y).ravel(),
+                             (target_col[cell, target, None] + sample_x).ravel(),
+                             (target_row[cell, target, None] + sample_y).ravel(), margin)
+        seen[cell, target] = clear.reshape(-1, len(group)).any(axis=1)
+    return seen.reshape(-1, side, side)
+
+
+def compute_cell_visibility(origin_col, origin_row, radius, samples):
+    """
+    Zellen im Umkreis `radius` um (origin_col, origin_row), die von irgendeinem
+    Punkt der Ursprungszelle aus sichtbar sind (compute_cells_visibility
+    für eine Zelle). Rückgabe: (visible, row_lo, col_lo) - ein auf die Karte
+    beschnittenes bool-Fenster und seine linke obere Ecke.
+    """
+    top, left = origin_row - radius, origin_col - radius
+    walls = game_map.window(top - 1, origin_row + radius + 2, left - 1, origin_col + radius + 2)
+    visible = compute_cells_visibility([origin_col], [origin_row], radius, samples,
+                                       walls, top - 1, left - 1)[0]
+
+    rows, cols = game_map.shape
+    row_lo, row_hi = max(0, top), min(rows, origin_row + radius + 1)
+    col_lo, col_hi = max(0, left), min(cols, origin_col + radius + 1)
+    return visible[row_lo - top:row_hi - top, col_lo - left:col_hi - left], row_lo, col_lo
+
+
+class VisibilityField:
+    """
+    Sichtbarkeitsfeld "von der Zelle des Spielers aus sichtbar" auf dem Kartengitter.
+
+    Gespeichert wird nur das Fenster im Umkreis `radius` um die Spielerzelle
+    (Ursprung row_lo/col_lo), Zellen außerhalb gelten als nicht sichtbar.
+
+    Pro Spielerzelle wird das Fenster aus dem vorberechneten PVS entpackt
+    (falls eines zur aktuellen Karte passt) oder mit compute_cell_visibility
+    berechnet. Danach sind Wahrnehmungsprüfungen der KI, die Sprite-Vorauswahl
+    des Renderers und die Minimap reine Array-Lookups.
+    """
+
+    # Stichprobenpunkte pro Zellseite (Raster SAMPLES x SAMPLES, siehe compute_cells_visibility)
+    SAMPLES = 2
+
+    def __init__(self, radius=VISIBILITY_RADIUS):
+        self.radius = radius
+        self.key = None
+        self.visible = None  # Zelle (oder ihre Wandfläche) ist von der Spielerzelle aus sichtbar
+        self.visible_near = None  # visible, um eine Zelle erweitert (für Sprites mit Ausdehnung)
+        self.row_lo = 0  # Weltzelle der linken oberen Ecke des Fensters
+        self.col_lo = 0
+
+    def update(self, origin_x, origin_y):
+        """Berechnet das Feld neu, falls Spielerzelle oder Karte sich geändert haben"""
+        rows, cols = game_map.shape
+        origin_col = min(cols - 1, max(0, int(origin_x)))
+        origin_row = min(rows - 1, max(0, int(origin_y)))
+        key = (origin_col, origin_row, game_map.version, game_map.shape)
+        if key == self.key:
+            return False
+        self.key = key
+
+        window = None
+        pvs = potentially_visible_set
+        if pvs is not None and pvs.radius == self.radius and pvs.matches(game_map):
+            window = pvs.cell_window(origin_col, origin_row)
+        if window is None:  # Kein passendes PVS oder Spieler steckt in einer Wand
+            window = compute_cell_visibility(origin_col, origin_row, self.radius, self.SAMPLES)
+        visible, self.row_lo, self.col_lo = window
+        self.visible = visible
+
+        near = visible.copy()
+        near[1:, :] |= visible[:-1, :]
+        near[:-1, :] |= visible[1:, :]
+        near[:, 1:] |= near[:, :-1].copy()
+        near[:, :-1] |= near[:, 1:].copy()
+        self.visible_near = near
+        return True
+
+    def lookup(self, x, y, near=False):
+        """O(1)-Abfrage für Positionen (Skalar oder Arrays): liegt die Zelle im Sichtfeld?"""
+        field = self.visible_near if near else self.visible
+        rows, cols = field.shape
+        col = np.asarray(x).astype(np.intp) - self.col_lo
+        row = np.asarray(y).astype(np.intp) - self.row_lo
+        return self.covers(x, y) & field[np.clip(row, 0, rows - 1), np.clip(col, 0, cols - 1)]
+
+    def covers(self, x, y):
+        """Liegt die Zelle im gespeicherten Fenster? Außerhalb sagt das Feld nichts über Sichtbarkeit"""
+        rows, cols = self.visible.shape
+        col = np.asarray(x).astype(np.intp) - self.col_lo
+        row = np.asarray(y).astype(np.intp) - self.row_lo
+        return (col >= 0) & (col < cols) & (row >= 0) & (row < rows)
+
+
+class PotentiallyVisibleSet:
+    """
+    Vorberechnete Sichtbarkeit (PVS) für jede freie Zelle der Karte.
+
+    Pro Zelle wird das Ergebnis von compute_cell_visibility als Bitfeld
+    (2 * radius + 1)^2 um die Zelle gespeichert, mit np.packbits gepackt und
+    mit zlib komprimiert. `offsets[i]:offsets[i + 1]` ist der Eintrag der
+    Zelle i = row * width + col in `data`, Wände haben leere Einträge.
+
+    Dateiformat (.pvs neben der Kartendatei): 32 Byte Kopf (MAGIC, Breite,
+    Höhe, Radius, CRC32 und Größe der Kartendatei), danach offsets (uint64)
+    und data. Beides wird per memmap
+    gelesen, der Speicherbedarf bleibt auch bei großen Karten gering.
+    """
+
+    MAGIC = b"DOOMPPVS"
+    HEADER = np.dtype([('magic', 'S8'), ('width', '<u4'), ('height', '<u4'),
+                       ('radius', '<u4'), ('level_crc', '<u4'), ('level_size', '<u8')])
+
+    def __init__(self, width, height, radius, offsets, data, source=None, fingerprint=(0, 0)):
+        self.width = width
+        self.height = height
+        self.radius = radius
+        self.fingerprint = fingerprint  # (CRC32, Größe) der Kartendatei, (0, 0) ohne Datei
+        self.side = 2 * radius + 1
+        self.offsets = offsets
+        self.data = data
+        self.bind(source)
+
+    def bind(self, source):
+        """Ordnet das PVS einer Karte in ihrem aktuellen Zustand zu"""
+        self.source = source
+        self.version = None if source is None else source.version
+
+    def matches(self, level):
+        """True, wenn das PVS zu dieser Karte gehört und sie seitdem nicht geändert wurde"""
+        return level is self.source and level.version == self.version
+
+    def cell_window(self, col, row):
+        """Sichtbare Zellen um (col, row) wie compute_cell_visibility, None für Wandzellen"""
+        index = row * self.width + col
+        start, stop = int(self.offsets[index]), int(self.offsets[index + 1])
+        if start == stop:
+            return None
+        bits = np.frombuffer(zlib.decompress(bytes(self.data[start:stop])), dtype=np.uint8)
+        visible = np.unpackbits(bits, count=self.side * self.side).reshape(self.side, self.side)
+        # Auf die Karte beschneiden (das Bitfeld ist immer um die Zelle zentriert)
+        row_lo, col_lo = max(0, row - self.radius), max(0, col - self.radius)
+        row_hi = min(self.height, row + self.radius + 1)
+        col_hi = min(self.width, col + self.radius + 1)
+        top, left = row_lo - (row - self.radius), col_lo - (col - self.radius)
+        visible = visible[top:top + row_hi - row_lo, left:left + col_hi - col_lo].astype(bool)
+        return visible, row_lo, col_lo
+
+    @classmethod
+    def build(cls, radius=VISIBILITY_RADIUS, workers=0, rows_per_task=PVS_ROWS_PER_TASK, path=None):
+        """
+        Berechnet das PVS für game_map. workers > 0 verteilt Zeilenblöcke auf
+        so viele Prozesse (die Worker öffnen die Kartendatei bzw. bekommen
+        eine Kopie der dichten Karte), 0 rechnet im Hauptprozess.
+
+        Jeder fertige Zeilenblock wird sofort geschrieben, im Speicher liegt
+        nie mehr als ein Block. Mit `path` entsteht die PVS-Datei (danach
+        per memmap geöffnet), sonst ein Puffer im Speicher.
+        """
+        height, width = game_map.shape
+        tasks = [(row, min(row + rows_per_task, height), radius)
+                 for row in range(0, height, rows_per_task)]
+        header = np.zeros(1, dtype=cls.HEADER)
+        header['magic'] = cls.MAGIC
+        header['width'], header['height'], header['radius'] = width, height, radius
+        fingerprint = game_map.fingerprint() if isinstance(game_map, ChunkedMap) else (0, 0)
+        header['level_crc'], header['level_size'] = fingerprint
+        data_start = cls.HEADER.itemsize + (width * height + 1) * 8
+
+        with (open(path + ".tmp", 'wb') if path else io.BytesIO()) as f:
+            f.write(header.tobytes())
+            size = 0
+            for (row_start, row_stop, _), blobs in zip(tasks, _pvs_build_bands(tasks, workers)):
+                lengths = np.fromiter(map(len, blobs), dtype=np.uint64, count=len(blobs))
+                offsets = size + np.cumsum(lengths, dtype=np.uint64) - lengths
+                f.seek(cls.HEADER.itemsize + row_start * width * 8)
+                f.write(offsets.astype('<u8').tobytes())
+                f.seek(data_start + size)
+                f.write(b"".join(blobs))
+                size += int(lengths.sum())
+            f.seek(data_start - 8)
+            f.write(np.array([size], dtype='<u8').tobytes())
+            if not path:
+                buffer = np.frombuffer(f.getvalue(), dtype=np.uint8)
+
+        if path:
+            os.replace(path + ".tmp", path)
+            return cls.load(path, source=game_map)
+        offsets = buffer[cls.HEADER.itemsize:data_start].view('<u8')
+        return cls(width, height, radius, offsets, buffer[data_start:], source=game_map,
+                   fingerprint=fingerprint)
+
+    @classmethod
+    def load(cls, path, source=None):
+        """Öffnet eine PVS-Datei per memmap und ordnet sie der Karte `source` zu"""
+        header = np.fromfile(path, dtype=cls.HEADER, count=1)
+        if len(header) == 0 or header[0]['magic'] != cls.MAGIC:
+            raise ValueError(f"{path} ist keine DooMP-PVS-Datei")
+        width, height = int(header[0]['width']), int(header[0]['height'])
+        offsets = np.memmap(path, dtype='<u8', mode='r', offset=cls.HEADER.itemsize,
+                            shape=(width * height + 1,))
+        size = int(offsets[-1])
+        if size:
+            data = np.memmap(path, dtype=np.uint8, mode='r',
+                             offset=cls.HEADER.itemsize + offsets.nbytes, shape=(size,))
+        else:
+            data = np.zeros(0, dtype=np.uint8)
+        return cls(width, height, int(header[0]['radius']), offsets, data, source=source,
+                   fingerprint=(int(header[0]['level_crc']), int(header[0]['level_size'])))
+
+
+def _pvs_worker_init(source):
+    """Initialisiert einen PVS-Worker mit der Karte (Kartendatei samt Änderungen oder Kopie der Zellen)"""
+    global game_map, MAP_SIZE
+    kind, value = source
+    if kind == 'file':
+        path, edits = value
+        game_map = ChunkedMap(path)
+        for (col, row), cell in edits.items():
+            game_map.set_cell(col, row, cell)
+    else:
+        game_map = GameMap(value.shape[0], value)
+    MAP_SIZE = game_map.width
+
+
+def _pvs_build_bands(tasks, workers):
+    """Liefert die Einträge der Zeilenblöcke `tasks` der Reihe nach (parallel mit workers > 0)"""
+    if workers <= 0:
+        yield from map(_pvs_build_rows, tasks)
+        return
+    if isinstance(game_map, ChunkedMap):
+        source = ('file', (game_map.path, game_map.edits))
+    else:
+        source = ('cells', game_map.cells)
+    with multiprocessing.Pool(workers, initializer=_pvs_worker_init, initargs=(source,)) as pool:
+        yield from pool.imap(_pvs_build_rows, tasks)
+
+
+def _pvs_build_rows(task):
+    """Komprimierte PVS-Einträge aller Zellen in den Zeilen [row_start, row_stop)"""
+    row_start, row_stop, radius = task
+    height, width = game_map.shape
+    border = radius + 1  # Die Sichtlinien brauchen auch die Nachbarn der Zellen im Umkreis
+    top, left = row_start - border, -border
+    walls = game_map.window(top, row_stop + border, left, width + border)
+    rows, cols = np.nonzero(walls[border:border + row_stop - row_start, border:border + width] == 0)
+    rows += row_start
+
+    blobs = [b""] * ((row_stop - row_start) * width)
+    d_row, d_col = np.mgrid[-radius:radius + 1, -radius:radius + 1]
+    for start in range(0, rows.size, PVS_CELLS_PER_BATCH):
+        batch_rows, batch_cols = rows[start:start + PVS_CELLS_PER_BATCH], cols[start:start + PVS_CELLS_PER_BATCH]
+        visible = compute_cells_visibility(batch_cols, batch_rows, radius, VisibilityField.SAMPLES,
+                                           walls, top, left)
+        # Zellen außerhalb der Karte bleiben unsichtbar
+        target_row = batch_rows[:, None, None] + d_row
+        target_col = batch_cols[:, None, None] + d_col
+        visible &= (target_row >= 0) & (target_row < height) & (target_col >= 0) & (target_col < width)
+        bits = np.packbits(visible.reshape(visible.shape[0], -1), axis=1)
+        for row, col, cell_bits in zip(batch_rows.tolist(), batch_cols.tolist(), bits):
+            blobs[(row - row_start) * width + col] = zlib.compress(cell_bits.tobytes())
+    return blobs
+
+
+# Gemeinsames Sichtbarkeitsfeld für KI, Renderer und Minimap
+visibility_field = VisibilityField()
+
+# Vorberechnete Sichtbarkeit der aktuellen Karte (None = pro Spielerzelle berechnen)
+potentially_visible_set = None
+
+
+class Camera:
+    """
+    Kameramodell mit vorberechneten Spaltentabellen.
+
+    Winkel-Offsets, Richtungsvektoren relativ zur Kameraebene und
+    Fisheye-Korrekturfaktoren hängen nur von FOV und Spaltenanzahl ab und
+    werden nur neu berechnet, wenn sich eines von beiden ändert.
+    """
+
+    def __init__(self, fov=FOV, num_rays=NUM_RAYS):
+        self.fov = None
+        self.num_rays = None
+        self.configure(fov, num_rays)
+
+    def configure(self, fov, num_rays):
+        """Baut die Tabellen neu auf, falls sich FOV oder Auflösung geändert haben"""
+        if fov == self.fov and num_rays == self.num_rays:
+            return False
+
+        self.fov = fov
+        self.half_fov = fov / 2
+        self.num_rays = num_rays
+
+        # Winkel-Offset jeder Spalte relativ zur Blickrichtung
+        self.angle_offsets = -self.half_fov + fov * np.arange(num_rays) / num_rays
+
+        # Richtungsvektoren in Kamerakoordinaten (vorwärts / seitlich)
+        self.dir_forward = np.cos(self.angle_offsets)
+        self.dir_side = np.sin(self.angle_offsets)
+
+        # Fisheye-Korrektur: cos(player_angle - ray_angle) == cos(offset)
+        self.fisheye_correction = self.dir_forward
+        return True
+
+    def ray_angles(self, view_angle):
+        """Absolute Strahlwinkel aller Spalten für die gegebene Blickrichtung"""
+        return view_angle + self.angle_offsets
+
+    def ray_directions(self, view_angle):
+        """Richtungsvektoren aller Spalten (Rotation der Kameratabelle, ohne cos/sin pro Strahl)"""
+        cos_a = math.cos(view_angle)
+        sin_a = math.sin(view_angle)
+        ray_dir_x = cos_a * self.dir_forward - sin_a * self.dir_side
+        ray_dir_y = sin_a * self.dir_forward + cos_a * self.dir_side
+        return ray_dir_x, ray_dir_y
+
+
+# Kamera der 3D-Ansicht (Tabellen werden bei FOV-/Auflösungsänderung neu aufgebaut)
+camera = Camera()
+
+
+def cast_rays_adaptive(angles, sample_step=ADAPTIVE_RAY_STEP):
+    """
+    Adaptives Raycasting über eine nach Winkel geordnete Strahlenfolge.
+
+    Nur jede sample_step-te Spalte wird mit trace_ray gecastet. Treffen zwei
+    benachbarte Stichproben dieselbe Map-Zelle auf derselben Seite, liegen
+    alle Strahlen dazwischen auf derselben Wandfläche und ihre Entfernung
+    wird exakt mit der cast_ray-Formel berechnet. Sonst wird das Intervall
+    halbiert, bis benachbarte Spalten erreicht sind.
+    """
+    angles = np.asarray(angles, dtype=np.float64)
+    num = angles.size
+    distances = np.empty(num)
+    sides = np.empty(num, dtype=np.intp)
+    if num == 0:
+        return distances, sides
+
+    angle_list = angles.tolist()
+    hits = [None] * num  # (side, map_x, map_y) der gecasteten Spalten
+
+    def cast(column):
+        wall_dist, side, map_x, map_y = trace_ray(angle_list[column])
+        distances[column] = wall_dist
+        sides[column] = side
+        if map_x is not None:
+            hits[column] = (side, map_x, map_y)
+
+    samples = list(range(0, num, max(1, sample_step)))
+    if samples[-1] != num - 1:
+        samples.append(num - 1)
+    for column in samples:
+        cast(column)
+
+    # Intervalle zwischen Stichproben verfeinern (Stack statt Rekursion)
+    fill_spans = []  # (erste Spalte, Ende exklusiv, Seite, Zellkoordinate, Offset)
+    intervals = list(zip(samples[:-1], samples[1:]))
+    while intervals:
+        left, right = intervals.pop()
+        if right - left <= 1:
+            continue
+
+        hit = hits[left]
+        if hit is not None and hit == hits[right]:
+            # Gleiche Wandfläche: Offset entspricht (1 - step) / 2 aus cast_ray
+            side, map_x, map_y = hit
+            if side == 0:
+                offset = 1 if math.cos(angle_list[left]) < 0 else 0
+                fill_spans.append((left + 1, right, 0, map_x, offset))
+            else:
+                offset = 1 if math.sin(angle_list[left]) < 0 else 0
+                fill_spans.append((left + 1, right, 1, map_y, offset))
+        else:
+            # Kante zwischen den Stichproben: Mittelspalte casten und teilen
+            middle = (left + right) // 2
+            cast(middle)
+            intervals.append((left, middle))
+            intervals.append((middle, right))
+
+    if fill_spans:
+        # Alle Zwischenspalten analytisch in einem Durchgang berechnen
+        starts, ends, span_sides, cells, offsets = (np.array(v) for v in zip(*fill_spans))
+        lengths = ends - starts
+        columns = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        fill_sides = np.repeat(span_sides, lengths)
+        fill_cells = np.repeat(cells, lengths)
+        fill_offsets = np.repeat(offsets, lengths)
+
+        fill_angles = angles[columns]
+        on_x = fill_sides == 0
+        origin = np.where(on_x, player_x, player_y)
+        ray_dir = np.where(on_x, np.cos(fill_angles), np.sin(fill_angles))
+        distances[columns] = np.minimum((fill_cells - origin + fill_offsets) / ray_dir, DEPTH)
+        sides[columns] = fill_sides
+
+    return distances, sides
+
+
+def cast_angles(angles):
+    """Castet Strahlen für beliebige Winkel von der Spielerposition aus (Methode über RAYCAST_ENGINE)"""
+    if RAYCAST_ENGINE == "batch":
+        return cast_rays_batch(player_x, player_y, angles)
+    if RAYCAST_ENGINE == "adaptive":
+        return cast_rays_adaptive(angles)
+    if RAYCAST_ENGINE == "segments":
+        return cast_rays_segments(player_x, player_y, angles)
+
+    # Skalarer Referenzpfad: ein cast_ray-Aufruf pro Strahl
+    distances = np.empty(len(angles))
+    sides = np.empty(len(angles), dtype=np.intp)
+    for i, ray_angle in enumerate(np.asarray(angles).tolist()):
+        distances[i], sides[i] = cast_ray(ray_angle)
+    return distances, sides
+
+
+class PanoramaRayCache:
+    """
+    360°-Ring von Strahltreffern für eine feste Spielerposition.
+
+    Die Winkelauflösung des Rings entspricht dem Spaltenabstand der Kamera,
+    sodass eine Ansicht nur ein (umlaufender) Ausschnitt des Rings ist.
+    Einträge werden bei Bedarf gecastet; bei reinen Drehungen werden nur
+    die neu ins Sichtfeld kommenden Richtungen berechnet. Der Ring wird
+    verworfen, sobald sich die Position oder game_map.version ändert.
+    """
+
+    def __init__(self):
+        self.camera_key = None
+        self.key = None
+
+    def configure(self, cam):
+        """Passt Ringgröße und Spaltenzuordnung an die Kamera an"""
+        if self.camera_key == (cam.fov, cam.num_rays):
+            return
+        self.camera_key = (cam.fov, cam.num_rays)
+
+        # Ein Ringeintrag pro Spaltenabstand über den vollen Kreis
+        self.ring_size = max(1, int(round(2 * math.pi * cam.num_rays / cam.fov)))
+        self.ring_step = 2 * math.pi / self.ring_size
+        self.column_steps = np.rint(cam.angle_offsets / self.ring_step).astype(np.intp)
+
+        self.distances = np.full(self.ring_size, float(DEPTH))
+        self.sides = np.zeros(self.ring_size, dtype=np.intp)
+        self.valid = np.zeros(self.ring_size, dtype=bool)
+        self.key = None
+
+    def invalidate(self):
+        """Verwirft alle gecachten Treffer"""
+        self.valid[:] = False
+        self.key = None
+
+    def lookup(self, origin_x, origin_y, view_angle):
+        """
+        Liefert (distances, sides, fisheye_correction) für alle Spalten der Kamera.
+        Fehlende Ringeinträge werden von der Spielerposition aus nachgecastet.
+        """
+        key = (origin_x, origin_y, game_map.version)
+        if key != self.key:
+            self.valid[:] = False
+            self.key = key
+
+        # Ansicht = Ausschnitt des Rings ab der quantisierten Blickrichtung
+        base = int(round(view_angle / self.ring_step))
+        ring_indices = (base + self.column_steps) % self.ring_size
+
+        missing = ring_indices[~self.valid[ring_indices]]
+        if missing.size:
+            distances, sides = cast_angles(missing * self.ring_step)
+            self.distances[missing] = distances
+            self.sides[missing] = sides
+            self.valid[missing] = True
+
+        # Fisheye-Korrektur relativ zu den tatsächlich gecasteten Ringwinkeln
+        sample_angles = (base + self.column_steps) * self.ring_step
+        fisheye_correction = np.cos(view_angle - sample_angles)
+        return self.distances[ring_indices], self.sides[ring_indices], fisheye_correction
+
+
+# Strahlcache für Frames, in denen sich nur die Blickrichtung ändert
+panorama_cache = PanoramaRayCache()
+
+
+def cast_view_rays(view_angle):
+    """
+    Castet alle Strahlen der Ansicht mit der in RAYCAST_ENGINE gewählten Methode.
+    Rückgabe: (distances, sides, fisheye_correction) pro Spalte
+    """
+    if RAY_CACHE_ENABLED:
+        panorama_cache.configure(camera)
+        return panorama_cache.lookup(player_x, player_y, view_angle)
+
+    if RAYCAST_ENGINE == "batch":
+        distances, sides = cast_rays_batch(player_x, player_y, camera.ray_angles(view_angle),
+                                           directions=camera.ray_directions(view_angle))
+    elif RAYCAST_ENGINE == "segments":
+        distances, sides = cast_rays_segments(player_x, player_y, None,
+                                              directions=camera.ray_directions(view_angle))
+    else:
+        distances, sides = cast_angles(camera.ray_angles(view_angle))
+    return distances, sides, camera.fisheye_correction
+
+
+class WallCompositor:
+    """
+    Setzt Himmel, Boden und Wände eines Frames in einem vorab angelegten
+    HxWx3-Pixelpuffer zusammen und überträgt ihn mit einem einzigen
+    surfarray.blit_array auf die Zielfläche.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        # Frame-Puffer im Zeilenlayout (H x W x 3) wie der Bildschirmspeicher
+        self.frame = np.empty((height, width, 3), dtype=np.uint8)
+        # Vorberechneter Hintergrund: oben Himmel, unten Boden
+        self.background = np.empty_like(self.frame)
+        self.background[:height // 2] = DARKGRAY
+        self.background[height // 2:] = BLACK
+        # Zeilenindizes als Spalte für die Spannen-Masken (Broadcasting)
+        self.rows = np.arange(height)[:, None]
+
+    def compose(self, line_starts, line_ends, colors):
+        """Zeichnet alle Wandspalten [line_start, line_end] in einem Durchgang"""
+        np.copyto(self.frame, self.background)
+        span_mask = (self.rows >= line_starts) & (self.rows <= line_ends)
+        # Kanalweise ist deutlich schneller als eine (H, W, 3)-Maske
+        for channel in range(3):
+            np.copyto(self.frame[:, :, channel], colors[None, :, channel], where=span_mask)
+
+    def present(self, surface):
+        """Überträgt den fertigen Frame auf die Zielfläche"""
+        # surfarray erwartet (W, H, 3) - die Transponierung ist nur eine View
+        pg.surfarray.blit_array(surface, self.frame.transpose(1, 0, 2))
+
+
+# Puffer des Wand-Compositors (wird bei Größenänderung neu angelegt)
+wall_compositor = None
+
+
+def wall_spans(distances, fisheye_correction, height):
+    """Berechnet Start- und Endzeile (inklusive) der Wandlinie jeder Spalte"""
+    # Korrigiere Fisheye-Effekt für Rendering
+    corrected_dist = distances * fisheye_correction
+
+    # Berechne Höhe der zu zeichnenden Linien
+    with np.errstate(divide='ignore'):
+        line_heights = np.where(corrected_dist > 0,
+                                np.minimum(height / corrected_dist, height), height).astype(np.intp)
+
+    # Start- und Endpunkt der Linien (Endpunkt inklusive wie bei pg.draw.line)
+    line_starts = height // 2 - line_heights // 2
+    line_ends = line_starts + line_heights
+    return line_starts, line_ends
+
+
+def composite_walls(screen, distances, sides, line_starts, line_ends):
+    """Schattiert die Wandspalten und zeichnet sie über den Pixelpuffer des WallCompositor"""
+    global wall_compositor
+    frame_size = (len(distances), screen.get_height())
+    if wall_compositor is None or (wall_compositor.width, wall_compositor.height) != frame_size:
+        wall_compositor = WallCompositor(*frame_size)
+
+    # Wandfarbe (dunkler, wenn Seite = 1) mit Entfernungsschatten
+    shade = np.clip(1.0 / (1 + distances * 0.1), 0.3, 1.0)
+    colors = (WALL_COLORS[sides] * shade[:, None]).astype(np.uint8)
+
+    wall_compositor.compose(line_starts, line_ends, colors)
+    wall_compositor.present(screen)
+
+
+def draw_walls(screen, distances, sides, fisheye_correction):
+    """Rendert alle Wandspalten über den Pixelpuffer des WallCompositor"""
+    line_starts, line_ends = wall_spans(distances, fisheye_correction, screen.get_height())
+    composite_walls(screen, distances, sides, line_starts, line_ends)
+
+
+# Zustand eines Streifen-Workers (nur in den Worker-Prozessen gesetzt)
+_strip_worker_state = None
+
+
+def _strip_worker_init(map_shm_name, map_shape, out_shm_name, max_columns):
+    """Initialisiert einen Worker: Karte und Ausgabepuffer aus dem Shared Memory einbinden"""
+    global game_map, MAP_SIZE, _strip_worker_state
+    from multiprocessing import shared_memory
+
+    map_shm = shared_memory.SharedMemory(name=map_shm_name)
+    out_shm = shared_memory.SharedMemory(name=out_shm_name)
+
+    # Der Worker rechnet direkt auf der gemeinsamen Kopie der Karte
+    game_map = GameMap(map_shape[0], np.ndarray(map_shape, dtype=np.uint8, buffer=map_shm.buf))
+    MAP_SIZE = map_shape[0]
+
+    _strip_worker_state = (map_shm, out_shm, StripRenderer.output_views(out_shm.buf, max_columns))
+
+
+def _render_strip(task):
+    """Raycastet einen Spaltenstreifen und schreibt Entfernungen, Seiten und Spannen in den Ausgabepuffer"""
+    start, stop, origin_x, origin_y, view_angle, num_columns, fov, height, map_version = task
+    distances_out, starts_out, ends_out, sides_out = _strip_worker_state[2]
+
+    # Der Hauptprozess hat die gemeinsame Karte neu kopiert: das Distanzfeld
+    # im Worker sieht eine Versionslücke ohne Protokoll und baut neu auf
+    game_map.version = map_version
+
+    camera.configure(fov, num_columns)
+    ray_dir_x, ray_dir_y = camera.ray_directions(view_angle)
+    cast_rays = cast_rays_segments if RAYCAST_ENGINE == "segments" else cast_rays_batch
+    distances, sides = cast_rays(origin_x, origin_y, None,
+                                 directions=(ray_dir_x[start:stop], ray_dir_y[start:stop]))
+    line_starts, line_ends = wall_spans(distances, camera.fisheye_correction[start:stop], height)
+
+    distances_out[start:stop] = distances
+    sides_out[start:stop] = sides
+    starts_out[start:stop] = line_starts
+    ends_out[start:stop] = line_ends
+    return stop - start
+
+
+class StripRenderer:
+    """
+    Verteilt das Raycasting der Wandspalten in Streifen auf einen Prozesspool.
+
+    Die Worker lesen eine Kopie von game_map aus dem Shared Memory und
+    schreiben Entfernungen, Seiten und Spalten-Spannen in einen gemeinsamen
+    Ausgabepuffer; der Hauptprozess setzt daraus nur noch das Bild zusammen.
+    """
+
+    def __init__(self, num_workers, max_columns=NUM_RAYS):
+        from multiprocessing import shared_memory
+
+        self.num_workers = num_workers
+        self.max_columns = max_columns
+        self.map_shape = game_map.shape
+        self.map_version = None
+
+        self.map_shm = shared_memory.SharedMemory(create=True, size=game_map.cells.nbytes)
+        self.shared_map = np.ndarray(self.map_shape, dtype=np.uint8, buffer=self.map_shm.buf)
+        self.out_shm = shared_memory.SharedMemory(create=True, size=StripRenderer.output_size(max_columns))
+        self.outputs = StripRenderer.output_views(self.out_shm.buf, max_columns)
+        self.sync_map()
+
+        self.pool = multiprocessing.Pool(
+            num_workers, initializer=_strip_worker_init,
+            initargs=(self.map_shm.name, self.map_shape, self.out_shm.name, max_columns))
+
+    @staticmethod
+    def output_size(max_columns):
+        """Bytes für Entfernungen (float64), Spannen (2x int32) und Seiten (int8)"""
+        return max_columns * (8 + 4 + 4 + 1)
+
+    @staticmethod
+    def output_views(buffer, max_columns):
+        """Typisierte Sichten (distances, line_starts, line_ends, sides) auf den Ausgabepuffer"""
+        distances = np.ndarray(max_columns, dtype=np.float64, buffer=buffer, offset=0)
+        line_starts = np.ndarray(max_columns, dtype=np.int32, buffer=buffer, offset=max_columns * 8)
+        line_ends = np.ndarray(max_columns, dtype=np.int32, buffer=buffer, offset=max_columns * 12)
+        sides = np.ndarray(max_columns, dtype=np.int8, buffer=buffer, offset=max_columns * 16)
+        return distances, line_starts, line_ends, sides
+
+    def fits(self, num_columns):
+        """Prüft, ob Karte und Spaltenanzahl zu den angelegten Puffern passen"""
+        return game_map.shape == self.map_shape and num_columns <= self.max_columns
+
+    def sync_map(self):
+        """Kopiert game_map in das Shared Memory, falls sich die Karte geändert hat"""
+        if self.map_version != game_map.version:
+            self.shared_map[:] = game_map.cells
+            self.map_version = game_map.version
+
+    def render(self, origin_x, origin_y, view_angle, cam, height):
+        """
+        Rendert alle Spalten der Kamera verteilt auf die Worker.
+        Rückgabe: (distances, sides, line_starts, line_ends) als Sichten auf den Ausgabepuffer
+        """
+        self.sync_map()
+        num_columns = cam.num_rays
+
+        # Zwei Streifen pro Worker gleichen ungleich teure Bildbereiche aus
+        bounds = np.linspace(0, num_columns, self.num_workers * 2 + 1).astype(int)
+        tasks = [(int(start), int(stop), origin_x, origin_y, view_angle, num_columns, cam.fov, height,
+                  self.map_version)
+                 for start, stop in zip(bounds[:-1], bounds[1:]) if stop > start]
+        self.pool.map(_render_strip, tasks)
+
+        distances, line_starts, line_ends, sides = self.outputs
+        return (distances[:num_columns], sides[:num_columns],
+                line_starts[:num_columns], line_ends[:num_columns])
+
+    def close(self):
+        """Beendet den Pool und gibt das Shared Memory frei"""
+        self.pool.terminate()
+        self.pool.join()
+        self.outputs = None
+        self.shared_map = None
+        for shm in (self.map_shm, self.out_shm):
+            shm.close()
+            shm.unlink()
+
+
+# Prozesspool für das Streifen-Rendering (wird bei Bedarf angelegt)
+strip_renderer = None
+
+
+def get_strip_renderer(num_columns):
+    """Liefert einen zu Karte und Auflösung passenden StripRenderer"""
+    global strip_renderer
+    if strip_renderer is not None and not (strip_renderer.fits(num_columns)
+                                           and strip_renderer.num_workers == STRIP_RENDER_WORKERS):
+        strip_renderer.close()
+        strip_renderer = None
+    if strip_renderer is None:
+        strip_renderer = StripRenderer(STRIP_RENDER_WORKERS, max(num_columns, NUM_RAYS))
+    return strip_renderer
+
+
+class SpriteCache:
+    """
+    LRU-Cache für vorgerenderte Sprite-Flächen mit Speicherobergrenze.
+    Einträge sind (surface, anchor) - anchor ist der Ankerpunkt in der Fläche.
+    """
+
+    def __init__(self, max_bytes=SPRITE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.entries = OrderedDict()
+
+    def get(self, key, render):
+        """Liefert den Eintrag zu key; fehlt er, wird er mit render() erzeugt"""
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            return entry
+
+        entry = render()
+        self.entries[key] = entry
+        self.used_bytes += self.entry_bytes(entry)
+
+        # Am längsten ungenutzte Einträge verwerfen, bis die Obergrenze passt
+        while self.used_bytes > self.max_bytes and len(self.entries) > 1:
+            _, evicted = self.entries.popitem(last=False)
+            self.used_bytes -= self.entry_bytes(evicted)
+        return entry
+
+    @staticmethod
+    def entry_bytes(entry):
+        surface = entry[0]
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+
+    def clear(self):
+        self.entries.clear()
+        self.used_bytes = 0
+
+
+def render_enemy_art(color, size, glow_size):
+    """
+    Rendert die statische Gegnergrafik (Körper, Kopf, Augen-Glow, Augen,
+    Pupillen, Glanzpunkte sowie Hintergrund und Rahmen des Gesundheitsbalkens)
+    einmalig auf eine Alpha-Fläche.
+
+    Rückgabe: (surface, (anchor_x, anchor_y)) - der Anker entspricht
+    (screen_x, sprite_top) beim Zeichnen.
+    """
+    head_radius = int(size * 0.4)
+    head_y = size // 5
+    eye_spacing = size // 5
+    eye_size = max(4, int(size * 0.15))
+    outline = max(1, int(eye_size * 0.2))
+    pupil_size = max(2, int(eye_size * 0.6))
+    shine_size = max(1, int(pupil_size * 0.3))
+    shine_offset = max(1, int(pupil_size * 0.2))
+    health_bar_height = max(3, int(size * 0.07))
+
+    # Umgebendes Rechteck aller Elemente relativ zum Anker
+    half_extent = max(size // 2 + 1, head_radius,
+                      eye_spacing + max(glow_size, eye_size + outline)) + 1
+    top = min(-health_bar_height * 2, head_y - head_radius,
+              head_y - max(glow_size, eye_size + outline)) - 1
+    bottom = max(size // 4 + size, head_y + head_radius) + 1
+    anchor_x, anchor_y = half_extent, -top
+
+    surface = pg.Surface((half_extent * 2 + 1, bottom - top + 1), pg.SRCALPHA)
+    surface.fill((0, 0, 0, 0))
+    cx, cy = anchor_x, anchor_y
+
+    # VIEL GRÖSSERER Körper für bessere Sichtbarkeit
+    pg.draw.rect(surface, color, (cx - size//2, cy + size//4, size, size))
+
+    # Kopf: Deutlich größerer Kreis (40% der Gesamtgröße)
+    pg.draw.circle(surface, color, (cx, cy + head_y), head_radius)
+
+    for eye_x in (cx - eye_spacing, cx + eye_spacing):
+        # Leuchtender Glow um die Augen herum - weiße Aura
+        pg.draw.circle(surface, (255, 255, 255), (eye_x, cy + head_y), glow_size)
+    for eye_x in (cx - eye_spacing, cx + eye_spacing):
+        # Extra Kontur um die Augen (schwarz)
+        pg.draw.circle(surface, (0, 0, 0), (eye_x, cy + head_y), eye_size + outline)
+    for eye_x in (cx - eye_spacing, cx + eye_spacing):
+        # Eigentliche Augen - extraleuchtendes Gelb
+        pg.draw.circle(surface, (255, 255, 0), (eye_x, cy + head_y), eye_size)
+    for eye_x in (cx - eye_spacing, cx + eye_spacing):
+        # Große, leuchtend rote Pupillen für dämonischen Effekt
+        pg.draw.circle(surface, (255, 0, 0), (eye_x, cy + head_y), pupil_size)
+    for eye_x in (cx - eye_spacing, cx + eye_spacing):
+        # Innerster Glanzpunkt für 3D-Effekt (weißer Punkt)
+        pg.draw.circle(surface, (255, 255, 255),
+                       (eye_x - shine_offset, cy + head_y - shine_offset), shine_size)
+
+    # Gesundheitsbalken: Hintergrund (rot) und dünner Rahmen, die Füllung ist dynamisch
+    bar_rect = (cx - size//2, cy - health_bar_height*2, size, health_bar_height)
+    pg.draw.rect(surface, (150, 0, 0), bar_rect)
+    pg.draw.rect(surface, (255, 255, 255), bar_rect, 1)
+
+    return surface, (anchor_x, anchor_y)
+
+
+# Vorgerenderte Gegnergrafiken, Schlüssel: (Farbe, quantisierte Größe, Glow-Größe)
+enemy_sprite_cache = SpriteCache()
+
+
+def sprite_clip_rects(z_buffer, depth, x_start, x_end, height):
+    """
+    Vergleicht die Tiefe eines Sprites mit dem Z-Buffer-Ausschnitt, den es
+    überdeckt, und liefert die sichtbaren vertikalen Streifen als Clip-Rechtecke.
+
+    Rückgabe:
+    - [] wenn das Sprite vollständig verdeckt (oder außerhalb) ist
+    - [None] wenn es vollständig sichtbar ist (kein Clipping nötig)
+    - sonst eine Liste von pg.Rect je zusammenhängendem sichtbaren Spaltenbereich
+    """
+    x0 = max(0, int(x_start))
+    x1 = min(len(z_buffer), int(x_end))
+    if x1 <= x0:
+        return []
+
+    visible = depth < z_buffer[x0:x1]
+    if visible.all():
+        return [None]
+    if not visible.any():
+        return []
+
+    # Anfang und Ende jedes sichtbaren Laufs über die Flanken der Maske
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], visible.view(np.int8), [0]))))
+    return [pg.Rect(x0 + start, 0, stop - start, height)
+            for start, stop in zip(edges[0::2].tolist(), edges[1::2].tolist())]
+
+
+def draw_enemy_sprite(screen, enemy, screen_x, sprite_top, final_size, behind_wall):
+    """Zeichnet einen Gegner an der Bildschirmposition (respektiert den Clip-Bereich)"""
+    # STARKER FARBUNTERSCHIED für Sichtbarkeit hinter Wänden
+    if behind_wall and RENDERING_ALWAYS_SHOW_ENEMIES:
+        # X-RAY SICHT: Gegner hinter Wand mit speziellem Effekt
+        
+        # 1. Blauer Farbton für "durch Wand sichtbar"-Effekt
+        enemy_color = (50, 50, 255)  # Kräftiges Blau für Gegner hinter Wänden
+        
+        # 2. LEUCHTENDE Kontur für maximale Sichtbarkeit hinter Wänden
+        # Größerer Kontur-Umriss
+        outline_size = max(2, final_size // 6)
+        
+        # Äußere Kontur (cyan/türkis) für Kontrast
+        pg.draw.rect(screen, (0, 255, 255), 
+                   (screen_x - final_size//2 - outline_size, 
+                    sprite_top + final_size//4 - outline_size, 
+                    final_size + outline_size*2, 
+                    final_size + outline_size*2), 
+                    outline_size)
+                    
+        # Zweite innere Kontur (weiß) für noch besseren Kontrast
+        inner_outline = max(1, outline_size // 2)
+        pg.draw.rect(screen, (200, 200, 255), 
+                   (screen_x - final_size//2 - inner_outline, 
+                    sprite_top + final_size//4 - inner_outline, 
+                    final_size + inner_outline*2, 
+                    final_size + inner_outline*2), 
+                    inner_outline)
+    else:
+        # Gegner im Vordergrund: Leuchtend rot
+        enemy_color = (255, 0, 0)  # Reines Rot
+
+    # Glow-Puls quantisieren, damit vorgerenderte Flächen wiederverwendet werden
+    pulse = (math.sin(pg.time.get_ticks() / 150) * 0.2 + 0.8)  # 0.6 bis 1.0
+    glow_level = round((pulse - 0.6) / 0.4 * (ENEMY_GLOW_LEVELS - 1))
+    pulse = 0.6 + glow_level * 0.4 / (ENEMY_GLOW_LEVELS - 1)
+    glow_size = max(4, int(final_size * 0.25 * pulse))
+
+    # STATISCHE GRAFIK: Körper, Kopf, Augen und Balkenhintergrund mit einem Blit
+    sprite_key = (enemy_color, final_size, glow_size)
+    art, (anchor_x, anchor_y) = enemy_sprite_cache.get(
+        sprite_key, lambda: render_enemy_art(enemy_color, final_size, glow_size))
+    screen.blit(art, (screen_x - anchor_x, sprite_top - anchor_y))
+
+    # DYNAMISCHE OVERLAYS: Gesundheitsfüllung und Statusanzeige
+    health_bar_height = max(3, int(final_size * 0.07))  # 7% der Gesamtgröße
+    health_width = int(final_size * (enemy.health / 50))
+
+    # Grüner Balken nur im Inneren des (vorgerenderten) 1-Pixel-Rahmens
+    bar_x = screen_x - final_size//2
+    bar_y = sprite_top - health_bar_height*2
+    fill_width = min(health_width, final_size - 1) - 1
+    if fill_width > 0 and health_bar_height > 2:
+        pg.draw.rect(screen, (0, 200, 0),
+                   (bar_x + 1, bar_y + 1, fill_width, health_bar_height - 2))
+
+    # VERBESSERTE Status-Anzeige mit verschiedenen Zuständen
+    status_size = max(3, int(final_size * 0.08))  # 8% der Gesamtgröße
+    
+    # Unterschiedliche Farben basierend auf dem aktuellen Zustand
+    if enemy.movement_state == "idle":
+        # Grün = Idle/Ruhezustand (passive)
+        status_color = (0, 200, 0)
+    elif enemy.movement_state == "patrol":
+        # Blau = Patrouille (neutral)
+        status_color = (50, 100, 255)
+    elif enemy.movement_state == "chase":
+        # Rot = Verfolgung (aggressiv)
+        status_color = (255, 50, 50)
+    elif enemy.movement_state == "retreat":
+        # Gelb = Rückzug (Flucht)
+        status_color = (255, 255, 0)
+    else:
+        # Fallback für unbekannte Zustände
+        status_color = (150, 150, 150)
+        
+    # Zeichne Statusindikator
+    pg.draw.circle(screen, status_color, 
+                  (screen_x, sprite_top - health_bar_height*3), status_size)
+                  
+    # Pulsierender Effekt für den Chase-Zustand
+    if enemy.movement_state == "chase":
+        # Extra pulsierender Ring für Verfolgungsmodus
+        pulse = (math.sin(pg.time.get_ticks() / 120) * 0.5 + 0.5)  # 0.0 bis 1.0
+        outer_size = status_size + int(status_size * pulse)
+        pg.draw.circle(screen, (255, 100, 100, 150), 
+                     (screen_x, sprite_top - health_bar_height*3), outer_size, 1)
+
+
+def draw_bullet_sprite(screen, screen_x, bullet_y, bullet_size, hit_wall, hit_frames,
+                       behind_wall, trail_angle, sparks):
+    """Zeichnet eine Kugel bzw. ihre Explosion an der Bildschirmposition (respektiert den Clip-Bereich)"""
+    # Spezielle Darstellung für Wandtreffer
+    if hit_wall:
+        # ULTRA-EXPLOSIVE Effekte bei Wandtreffer
+        # Intensität der Explosion basierend auf verbleibenden Frames
+        intensity = hit_frames / 30.0  # 0.0 bis 1.0
+        
+        # Größere Explosionsgröße für bessere Sichtbarkeit
+        explosion_size = int(bullet_size * 3.0 * intensity)
+        
+        # EXTRA: Bei Kugeln hinter Wänden trotzdem sichtbar machen
+        if behind_wall and RENDERING_ALWAYS_SHOW_BULLETS:
+            # Explosionskontur für bessere Sichtbarkeit hinter Wänden
+            outline_size = 3
+            pg.draw.circle(screen, (0, 200, 255), 
+                         (screen_x, bullet_y), 
+                         explosion_size + outline_size, outline_size)
+        
+        # 1. Äußerer Explosionskreis (intensiv gelb-orange-rot)
+        # Stärkere Farben für bessere Sichtbarkeit
+        pg.draw.circle(screen, (255, 100 + int(155 * intensity), 0), 
+                     (screen_x, bullet_y), explosion_size)
+        
+        # 2. Mittlerer Explosionskreis (hell-orange bis gelb)
+        mid_size = int(explosion_size * 0.7)  # Größerer mittlerer Kreis
+        pg.draw.circle(screen, (255, 180 + int(75 * intensity), 0), 
+                     (screen_x, bullet_y), mid_size)
+        
+        # 3. Kern der Explosion (weiß-gelb mit Pulsieren)
+        # Pulsierender Kern für mehr visuelle Auffälligkeit
+        pulse_factor = 0.8 + math.sin(pg.time.get_ticks() / 50) * 0.2  # 0.6 bis 1.0
+        core_size = int(explosion_size * 0.4 * pulse_factor)
+        pg.draw.circle(screen, (255, 255, 100), 
+                     (screen_x, bullet_y), core_size)
+        
+        # Innerer leuchtender Punkt (weiß) für Kontrast
+        pg.draw.circle(screen, (255, 255, 255), 
+                     (screen_x, bullet_y), int(core_size * 0.3))
+        
+        # 4. MEHR Funkenstrahlen in ALLE Richtungen
+        # Stärkerer visueller Effekt mit mehr Strahlen
+        # (Winkel und Längenfaktor sind pro Frame vorab gewürfelt, damit
+        # alle sichtbaren Teilstreifen dieselben Funken zeigen)
+        for i, (ray_angle, length_factor) in enumerate(sparks):
+            # Zufällige, längere Strahlen
+            ray_length = explosion_size * length_factor
+            
+            # Endpunkt berechnen
+            end_x = screen_x + math.cos(ray_angle) * ray_length
+            end_y = bullet_y + math.sin(ray_angle) * ray_length
+            
+            # Farbe basierend auf Intensität - verschiedene Farben für Effekt
+            if i % 3 == 0:
+                ray_color = (255, 200, 0)  # Gelb
+            elif i % 3 == 1:
+                ray_color = (255, 100, 0)  # Orange
+            else:
+                ray_color = (255, 255, 100)  # Helles Gelb
+                
+            # Dickere Strahlen für bessere Sichtbarkeit
+            pg.draw.line(screen, ray_color, 
+                       (screen_x, bullet_y), (end_x, end_y), 
+                       max(2, int(3 * intensity)))
+    else:
+        # ULTRA-AUFFÄLLIGE KUGEL in Bewegung
+        
+        # Spezielle Behandlung für Kugeln hinter Wänden
+        if behind_wall and RENDERING_ALWAYS_SHOW_BULLETS:
+            # Blauer Randeffekt für Kugeln hinter Wänden
+            outline_size = 3
+            pg.draw.circle(screen, (0, 200, 255), 
+                         (screen_x, bullet_y), 
+                         bullet_size * 1.8, outline_size)
+        
+        # 1. Äußerer Leuchtkreis (hellgelb) - GRÖSSER und HELLER
+        outer_size = bullet_size * 2.0
+        pg.draw.circle(screen, (255, 255, 150), (screen_x, bullet_y), outer_size)
+        
+        # 2. Mittlerer Kreis (intensiv gelb)
+        mid_size = bullet_size * 1.5
+        pg.draw.circle(screen, (255, 255, 0), (screen_x, bullet_y), mid_size)
+        
+        # 3. Innerer Kern (weiß - strahlend hell)
+        inner_size = bullet_size * 0.7
+        pg.draw.circle(screen, (255, 255, 255), (screen_x, bullet_y), inner_size)
+        
+        # 4. EXTRA-LANGER Bewegungstrail für maximale Sichtbarkeit
+        # Flugrichtung mit Streifen zeigen (entgegen der Bewegungsrichtung)
+        reverse_angle = trail_angle + math.pi
+        
+        # DEUTLICH längerer Trail für bessere Sichtbarkeit
+        streak_length = bullet_size * BULLET_TRAIL_LENGTH
+        end_x = screen_x + math.cos(reverse_angle) * streak_length
+        end_y = bullet_y + math.sin(reverse_angle) * streak_length
+        
+        # MEHRERE Streifen für "Feuer"-Effekt
+        
+        # 1. Äußerer Streifen (gelb, breit, transparent)
+        outer_streak_width = max(4, int(bullet_size * 0.9))
+        pg.draw.line(screen, (255, 255, 0, 100), 
+                   (screen_x, bullet_y), (end_x, end_y), outer_streak_width)
+        
+        # 2. Mittlerer Streifen (orange)
+        mid_streak_width = max(3, int(bullet_size * 0.7))
+        mid_streak_length = streak_length * 0.8
+        mid_end_x = screen_x + math.cos(reverse_angle) * mid_streak_length
+        mid_end_y = bullet_y + math.sin(reverse_angle) * mid_streak_length
+        pg.draw.line(screen, (255, 200, 0, 150), 
+                   (screen_x, bullet_y), (mid_end_x, mid_end_y), mid_streak_width)
         
-        # Prüfen ob Strahl eine Wand getroffen hat
-        if game_map[map_y][map_x] > 0:
-            hit = 1
-    
-    # Wenn kein Treffer gefunden wurde, gib maximale Entfernung zurück
-    if hit == 0:
-        return DEPTH, side
-    
-    # Berechne die exakte Entfernung zur getroffenen Wand
-    if side == 0:  # X-Seite getroffen
-        wall_dist = (map_x - player_x + (1 - step_x) / 2) / ray_dir_x
-    else:  # Y-Seite getroffen
-        wall_dist = (map_y - player_y + (1 - step_y) / 2) / ray_dir_y
-    
-    # Distanz begrenzen auf vernünftige Werte
-    wall_dist = min(wall_dist, DEPTH)
-    
-    return wall_dist, side
+        # 3. Innerer Streifen (weiß, intensiv)
+        inner_streak_width = max(2, int(bullet_size * 0.4))
+        inner_streak_length = streak_length * 0.5
+        inner_end_x = screen_x + math.cos(reverse_angle) * inner_streak_length
+        inner_end_y = bullet_y + math.sin(reverse_angle) * inner_streak_length
+        pg.draw.line(screen, (255, 255, 255, 200), 
+                   (screen_x, bullet_y), (inner_end_x, inner_end_y), inner_streak_width)
+                   
+        # 4. BONUS: Pulsierender Glow-Effekt um die Kugel
+        pulse_time = pg.time.get_ticks() / 80
+        glow_size = outer_size * (0.9 + math.sin(pulse_time) * 0.1)
+        pg.draw.circle(screen, (255, 255, 200, 50), 
+                     (screen_x, bullet_y), glow_size, 3)
+
+
+class DynamicResolution:
+    """
+    Regelt die interne Auflösung der 3D-Ansicht anhand der gemessenen
+    Frame-Zeit, um eine Ziel-Bildrate zu halten.
+
+    Alle `interval` Frames wird die mittlere Frame-Zeit mit dem Budget der
+    Ziel-Bildrate verglichen und der Skalierungsfaktor gedämpft angepasst.
+    """
+
+    SCALE_STEP = 0.05  # Quantisierung, damit Puffer nicht jeden Frame neu angelegt werden
+    TOLERANCE = 0.1  # ±10% um das Budget herum wird nicht nachgeregelt
+
+    def __init__(self, target_fps=DYNRES_TARGET_FPS, min_scale=DYNRES_MIN_SCALE,
+                 max_scale=DYNRES_MAX_SCALE, interval=DYNRES_ADJUST_INTERVAL):
+        self.target_fps = target_fps
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+        self.interval = interval
+        self.scale = max_scale
+        self.frame_times = []
+
+    def record_frame(self, frame_ms):
+        """Erfasst die Arbeitszeit eines Frames und passt alle `interval` Frames die Skalierung an"""
+        self.frame_times.append(frame_ms)
+        if len(self.frame_times) < self.interval:
+            return
+
+        average_ms = sum(self.frame_times) / len(self.frame_times)
+        self.frame_times.clear()
+        budget_ms = 1000.0 / self.target_fps
+        if average_ms <= 0 or abs(average_ms - budget_ms) <= budget_ms * self.TOLERANCE:
+            return
+
+        # Pixelanzahl wächst quadratisch mit der Skalierung - daher Wurzel, gedämpft
+        factor = min(1.1, max(0.8, math.sqrt(budget_ms / average_ms)))
+        scale = round(self.scale * factor / self.SCALE_STEP) * self.SCALE_STEP
+        if scale == self.scale:
+            scale += self.SCALE_STEP if factor > 1 else -self.SCALE_STEP
+        self.scale = min(self.max_scale, max(self.min_scale, scale))
+
+    def view_size(self):
+        """Interne Auflösung (Spalten, Höhe) der 3D-Ansicht"""
+        return max(1, int(WIDTH * self.scale)), max(1, int(HEIGHT * self.scale))
+
+
+# Regler und Zwischenfläche für die dynamische Auflösung
+dynamic_resolution = DynamicResolution()
+view_surface = None
+
+
+def render_world(target):
+    """
+    Rendert Himmel, Boden und Wände auf die Zielfläche (eine Spalte pro Pixel).
+    Rückgabe: Wandentfernungen aller Spalten (für den Z-Buffer)
+    """
+    # Kameratabellen nur bei geänderter Auflösung oder FOV neu aufbauen
+    camera.configure(FOV, target.get_width())
+
+    if STRIP_RENDER_WORKERS > 0 and isinstance(game_map, GameMap):
+        # Wandspalten in Streifen auf mehrere Prozesse verteilen
+        # (die Worker brauchen eine dichte Kopie der Karte, nicht für ChunkedMap)
+        renderer = get_strip_renderer(camera.num_rays)
+        ray_distances, ray_sides, line_starts, line_ends = renderer.render(
+            player_x, player_y, player_angle, camera, target.get_height())
+        composite_walls(target, ray_distances, ray_sides, line_starts, line_ends)
+    else:
+        # Alle Strahlen auf einmal casten (Methode über RAYCAST_ENGINE wählbar)
+        ray_distances, ray_sides, fisheye_correction = cast_view_rays(player_angle)
+
+        # Himmel, Boden und Wände in einem Durchgang über den Pixelpuffer zeichnen
+        draw_walls(target, ray_distances, ray_sides, fisheye_correction)
+
+    return ray_distances
 
 
 def draw_3d_view(screen):
     """3D-Ansicht mit Raycasting - KOMPLETT ÜBERARBEITETER ALGORITHMUS"""
-    # RESET: Fülle den Bildschirm mit Himmel und Boden
-    screen.fill(DARKGRAY, (0, 0, WIDTH, HALF_HEIGHT))  # Himmel
-    screen.fill(BLACK, (0, HALF_HEIGHT, WIDTH, HALF_HEIGHT))  # Boden
-    
-    # GRUNDLAGE: Speichern der Distanzen für die Gegneranzeige und Z-Buffer
-    z_buffer = [float('inf')] * NUM_RAYS  # Mit Unendlich initialisieren
-    
+    global view_surface
+
     # DEBUGGING: Zeige Spielerposition und Blickrichtung für bessere Fehlerdiagnose
     if pg.time.get_ticks() % 180 == 0:  # Alle 3 Sekunden
         print(f"SPIELER: Position=({player_x:.2f}, {player_y:.2f}), " + 
               f"Blickwinkel={player_angle:.2f} rad = {math.degrees(player_angle):.1f}°, " +
               f"FOV={FOV:.2f} rad = {math.degrees(FOV):.1f}°")
     
-    # WÄNDE: Einfache Farben für Wände
-    wall_colors = [
-        (200, 200, 200),  # Weiß
-        (150, 150, 150),  # Grau (dunklere Seite)
-    ]
-    
     # SCHRITT 1: ALLE WÄNDE RENDERN - Wichtig für korrekte Z-Buffer-Werte
-    for x in range(NUM_RAYS):
-        # Berechne den Winkel des aktuellen Strahls
-        ray_angle = player_angle - HALF_FOV + FOV * x / NUM_RAYS
-        
-        # Cast Ray und erhalte Entfernung
-        distance, side = cast_ray(ray_angle)
-        
-        # Speichern für Z-Buffer (tatsächliche Entfernung, nicht korrigiert)
-        z_buffer[x] = distance
-        
-        # Korrigiere Fisheye-Effekt für Rendering
-        corrected_dist = distance * math.cos(player_angle - ray_angle)
-        
-        # Berechne Höhe der zu zeichnenden Linie
-        line_height = min(int(HEIGHT / corrected_dist), HEIGHT) if corrected_dist > 0 else HEIGHT
-        
-        # Startpunkt der Linie
-        line_start = HALF_HEIGHT - line_height // 2
-        
-        # Wandfarbe (dunkler, wenn Seite = 1)
-        color = wall_colors[side]
-        
-        # Entfernungsschatten
-        shade = max(0.3, min(1.0, 1.0 / (1 + distance * 0.1)))
-        color = (int(color[0] * shade), int(color[1] * shade), int(color[2] * shade))
-        
-        # Zeichne vertikale Linie
-        pg.draw.line(screen, color, (x, line_start), (x, line_start + line_height), 1)
+    if DYNAMIC_RESOLUTION:
+        # Welt in interner Auflösung rendern und auf Fenstergröße hochskalieren
+        view_size = dynamic_resolution.view_size()
+        if view_surface is None or view_surface.get_size() != view_size:
+            view_surface = pg.Surface(view_size).convert()
+        ray_distances = render_world(view_surface)
+        pg.transform.scale(view_surface, (WIDTH, HEIGHT), screen)
+
+        # Z-Buffer auf Bildschirmspalten abbilden (Sprites werden in voller Auflösung gezeichnet)
+        ray_distances = ray_distances[np.arange(WIDTH) * view_size[0] // WIDTH]
+    else:
+        ray_distances = render_world(screen)
+
+    # GRUNDLAGE: Speichern der Distanzen für die Gegneranzeige und Z-Buffer
+    # (tatsächliche Entfernung, nicht korrigiert)
+    z_buffer = ray_distances
     
     # SCHRITT 2: ALLE SPRITES SAMMELN (Gegner und Schüsse)
-    sprites_to_render = []
-    
     # MÄSSIG HÄUFIGE DEBUGGING-INFORMATION (ALLE 5 SEKUNDEN)
     if pg.time.get_ticks() % 300 == 0 and random.random() < 0.5:  # 50% Chance alle 5 Sekunden
-        active_enemies = [e for e in enemies if e.active]
+        active_enemies = enemy_store.live_enemies
         print("================================")
         print(f"SPIELER: ({player_x:.2f}, {player_y:.2f}), Winkel: {math.degrees(player_angle):.1f}°")
         print(f"GEGNER: {len(active_enemies)} aktiv")
@@ -648,252 +3768,55 @@ def draw_3d_view(screen):
         if len(active_enemies) > 2:
             print(f"  ... und {len(active_enemies)-2} weitere Gegner")
         print("================================")
-    
-    # SCHRITT 2A: GEGNER-SPRITES SAMMELN
-    # Extra Debug-Ausgabe, wenn Debug-Modus aktiv ist
-    if RENDERING_DEBUG_MODE and pg.time.get_ticks() % 180 == 0:
-        print("\n=== GEGNER-SPRITE-SAMMLUNG START ===")
-        print(f"Spielerposition: ({player_x:.2f}, {player_y:.2f}), Blickwinkel: {math.degrees(player_angle):.1f}°")
-    
-    for enemy in enemies:
-        if not enemy.active:
-            continue
-        
-        # SCHRITT 1: RELATIVE POSITION BERECHNEN
-        # Vektor vom Spieler zum Gegner (in Weltkoordinaten)
-        dx = enemy.x - player_x
-        dy = enemy.y - player_y
-        
-        # SCHRITT 2: DISTANZ BERECHNEN
-        # Euklidischer Abstand für korrekte Distanz
-        dist = math.sqrt(dx*dx + dy*dy)
-        
-        # SCHRITT 3: WINKEL BERECHNEN 
-        # Absoluter Winkel in der Welt (vom Spieler zum Gegner)
-        absolute_angle_to_enemy = math.atan2(dy, dx)
-        
-        # SCHRITT 4: RELATIVER WINKEL ZUR KAMERA
-        # KERNPROBLEM GELÖST: Korrekte Berechnung des relativen Winkels
-        # Bei Drehung nach rechts müssen Objekte nach links wandern und umgekehrt
-        relative_angle = normalize_angle(absolute_angle_to_enemy - player_angle)
-        
-        # WICHTIG: Das Vorzeichen sollte NICHT pauschal invertiert werden, da dies
-        # nur in bestimmten Winkelbereichen korrekt funktioniert.
-        # Wir lassen es jetzt unverändert für konsistente Darstellung.
-        
-        # Zusätzliche Normalisierung für Grenzfälle (wichtig bei Winkeln nahe ±π)
-        if relative_angle < -math.pi:
-            relative_angle += 2 * math.pi
-        elif relative_angle > math.pi:
-            relative_angle -= 2 * math.pi
-        
-        # Debug-Ausgabe im Debug-Modus für jeden 10. Gegner (wenn aktiviert)
-        if RENDERING_DEBUG_MODE and random.random() < 0.05:  # Auf 5% reduziert
-            print(f"Gegner ID={id(enemy)}: Weltpos=({enemy.x:.2f}, {enemy.y:.2f})")
-            print(f"  Relativ zum Spieler: dx={dx:.2f}, dy={dy:.2f}, Dist={dist:.2f}")
-            print(f"  Absoluter Winkel: {math.degrees(absolute_angle_to_enemy):.1f}°")
-            print(f"  Relativer Winkel zur Kamera: {math.degrees(relative_angle):.1f}°")
-        
-        # SCHRITT 5: GEGNER ZUR RENDERING-LISTE HINZUFÜGEN
-        sprites_to_render.append({
-            'type': 'enemy',
-            'obj': enemy,
-            'dist': dist,           # Für Sortierung und Skalierung
-            'dx': dx,               # Relative X-Position vom Spieler
-            'dy': dy,               # Relative Y-Position vom Spieler
-            'world_x': enemy.x,     # Absolute X-Position in der Welt
-            'world_y': enemy.y,     # Absolute Y-Position in der Welt
-            'abs_angle': absolute_angle_to_enemy,  # Winkel in Weltkoordinaten
-            'rel_angle': relative_angle            # Winkel relativ zur Kamera
-        })
-    
-    # Abschließende Debug-Ausgabe
-    if RENDERING_DEBUG_MODE and pg.time.get_ticks() % 180 == 0:
-        print(f"Gesammelte Gegner: {len([s for s in sprites_to_render if s['type'] == 'enemy'])}")
-        print("=== GEGNER-SPRITE-SAMMLUNG ENDE ===\n")
-        
-        # SELTENES LOGGING ZUR FEHLERSUCHE (nur für 2% der Gegner)
-        if random.random() < 0.02:
-            print(f"Gegner an ({enemy.x:.2f}, {enemy.y:.2f}) - " +
-                  f"Relativ zum Spieler: ({dx:.2f}, {dy:.2f}), " +
-                  f"Winkel: {math.degrees(absolute_angle_to_enemy):.1f}°, " +
-                  f"Relativ zur Blickrichtung: {math.degrees(relative_angle):.1f}°")
-        # Diese Debug-Info entfernen, da 'dist' hier noch nicht definiert ist
-        # und wir bereits bessere Debug-Ausgaben haben
-    
-    # SCHRITT 2B: PROJEKTILE/SCHÜSSE SAMMELN
-    # Debug-Information, wenn Debug-Modus aktiv
-    if RENDERING_DEBUG_MODE and pg.time.get_ticks() % 180 == 0:
-        print("\n=== PROJEKTIL-SPRITE-SAMMLUNG START ===")
-        print(f"Aktive Projektile: {len([b for b in bullets if b.active])}")
-    
-    for bullet in bullets:
-        if not bullet.active:
-            continue
-        
-        # SCHRITT 1: WELTPOSITION BESTIMMEN
-        # Bei Wandtreffern die Trefferposition verwenden, sonst aktuelle Position
-        bullet_world_x = bullet.hit_pos_x if bullet.hit_wall else bullet.x
-        bullet_world_y = bullet.hit_pos_y if bullet.hit_wall else bullet.y
-        
-        # SCHRITT 2: RELATIVE POSITION BERECHNEN
-        # Vektor vom Spieler zum Projektil
-        dx = bullet_world_x - player_x
-        dy = bullet_world_y - player_y
-        
-        # SCHRITT 3: DISTANZ BERECHNEN
-        # Für korrekte Größenskalierung und Z-Buffer
-        dist = math.sqrt(dx*dx + dy*dy)
-        
-        # SCHRITT 4: WINKEL BERECHNEN
-        # Absoluter Winkel in der Welt (vom Spieler zum Projektil)
-        absolute_angle_to_bullet = math.atan2(dy, dx)
-        
-        # SCHRITT 5: RELATIVER WINKEL ZUR KAMERA
-        # KERNPROBLEM GELÖST: Korrekte Berechnung des relativen Winkels
-        # Bei Drehung nach rechts müssen Objekte nach links wandern
-        relative_angle = normalize_angle(absolute_angle_to_bullet - player_angle)
-        
-        # WICHTIG: Das Vorzeichen sollte wie bei den Gegnern behandelt werden
-        # für eine konsistente Darstellung aller Objekte in der 3D-Ansicht.
-        
-        # Zusätzliche Normalisierung für Grenzfälle (wichtig bei Winkeln nahe ±π)
-        if relative_angle < -math.pi:
-            relative_angle += 2 * math.pi
-        elif relative_angle > math.pi:
-            relative_angle -= 2 * math.pi
-        
-        # Debug-Ausgabe für einzelne Projektile (reduziert für bessere Performance)
-        if RENDERING_DEBUG_MODE and random.random() < 0.02:  # Auf 2% reduziert
-            print(f"Projektil: Weltpos=({bullet_world_x:.2f}, {bullet_world_y:.2f})")
-            print(f"  Rel. zum Spieler: dx={dx:.2f}, dy={dy:.2f}, Dist={dist:.2f}")
-            print(f"  Abs. Winkel: {math.degrees(absolute_angle_to_bullet):.1f}°")
-            print(f"  Rel. Winkel: {math.degrees(relative_angle):.1f}°")
-            print(f"  Status: {'Wandtreffer' if bullet.hit_wall else 'In Bewegung'}")
-        
-        # SCHRITT 6: PROJEKTIL ZUR RENDERING-LISTE HINZUFÜGEN
-        sprites_to_render.append({
-            'type': 'bullet',
-            'obj': bullet,
-            'dist': dist,          # Für Sortierung und Z-Buffer
-            'dx': dx,              # Relative X-Position
-            'dy': dy,              # Relative Y-Position
-            'world_x': bullet_world_x,  # Absolute X-Position
-            'world_y': bullet_world_y,  # Absolute Y-Position
-            'abs_angle': absolute_angle_to_bullet,  # Absoluter Winkel
-            'rel_angle': relative_angle,            # Relativer Winkel zur Kamera
-            'hit_wall': bullet.hit_wall,            # Für Spezialeffekte
-            'hit_frames': bullet.hit_frames         # Für Animation
-        })
-    
-    # Abschließende Debug-Ausgabe
-    if RENDERING_DEBUG_MODE and pg.time.get_ticks() % 180 == 0:
-        print(f"Gesammelte Projektile: {len([s for s in sprites_to_render if s['type'] == 'bullet'])}")
-        print("=== PROJEKTIL-SPRITE-SAMMLUNG ENDE ===\n")
-        
-        # Optimierungshinweis: Wir haben redundante Debug-Ausgaben entfernt und 
-        # durch den zentralen Debug-Modus ersetzt
-    
-    # SORTIEREN DER SPRITES: Wichtig, damit entfernte zuerst gezeichnet werden (Painter's Algorithm)
-    sprites_to_render.sort(key=lambda sprite: sprite['dist'], reverse=True)
-    
+
+    # Positionen in Arrays packen: erst die Gegner, dahinter die Schüsse aus dem Pool
+    # (Schüsse nach einem Treffer stehen an der Trefferposition)
+    sprite_objs = list(enemy_store.live_enemies)
+    num_enemy_sprites = len(sprite_objs)
+    enemy_slots = enemy_store.active_indices()
+    bullet_slots = bullet_pool.active_indices()
+    positions = np.concatenate((
+        np.column_stack((enemy_store.x[enemy_slots], enemy_store.y[enemy_slots])),
+        np.column_stack((bullet_pool.x[bullet_slots], bullet_pool.y[bullet_slots]))))
+
+    # Vorauswahl über das Sichtbarkeitsfeld (PVS der Spielerzelle): Sprites in Zellen, die
+    # von der Spielerzelle aus (auch nicht über eine Nachbarzelle) nicht sichtbar sind, gar
+    # nicht erst projizieren und sortieren. Sprites außerhalb des Fensters (weiter als
+    # VISIBILITY_RADIUS) bleiben Kandidaten und werden wie bisher am Z-Buffer geprüft
+    visibility_field.update(player_x, player_y)
+    can_be_seen = (visibility_field.lookup(positions[:, 0], positions[:, 1], near=True)
+                   | ~visibility_field.covers(positions[:, 0], positions[:, 1]))
+    can_be_seen[:num_enemy_sprites] |= RENDERING_ALWAYS_SHOW_ENEMIES
+    can_be_seen[num_enemy_sprites:] |= RENDERING_ALWAYS_SHOW_BULLETS
+    candidates = np.flatnonzero(can_be_seen)
+
+    # SCHRITT 2B: VEKTORISIERTE PROJEKTION, FOV-CULLING UND SORTIERUNG (nur Kandidaten,
+    # alle Projektionsarrays sind nach Kandidaten indiziert)
+    order, sprite_dists, sprite_angles, sprite_dx, sprite_dy = project_sprites(
+        positions[candidates, 0], positions[candidates, 1], player_x, player_y, player_angle)
+
+    # Bildschirmposition aller Sprites in einem Schritt
+    # Wir bilden den Winkelbereich [-FOV/2, FOV/2] auf den Bildschirm [0, WIDTH] ab,
+    # die Mitte des Bildschirms (WIDTH/2) entspricht einem relativen Winkel von 0
+    margin = 30  # Mindestabstand vom Bildschirmrand (in Pixeln)
+    sprite_screen_x = np.clip((0.5 + sprite_angles / FOV) * WIDTH, margin, WIDTH - margin).astype(np.intp)
+
     # UMFASSENDE DEBUGGING-STATISTIK (praktisch deaktiviert)
     if RENDERING_DEBUG_MODE and pg.time.get_ticks() % 3000 == 0 and random.random() < 0.01:  # Nur 1% alle 50 Sekunden
         print("\n======= SPRITE-RENDERING-STATISTIK =======")
         print(f"Spieler: Position=({player_x:.2f}, {player_y:.2f}), Blickwinkel={math.degrees(player_angle):.1f}°")
         print(f"Sichtfeld (FOV): {math.degrees(FOV):.1f}° ({math.degrees(HALF_FOV):.1f}° in jede Richtung)")
-        print(f"Sprites gesamt: {len(sprites_to_render)}")
-        print(f"  - Gegner: {len([s for s in sprites_to_render if s['type'] == 'enemy'])}")
-        print(f"  - Projektile: {len([s for s in sprites_to_render if s['type'] == 'bullet'])}")
+        print(f"Sprites gesamt: {len(positions)}, davon im Sichtfeld: {len(order)}")
+        print(f"  - Gegner: {num_enemy_sprites}")
+        print(f"  - Projektile: {len(bullet_slots)}")
         print("===========================================\n")
-    
-    # ZÄHLER FÜR STATISTIK
-    sprites_seen = 0        # Gesamtzahl der gerenderten Sprites
-    sprites_in_fov = 0      # Sprites im Sichtfeld (nicht am Rand)
-    
-    # SCHRITT 3: SPRITE-RENDERING
-    for sprite in sprites_to_render:
-        # SCHRITT 3.1: DIREKTES VERWENDEN DER VORBERECHNETEN WERTE
-        # Wir nutzen die vorberechneten Werte statt neue Berechnungen durchzuführen
-        dist = sprite['dist']
-        relative_angle = sprite['rel_angle']  # Geändert von relative_angle zu rel_angle
-        
-        # VEREINFACHTE BERECHNUNG: Keine spezielle Behandlung mehr basierend auf der Entfernung
-        # Wir verwenden direkt die berechneten Werte und entfernen die unnötige Neuberechnung
-        if sprite['type'] == 'enemy':
-            # Verwende direkt die bereits berechneten Werte aus dem Sprite-Objekt
-            dx = sprite['dx'] 
-            dy = sprite['dy']
-            dist = sprite['dist']  # Nutze gespeicherte Distanz
-            
-            # Wir verwenden den bereits berechneten relativen Winkel ohne Änderung
-            # Das vermeidet Inkonsistenzen zwischen verschiedenen Bereichen des Codes
-            relative_angle = sprite['rel_angle']
-        
-        # KERNALGORITHMUS DER PERSPEKTIVISCHEN PROJEKTION
-        
-        # SCHRITT 3.2: BILDSCHIRMPOSITION BERECHNEN
-        #
-        # Dies ist DIE kritische Formel für die korrekte Positionierung
-        # Wir bilden den Winkelbereich [-FOV/2, FOV/2] auf den Bildschirm [0, WIDTH] ab
-        # Die Mitte des Bildschirms (WIDTH/2) entspricht einem relativen Winkel von 0
-        # Negative Winkel sind links, positive rechts von der Mitte
-        #
-        # KORRIGIERTER FIX:
-        # 1. Zusätzliche Normalisierung für Grenzbereiche
-        if relative_angle < -math.pi:
-            relative_angle += 2 * math.pi
-        elif relative_angle > math.pi:
-            relative_angle -= 2 * math.pi
-            
-        # NEUE VERBESSERTE FORMEL:
-        # Hier liegt der Schlüssel zur korrekten Darstellung
-        # Das Mapping zwischen relativem Winkel und Bildschirmposition muss konsistent sein:
-        # - Objekte links vom Spieler (negative Winkel) müssen rechts auf dem Bildschirm erscheinen
-        # - Objekte rechts vom Spieler (positive Winkel) müssen links auf dem Bildschirm erscheinen
-        sprite_screen_x = (0.5 + relative_angle / FOV) * WIDTH
-        
-        # SEHR DETAILLIERTES DEBUGGING für Gegner (extrem reduziert)
-        if RENDERING_DEBUG_MODE and random.random() < 0.0001 and sprite['type'] == 'enemy':  # Auf 0.01% reduziert
-            enemy = sprite['obj']
-            print("\n=== DETAILLIERTE PROJEKTION (GEGNER) ===")
-            print(f"ID: {id(enemy)}, Position: ({enemy.x:.2f}, {enemy.y:.2f})")
-            print(f"Spieler: ({player_x:.2f}, {player_y:.2f}), Blick: {math.degrees(player_angle):.1f}°")
-            print(f"Relativer Winkel: {math.degrees(relative_angle):.2f}°")
-            print(f"Projektion: 0.5 - {relative_angle:.4f}/{FOV:.4f} = {0.5 - relative_angle/FOV:.4f}")
-            print(f"Bildschirmposition: {sprite_screen_x:.1f} von {WIDTH} Pixeln")
-            if abs(relative_angle) > HALF_FOV:
-                print(f"HINWEIS: Objekt außerhalb des Sichtfelds (HALF_FOV={math.degrees(HALF_FOV):.1f}°)")
-            print("==========================================\n")
-        
-        # SCHRITT 3.3: SICHTBARKEIT BESTIMMEN UND SCREEN_X FESTLEGEN
-        margin = 30  # Mindestabstand vom Bildschirmrand (in Pixeln)
-        
-        # Prüfen, ob das Objekt innerhalb des strengen Sichtfelds liegt
-        # KORRIGIERT: Nur Gegner im tatsächlichen Sichtfeld anzeigen
-        if abs(relative_angle) < HALF_FOV:  # Nur im exakten FOV anzeigen
-            # Position aus korrigierter Projektion übernehmen
-            screen_x = int(min(WIDTH - margin, max(margin, sprite_screen_x)))
-            sprites_in_fov += 1  # Statistik: Im Sichtfeld
-            
-            # Flag setzen, dass der Gegner sichtbar ist
-            sprite['is_visible'] = True
-        else:
-            # Außerhalb des Sichtfelds - NICHT anzeigen
-            sprite['is_visible'] = False
-            # Position außerhalb des Bildschirms setzen (wird später kontrolliert)
-            screen_x = -1000
-        
-        # Statistik: Sprite wurde verarbeitet
-        sprites_seen += 1
-        
-        # DEBUG: Zusammenfassung der finalen Position (nur wenn Debug-Modus aktiv)
-        if RENDERING_DEBUG_MODE and random.random() < 0.001 and sprite['type'] == 'enemy':  # Stark reduziert
-            enemy = sprite['obj']
-            in_fov_text = "IM SICHTFELD" if abs(relative_angle) < HALF_FOV else "AUSSERHALB SICHTFELD"
-            print(f"POSITION: Gegner bei ({enemy.x:.1f}, {enemy.y:.1f}) -> Screen-X: {screen_x}")
-            print(f"  Dist: {dist:.1f}, Status: {in_fov_text}, Winkel: {math.degrees(relative_angle):.1f}°")
-            
+
+    # SCHRITT 3: SPRITE-RENDERING (nur Sprites im Sichtfeld, von hinten nach vorne)
+    for candidate in order.tolist():
+        index = int(candidates[candidate])  # Index in positions (Gegner zuerst, dann Schüsse)
+        dist = float(sprite_dists[candidate])
+        screen_x = int(sprite_screen_x[candidate])
+
         # Größe des Sprites basierend auf Entfernung
         sprite_size = int(min(HEIGHT, WIDTH / 2) / (dist + 0.0001))
         
@@ -901,12 +3824,8 @@ def draw_3d_view(screen):
         sprite_top = HALF_HEIGHT - sprite_size // 2
         
         # Wenn es ein Gegner ist
-        if sprite['type'] == 'enemy':
-            enemy = sprite['obj']
-            
-            # Überprüfen, ob der Gegner sichtbar ist - wenn nicht, überspringen
-            if not sprite.get('is_visible', False):
-                continue
+        if index < num_enemy_sprites:
+            enemy = sprite_objs[index]
             
             # ABSOLUTE MEGA-SICHTBARKEIT: Gegner sind immer gut zu sehen
             # In allen Entfernungen gut sichtbar mit Mindestgröße
@@ -937,47 +3856,21 @@ def draw_3d_view(screen):
             # NIEMALS unter die Mindestgröße fallen
             final_size = max(min_size, calc_size)
             
-            # Position im Bildschirm wird IMMER genutzt
-            # Wir haben bereits sichergestellt, dass screen_x innerhalb der Bildschirmgrenzen liegt
-            # Gegner IMMER sichtbar machen, komplett unabhängig von Wänden
-            # Aber mit Unterscheidung zwischen Gegnern vor und hinter Wänden
-            ray_pos = min(WIDTH-1, max(0, screen_x))  # Begrenze auf Bildschirmgrenzen
-            
-            # Prüfen ob der Gegner hinter einer Wand ist
-            # Die Z-Buffer-Distanz an dieser Stelle gibt die Wandentfernung an
-            wall_dist = z_buffer[ray_pos]
-            behind_wall = (dist > wall_dist)
-            
-            # STARKER FARBUNTERSCHIED für Sichtbarkeit hinter Wänden
-            if behind_wall and RENDERING_ALWAYS_SHOW_ENEMIES:
-                # X-RAY SICHT: Gegner hinter Wand mit speziellem Effekt
-                
-                # 1. Blauer Farbton für "durch Wand sichtbar"-Effekt
-                enemy_color = (50, 50, 255)  # Kräftiges Blau für Gegner hinter Wänden
-                
-                # 2. LEUCHTENDE Kontur für maximale Sichtbarkeit hinter Wänden
-                # Größerer Kontur-Umriss
-                outline_size = max(2, final_size // 6)
-                
-                # Äußere Kontur (cyan/türkis) für Kontrast
-                pg.draw.rect(screen, (0, 255, 255), 
-                           (screen_x - final_size//2 - outline_size, 
-                            sprite_top + final_size//4 - outline_size, 
-                            final_size + outline_size*2, 
-                            final_size + outline_size*2), 
-                            outline_size)
-                            
-                # Zweite innere Kontur (weiß) für noch besseren Kontrast
-                inner_outline = max(1, outline_size // 2)
-                pg.draw.rect(screen, (200, 200, 255), 
-                           (screen_x - final_size//2 - inner_outline, 
-                            sprite_top + final_size//4 - inner_outline, 
-                            final_size + inner_outline*2, 
-                            final_size + inner_outline*2), 
-                            inner_outline)
+            # Größe quantisieren, damit vorgerenderte Flächen wiederverwendet werden
+            final_size = max(min_size, int(round(final_size / ENEMY_SPRITE_SIZE_STEP)) * ENEMY_SPRITE_SIZE_STEP)
+
+            # VERDECKUNG PRO SPALTE: Sprite-Tiefe gegen den überdeckten Z-Buffer-Ausschnitt
+            if RENDERING_ALWAYS_SHOW_ENEMIES:
+                clip_rects = [None]  # X-Ray: immer vollständig zeichnen
             else:
-                # Gegner im Vordergrund: Leuchtend rot
-                enemy_color = (255, 0, 0)  # Reines Rot
+                sprite_left = screen_x - final_size//2
+                clip_rects = sprite_clip_rects(z_buffer, dist, sprite_left, sprite_left + final_size, HEIGHT)
+                if not clip_rects:
+                    continue  # Vollständig verdeckt - keine Zeichenarbeit
+
+            # Prüfen ob die Sprite-Mitte hinter einer Wand ist (für den X-Ray-Effekt)
+            ray_pos = min(WIDTH-1, max(0, screen_x))  # Begrenze auf Bildschirmgrenzen
+            behind_wall = (dist > z_buffer[ray_pos])
                 
             # Verbesserte Debug-Info für bessere Fehlerdiagnose
             if pg.time.get_ticks() % 300 == 0 and random.random() < 0.05:  # 5% Chance alle 5 Sekunden
@@ -991,131 +3884,17 @@ def draw_3d_view(screen):
                           f"({enemy.x:.2f}, {enemy.y:.2f}) -> "
                           f"Bildschirmposition: {screen_x:.2f}, "
                           f"Unabhängig vom Spielerwinkel: {player_angle:.2f}")
-            
-            # VIEL GRÖSSERER Körper für bessere Sichtbarkeit
-            # Grundform: Rechteck
-            pg.draw.rect(screen, enemy_color, 
-                       (screen_x - final_size//2, sprite_top + final_size//4, 
-                       final_size, final_size))
-            
-            # Kopf: Deutlich größerer Kreis
-            pg.draw.circle(screen, enemy_color, 
-                          (screen_x, sprite_top + final_size//5), 
-                          int(final_size * 0.4))  # Größerer Kopf: 40% der Gesamtgröße
-                
-            # ULTRA-AUFFÄLLIGE AUGEN für perfekte Sichtbarkeit
-            eye_spacing = final_size // 5
-            
-            # Äußerer Glow-Effekt für die Augen (leicht pulsierend)
-            pulse = (math.sin(pg.time.get_ticks() / 150) * 0.2 + 0.8)  # 0.6 bis 1.0
-            glow_size = max(4, int(final_size * 0.25 * pulse))
-            
-            # Leuchtender Glow um die Augen herum - weiße Aura
-            pg.draw.circle(screen, (255, 255, 255, 180),  # Halbtransparentes Weiß
-                         (screen_x - eye_spacing, sprite_top + final_size//5), 
-                         glow_size)
-            pg.draw.circle(screen, (255, 255, 255, 180),  # Halbtransparentes Weiß
-                         (screen_x + eye_spacing, sprite_top + final_size//5), 
-                         glow_size)
-            
-            # Große, leuchtende Augen - intensiver Kontrast 
-            eye_size = max(4, int(final_size * 0.15))
-            
-            # Extra Kontur um die Augen (schwarz)
-            outline = max(1, int(eye_size * 0.2))
-            pg.draw.circle(screen, (0, 0, 0),  # Schwarz
-                         (screen_x - eye_spacing, sprite_top + final_size//5), 
-                         eye_size + outline)
-            pg.draw.circle(screen, (0, 0, 0),  # Schwarz
-                         (screen_x + eye_spacing, sprite_top + final_size//5), 
-                         eye_size + outline)
-            
-            # Eigentliche Augen - extraleuchtendes Gelb
-            pg.draw.circle(screen, (255, 255, 0),  # Gelb
-                         (screen_x - eye_spacing, sprite_top + final_size//5), 
-                         eye_size)
-            pg.draw.circle(screen, (255, 255, 0),  # Gelb
-                         (screen_x + eye_spacing, sprite_top + final_size//5), 
-                         eye_size)
-            
-            # Große, leuchtend rote Pupillen für dämonischen Effekt
-            pupil_size = max(2, int(eye_size * 0.6))
-            pg.draw.circle(screen, (255, 0, 0),  # Rot
-                         (screen_x - eye_spacing, sprite_top + final_size//5), 
-                         pupil_size)
-            pg.draw.circle(screen, (255, 0, 0),  # Rot
-                         (screen_x + eye_spacing, sprite_top + final_size//5), 
-                         pupil_size)
-                         
-            # Innerster Glanzpunkt für 3D-Effekt (weißer Punkt)
-            shine_size = max(1, int(pupil_size * 0.3))
-            shine_offset = max(1, int(pupil_size * 0.2))
-            pg.draw.circle(screen, (255, 255, 255),  # Weiß
-                         (screen_x - eye_spacing - shine_offset, 
-                          sprite_top + final_size//5 - shine_offset), 
-                         shine_size)
-            pg.draw.circle(screen, (255, 255, 255),  # Weiß
-                         (screen_x + eye_spacing - shine_offset, 
-                          sprite_top + final_size//5 - shine_offset), 
-                         shine_size)
-            
-            # Normale, aber gut sichtbare Gesundheitsanzeige
-            health_bar_height = max(3, int(final_size * 0.07))  # 7% der Gesamtgröße
-            health_width = int(final_size * (enemy.health / 50))
-            
-            # Hintergrund (roter Balken)
-            pg.draw.rect(screen, (150, 0, 0), 
-                       (screen_x - final_size//2, sprite_top - health_bar_height*2, 
-                        final_size, health_bar_height))
-            
-            # Vordergrund (grüner Balken)
-            pg.draw.rect(screen, (0, 200, 0), 
-                       (screen_x - final_size//2, sprite_top - health_bar_height*2, 
-                        health_width, health_bar_height))
-            
-            # Dünner Rahmen für bessere Sichtbarkeit
-            pg.draw.rect(screen, (255, 255, 255), 
-                       (screen_x - final_size//2, sprite_top - health_bar_height*2, 
-                        final_size, health_bar_height), 1)  # 1 Pixel Rand
-            
-            # VERBESSERTE Status-Anzeige mit verschiedenen Zuständen
-            status_size = max(3, int(final_size * 0.08))  # 8% der Gesamtgröße
-            
-            # Unterschiedliche Farben basierend auf dem aktuellen Zustand
-            if enemy.movement_state == "idle":
-                # Grün = Idle/Ruhezustand (passive)
-                status_color = (0, 200, 0)
-            elif enemy.movement_state == "patrol":
-                # Blau = Patrouille (neutral)
-                status_color = (50, 100, 255)
-            elif enemy.movement_state == "chase":
-                # Rot = Verfolgung (aggressiv)
-                status_color = (255, 50, 50)
-            elif enemy.movement_state == "retreat":
-                # Gelb = Rückzug (Flucht)
-                status_color = (255, 255, 0)
-            else:
-                # Fallback für unbekannte Zustände
-                status_color = (150, 150, 150)
-                
-            # Zeichne Statusindikator
-            pg.draw.circle(screen, status_color, 
-                          (screen_x, sprite_top - health_bar_height*3), status_size)
-                          
-            # Pulsierender Effekt für den Chase-Zustand
-            if enemy.movement_state == "chase":
-                # Extra pulsierender Ring für Verfolgungsmodus
-                pulse = (math.sin(pg.time.get_ticks() / 120) * 0.5 + 0.5)  # 0.0 bis 1.0
-                outer_size = status_size + int(status_size * pulse)
-                pg.draw.circle(screen, (255, 100, 100, 150), 
-                             (screen_x, sprite_top - health_bar_height*3), outer_size, 1)
+
+            # Nur die sichtbaren vertikalen Streifen zeichnen
+            for clip_rect in clip_rects:
+                screen.set_clip(clip_rect)
+                draw_enemy_sprite(screen, enemy, screen_x, sprite_top, final_size, behind_wall)
+            screen.set_clip(None)
         
         # Wenn es ein Schuss ist
-        elif sprite['type'] == 'bullet':
-            # Überprüfen, ob der Schuss sichtbar ist - wenn nicht, überspringen
-            if not sprite.get('is_visible', False):
-                continue
-                
+        else:
+            bullet_slot = bullet_slots[index - num_enemy_sprites]
+
             # ULTIMATIV SICHTBARE KUGELN
             # Verwende die globalen Konstanten für konsistente Darstellung
             base_bullet_size = int(sprite_size * BULLET_BASE_SIZE_FACTOR)
@@ -1151,140 +3930,41 @@ def draw_3d_view(screen):
                 print(f"Zeichne Schuss bei {screen_x},{bullet_y} | Größe={bullet_size}, Entfernung={dist:.1f}")
                 
             # Prüfen ob die Kugel eine Wand getroffen hat
-            hit_wall = sprite.get('hit_wall', False)
-            hit_frames = sprite.get('hit_frames', 0)
+            hit_wall = bool(bullet_pool.hit_wall[bullet_slot])
+            hit_frames = float(bullet_pool.hit_frames[bullet_slot])
             
+            # Ausdehnung des Effekts (Explosion mit Funken bzw. Kugel mit Schweif)
+            if hit_wall:
+                explosion_size = int(bullet_size * 3.0 * hit_frames / 30.0)
+                half_extent = explosion_size * 2 + 3
+            else:
+                half_extent = bullet_size * max(2.0, BULLET_TRAIL_LENGTH)
+
+            # VERDECKUNG PRO SPALTE wie bei den Gegnern
+            if RENDERING_ALWAYS_SHOW_BULLETS:
+                clip_rects = [None]
+            else:
+                clip_rects = sprite_clip_rects(z_buffer, dist, screen_x - half_extent,
+                                               screen_x + half_extent + 1, HEIGHT)
+                if not clip_rects:
+                    continue  # Vollständig verdeckt - keine Zeichenarbeit
+
             # Prüfen, ob die Kugel hinter einer Wand ist
             ray_pos = min(WIDTH-1, max(0, screen_x))
             bullet_behind_wall = (dist > z_buffer[ray_pos])
-            
-            # Spezielle Darstellung für Wandtreffer
+
+            # Funkenstrahlen einmal pro Frame würfeln (gleich für alle Teilstreifen)
+            sparks = []
             if hit_wall:
-                # ULTRA-EXPLOSIVE Effekte bei Wandtreffer
-                # Intensität der Explosion basierend auf verbleibenden Frames
-                intensity = hit_frames / 30.0  # 0.0 bis 1.0
-                
-                # Größere Explosionsgröße für bessere Sichtbarkeit
-                explosion_size = int(bullet_size * 3.0 * intensity)
-                
-                # EXTRA: Bei Kugeln hinter Wänden trotzdem sichtbar machen
-                if bullet_behind_wall and RENDERING_ALWAYS_SHOW_BULLETS:
-                    # Explosionskontur für bessere Sichtbarkeit hinter Wänden
-                    outline_size = 3
-                    pg.draw.circle(screen, (0, 200, 255), 
-                                 (screen_x, bullet_y), 
-                                 explosion_size + outline_size, outline_size)
-                
-                # 1. Äußerer Explosionskreis (intensiv gelb-orange-rot)
-                # Stärkere Farben für bessere Sichtbarkeit
-                pg.draw.circle(screen, (255, 100 + int(155 * intensity), 0), 
-                             (screen_x, bullet_y), explosion_size)
-                
-                # 2. Mittlerer Explosionskreis (hell-orange bis gelb)
-                mid_size = int(explosion_size * 0.7)  # Größerer mittlerer Kreis
-                pg.draw.circle(screen, (255, 180 + int(75 * intensity), 0), 
-                             (screen_x, bullet_y), mid_size)
-                
-                # 3. Kern der Explosion (weiß-gelb mit Pulsieren)
-                # Pulsierender Kern für mehr visuelle Auffälligkeit
-                pulse_factor = 0.8 + math.sin(pg.time.get_ticks() / 50) * 0.2  # 0.6 bis 1.0
-                core_size = int(explosion_size * 0.4 * pulse_factor)
-                pg.draw.circle(screen, (255, 255, 100), 
-                             (screen_x, bullet_y), core_size)
-                
-                # Innerer leuchtender Punkt (weiß) für Kontrast
-                pg.draw.circle(screen, (255, 255, 255), 
-                             (screen_x, bullet_y), int(core_size * 0.3))
-                
-                # 4. MEHR Funkenstrahlen in ALLE Richtungen
-                # Stärkerer visueller Effekt mit mehr Strahlen
-                num_rays = int(16 * intensity)  # Mehr Strahlen!
-                for i in range(num_rays):
-                    # Zufälliger Winkel im 360°-Bereich für Rundumeffekt
-                    ray_angle = random.uniform(0, 2 * math.pi)
-                    
-                    # Zufällige, längere Strahlen
-                    ray_length = random.uniform(explosion_size * 0.5, explosion_size * 2.0)
-                    
-                    # Endpunkt berechnen
-                    end_x = screen_x + math.cos(ray_angle) * ray_length
-                    end_y = bullet_y + math.sin(ray_angle) * ray_length
-                    
-                    # Farbe basierend auf Intensität - verschiedene Farben für Effekt
-                    if i % 3 == 0:
-                        ray_color = (255, 200, 0)  # Gelb
-                    elif i % 3 == 1:
-                        ray_color = (255, 100, 0)  # Orange
-                    else:
-                        ray_color = (255, 255, 100)  # Helles Gelb
-                        
-                    # Dickere Strahlen für bessere Sichtbarkeit
-                    pg.draw.line(screen, ray_color, 
-                               (screen_x, bullet_y), (end_x, end_y), 
-                               max(2, int(3 * intensity)))
-            else:
-                # ULTRA-AUFFÄLLIGE KUGEL in Bewegung
-                
-                # Spezielle Behandlung für Kugeln hinter Wänden
-                if bullet_behind_wall and RENDERING_ALWAYS_SHOW_BULLETS:
-                    # Blauer Randeffekt für Kugeln hinter Wänden
-                    outline_size = 3
-                    pg.draw.circle(screen, (0, 200, 255), 
-                                 (screen_x, bullet_y), 
-                                 bullet_size * 1.8, outline_size)
-                
-                # 1. Äußerer Leuchtkreis (hellgelb) - GRÖSSER und HELLER
-                outer_size = bullet_size * 2.0
-                pg.draw.circle(screen, (255, 255, 150), (screen_x, bullet_y), outer_size)
-                
-                # 2. Mittlerer Kreis (intensiv gelb)
-                mid_size = bullet_size * 1.5
-                pg.draw.circle(screen, (255, 255, 0), (screen_x, bullet_y), mid_size)
-                
-                # 3. Innerer Kern (weiß - strahlend hell)
-                inner_size = bullet_size * 0.7
-                pg.draw.circle(screen, (255, 255, 255), (screen_x, bullet_y), inner_size)
-                
-                # 4. EXTRA-LANGER Bewegungstrail für maximale Sichtbarkeit
-                # Berechne Richtungsvektor
-                angle = math.atan2(sprite['dy'], sprite['dx'])
-                
-                # Flugrichtung mit Streifen zeigen (entgegen der Bewegungsrichtung)
-                reverse_angle = angle + math.pi
-                
-                # DEUTLICH längerer Trail für bessere Sichtbarkeit
-                streak_length = bullet_size * BULLET_TRAIL_LENGTH
-                end_x = screen_x + math.cos(reverse_angle) * streak_length
-                end_y = bullet_y + math.sin(reverse_angle) * streak_length
-                
-                # MEHRERE Streifen für "Feuer"-Effekt
-                
-                # 1. Äußerer Streifen (gelb, breit, transparent)
-                outer_streak_width = max(4, int(bullet_size * 0.9))
-                pg.draw.line(screen, (255, 255, 0, 100), 
-                           (screen_x, bullet_y), (end_x, end_y), outer_streak_width)
-                
-                # 2. Mittlerer Streifen (orange)
-                mid_streak_width = max(3, int(bullet_size * 0.7))
-                mid_streak_length = streak_length * 0.8
-                mid_end_x = screen_x + math.cos(reverse_angle) * mid_streak_length
-                mid_end_y = bullet_y + math.sin(reverse_angle) * mid_streak_length
-                pg.draw.line(screen, (255, 200, 0, 150), 
-                           (screen_x, bullet_y), (mid_end_x, mid_end_y), mid_streak_width)
-                
-                # 3. Innerer Streifen (weiß, intensiv)
-                inner_streak_width = max(2, int(bullet_size * 0.4))
-                inner_streak_length = streak_length * 0.5
-                inner_end_x = screen_x + math.cos(reverse_angle) * inner_streak_length
-                inner_end_y = bullet_y + math.sin(reverse_angle) * inner_streak_length
-                pg.draw.line(screen, (255, 255, 255, 200), 
-                           (screen_x, bullet_y), (inner_end_x, inner_end_y), inner_streak_width)
-                           
-                # 4. BONUS: Pulsierender Glow-Effekt um die Kugel
-                pulse_time = pg.time.get_ticks() / 80
-                glow_size = outer_size * (0.9 + math.sin(pulse_time) * 0.1)
-                pg.draw.circle(screen, (255, 255, 200, 50), 
-                             (screen_x, bullet_y), glow_size, 3)
+                sparks = [(random.uniform(0, 2 * math.pi), random.uniform(0.5, 2.0))
+                          for _ in range(int(16 * hit_frames / 30.0))]
+            trail_angle = math.atan2(sprite_dy[candidate], sprite_dx[candidate])
+
+            for clip_rect in clip_rects:
+                screen.set_clip(clip_rect)
+                draw_bullet_sprite(screen, screen_x, bullet_y, bullet_size, hit_wall, hit_frames,
+                                   bullet_behind_wall, trail_angle, sparks)
+            screen.set_clip(None)
     
     # Waffe zeichnen
     weapon_img_height = 200
@@ -1310,16 +3990,32 @@ def draw_minimap(screen):
     """Minimap anzeigen - STARK verbessert für bessere Übersicht"""
     # GRÖSSERE Minimap für bessere Sichtbarkeit
     mini_size = 10  # Doppelt so große Kacheln für bessere Sicht
-    map_width = MAP_SIZE * mini_size
-    map_height = MAP_SIZE * mini_size
+
+    # Ausschnitt um den Spieler (bei kleinen Karten die ganze Karte),
+    # die Wände kommen über die Kachel-API der Karte
+    view_cells = min(MAP_SIZE, MINIMAP_VIEW_CELLS)
+    view_x = min(max(0, int(player_x) - view_cells // 2), MAP_SIZE - view_cells)
+    view_y = min(max(0, int(player_y) - view_cells // 2), MAP_SIZE - view_cells)
+    walls = game_map.window(view_y, view_y + view_cells, view_x, view_x + view_cells)
+    map_width = view_cells * mini_size
+    map_height = view_cells * mini_size
+    screen.set_clip(pg.Rect(0, 0, map_width, map_height))
     
     # Halbtransparenter Hintergrund für bessere Lesbarkeit
     bg_surface = pg.Surface((map_width, map_height), pg.SRCALPHA)
     bg_surface.fill((0, 0, 0, 180))  # Schwarz mit 70% Transparenz
+
+    # Vom Spieler aus sichtbare Zellen leicht grün hinterlegen (Sichtbarkeitsfeld)
+    visibility_field.update(player_x, player_y)
+    for y, x in np.argwhere(visibility_field.visible).tolist():
+        y += visibility_field.row_lo - view_y
+        x += visibility_field.col_lo - view_x
+        if 0 <= y < view_cells and 0 <= x < view_cells and walls[y, x] == 0:
+            bg_surface.fill((30, 70, 30, 180), (x * mini_size, y * mini_size, mini_size, mini_size))
     screen.blit(bg_surface, (0, 0))
     
     # Gitternetz für bessere Orientierung
-    for i in range(MAP_SIZE + 1):
+    for i in range(view_cells + 1):
         # Horizontale Linien
         pg.draw.line(screen, (100, 100, 100), 
                     (0, i * mini_size), 
@@ -1330,11 +4026,9 @@ def draw_minimap(screen):
                     (i * mini_size, map_height), 1)
     
     # Karte zeichnen
-    for y in range(MAP_SIZE):
-        for x in range(MAP_SIZE):
-            if game_map[y][x] > 0:  # Nur Wände zeichnen
-                pg.draw.rect(screen, (200, 200, 200), 
-                            (x * mini_size, y * mini_size, mini_size, mini_size))
+    for y, x in np.argwhere(walls).tolist():  # Nur Wände zeichnen
+        pg.draw.rect(screen, (200, 200, 200), 
+                    (x * mini_size, y * mini_size, mini_size, mini_size))
     
     # LEGENDÄRE Sichtbare Linien zeichnen (Raycasting-Visualisierung)
     # Vereinfachte Strahlen für besseres Verständnis
@@ -1351,124 +4045,134 @@ def draw_minimap(screen):
             check_y = player_y + ray_dir_y * j * 0.1
             
             # Prüfe ob außerhalb der Karte oder Wand getroffen
-            if not (0 <= int(check_x) < MAP_SIZE and 0 <= int(check_y) < MAP_SIZE):
-                break
-            if game_map[int(check_y)][int(check_x)] > 0:
+            if game_map.is_wall(check_x, check_y):
                 break
             
             # Zeichne Punkt entlang des Strahls (semi-transparent)
             if j % 3 == 0:  # Nur jeden dritten Punkt für weniger Überladung
                 pg.draw.circle(screen, (100, 255, 100, 150), 
-                              (int(check_x * mini_size), int(check_y * mini_size)), 1)
+                              (int((check_x - view_x) * mini_size), int((check_y - view_y) * mini_size)), 1)
     
     # Gegner auf der Karte zeichnen - VIEL größer und auffälliger
-    for enemy in enemies:
-        if enemy.active:
-            # Unterschiedliche Farben je nach Zustand des Gegners
-            if enemy.movement_state == "idle":
-                enemy_color = (0, 200, 0)  # Grün im Ruhezustand
-            elif enemy.movement_state == "patrol":
-                enemy_color = (100, 100, 255)  # Blau bei Patrouille
-            elif enemy.movement_state == "chase":
-                enemy_color = (255, 0, 0)  # Rot bei Verfolgung
-            elif enemy.movement_state == "retreat":
-                enemy_color = (255, 255, 0)  # Gelb bei Rückzug
-            else:
-                enemy_color = (150, 150, 150)  # Grau für unbekannte Zustände
+    for enemy in enemy_store.live_enemies:
+        # Gegner außerhalb des Ausschnitts überspringen
+        if not (view_x - 1 <= enemy.x < view_x + view_cells + 1 and
+                view_y - 1 <= enemy.y < view_y + view_cells + 1):
+            continue
+
+        # Unterschiedliche Farben je nach Zustand des Gegners
+        if enemy.movement_state == "idle":
+            enemy_color = (0, 200, 0)  # Grün im Ruhezustand
+        elif enemy.movement_state == "patrol":
+            enemy_color = (100, 100, 255)  # Blau bei Patrouille
+        elif enemy.movement_state == "chase":
+            enemy_color = (255, 0, 0)  # Rot bei Verfolgung
+        elif enemy.movement_state == "retreat":
+            enemy_color = (255, 255, 0)  # Gelb bei Rückzug
+        else:
+            enemy_color = (150, 150, 150)  # Grau für unbekannte Zustände
+
+        # Gegner außerhalb der Sichtlinie abgedunkelt darstellen
+        if not visibility_field.lookup(enemy.x, enemy.y):
+            enemy_color = tuple(channel // 2 for channel in enemy_color)
+        
+        # Pulsierender Effekt für bessere Sichtbarkeit
+        # Stärkeres Pulsieren für aggressivere Zustände
+        if enemy.movement_state == "chase":
+            pulse = (math.sin(pg.time.get_ticks() / 120) * 0.7 + 1.8)  # 1.1 bis 2.5 (schneller, größer)
+        else:
+            pulse = (math.sin(pg.time.get_ticks() / 200) * 0.5 + 1.5)  # 1.0 bis 2.0 (normal)
             
-            # Pulsierender Effekt für bessere Sichtbarkeit
-            # Stärkeres Pulsieren für aggressivere Zustände
-            if enemy.movement_state == "chase":
-                pulse = (math.sin(pg.time.get_ticks() / 120) * 0.7 + 1.8)  # 1.1 bis 2.5 (schneller, größer)
-            else:
-                pulse = (math.sin(pg.time.get_ticks() / 200) * 0.5 + 1.5)  # 1.0 bis 2.0 (normal)
-                
-            enemy_size = int(3 * pulse)
+        enemy_size = int(3 * pulse)
+        
+        # Gegner zeichnen
+        pg.draw.circle(screen, enemy_color, 
+                      (int((enemy.x - view_x) * mini_size), int((enemy.y - view_y) * mini_size)), 
+                      enemy_size)
+                      
+        # Zusätzlich Bewegungsrichtungslinie für bessere Sichtbarkeit
+        if enemy.movement_state in ["patrol", "chase", "retreat"]:
+            # Berechne den Richtungsvektor
+            if enemy.movement_state == "patrol" or enemy.movement_state == "retreat":
+                # Zum Ziel
+                dir_x = enemy.target_x - enemy.x
+                dir_y = enemy.target_y - enemy.y
+            elif enemy.movement_state == "chase":
+                # Zum Spieler
+                dir_x = player_x - enemy.x
+                dir_y = player_y - enemy.y
             
-            # Gegner zeichnen
-            pg.draw.circle(screen, enemy_color, 
-                          (int(enemy.x * mini_size), int(enemy.y * mini_size)), 
-                          enemy_size)
-                          
-            # Zusätzlich Bewegungsrichtungslinie für bessere Sichtbarkeit
-            if enemy.movement_state in ["patrol", "chase", "retreat"]:
-                # Berechne den Richtungsvektor
-                if enemy.movement_state == "patrol" or enemy.movement_state == "retreat":
-                    # Zum Ziel
-                    dir_x = enemy.target_x - enemy.x
-                    dir_y = enemy.target_y - enemy.y
-                elif enemy.movement_state == "chase":
-                    # Zum Spieler
-                    dir_x = player_x - enemy.x
-                    dir_y = player_y - enemy.y
+            # Normalisiere und skaliere den Vektor
+            dir_len = math.sqrt(dir_x*dir_x + dir_y*dir_y)
+            if dir_len > 0.0001:
+                dir_x = dir_x / dir_len * enemy_size * 1.5
+                dir_y = dir_y / dir_len * enemy_size * 1.5
                 
-                # Normalisiere und skaliere den Vektor
-                dir_len = math.sqrt(dir_x*dir_x + dir_y*dir_y)
-                if dir_len > 0.0001:
-                    dir_x = dir_x / dir_len * enemy_size * 1.5
-                    dir_y = dir_y / dir_len * enemy_size * 1.5
-                    
-                    # Zeichne Richtungslinie
-                    pg.draw.line(screen, enemy_color,
-                               (int(enemy.x * mini_size), int(enemy.y * mini_size)),
-                               (int((enemy.x + dir_x) * mini_size), int((enemy.y + dir_y) * mini_size)),
-                               max(1, int(enemy_size / 3)))
+                # Zeichne Richtungslinie
+                pg.draw.line(screen, enemy_color,
+                           (int((enemy.x - view_x) * mini_size), int((enemy.y - view_y) * mini_size)),
+                           (int((enemy.x + dir_x - view_x) * mini_size), int((enemy.y + dir_y - view_y) * mini_size)),
+                           max(1, int(enemy_size / 3)))
     
     # Projektile auf der Karte zeichnen - Größer mit Leuchteffekt
-    for bullet in bullets:
-        if bullet.active:
-            if bullet.hit_wall:
-                # Explosionseffekt auf der Minimap
-                intensity = bullet.hit_frames / 30.0  # 0.0 bis 1.0
-                explosion_size = int(5 * intensity)  # Größe der Explosion auf der Minimap
-                
-                # Hauptexplosion - orange
-                pg.draw.circle(screen, (255, 150, 0), 
-                              (int(bullet.hit_pos_x * mini_size), int(bullet.hit_pos_y * mini_size)), 
-                              explosion_size)
-                
-                # Innere Explosion - helles Gelb
-                inner_size = max(2, int(explosion_size * 0.6))
-                pg.draw.circle(screen, (255, 255, 100), 
-                              (int(bullet.hit_pos_x * mini_size), int(bullet.hit_pos_y * mini_size)), 
-                              inner_size)
-                
-                # Zufällige Partikel um die Explosion
-                particles = int(8 * intensity)
-                for i in range(particles):
-                    angle = random.uniform(0, 2 * math.pi)
-                    dist = random.uniform(explosion_size * 0.5, explosion_size * 2)
-                    px = bullet.hit_pos_x + math.cos(angle) * (dist / mini_size)
-                    py = bullet.hit_pos_y + math.sin(angle) * (dist / mini_size)
-                    size = max(1, int(2 * intensity))
-                    pg.draw.circle(screen, (255, 200, 0), 
-                                  (int(px * mini_size), int(py * mini_size)), 
-                                  size)
-            else:
-                # Bewegungsspur (kleine Punkte hinter dem Projektil)
-                angle = bullet.angle + math.pi  # Umgekehrte Richtung
-                for i in range(1, 10, 2):
-                    trace_x = bullet.x - math.cos(angle) * (i * 0.1)
-                    trace_y = bullet.y - math.sin(angle) * (i * 0.1)
-                    trace_size = 3 - (i // 3)
-                    pg.draw.circle(screen, (200, 200, 0), 
-                                  (int(trace_x * mini_size), int(trace_y * mini_size)), 
-                                  trace_size)
-                
-                # Hauptprojektil - gelb und größer
-                pg.draw.circle(screen, (255, 255, 0), 
-                              (int(bullet.x * mini_size), int(bullet.y * mini_size)), 
-                              3)
-    
+    for slot in bullet_pool.active_indices().tolist():
+        bullet_x = bullet_pool.x[slot]
+        bullet_y = bullet_pool.y[slot]
+        if not (view_x - 1 <= bullet_x < view_x + view_cells + 1 and
+                view_y - 1 <= bullet_y < view_y + view_cells + 1):
+            continue
+        if bullet_pool.hit_wall[slot]:
+            # Explosionseffekt auf der Minimap
+            intensity = bullet_pool.hit_frames[slot] / 30.0  # 0.0 bis 1.0
+            explosion_size = int(5 * intensity)  # Größe der Explosion auf der Minimap
+            
+            # Hauptexplosion - orange
+            pg.draw.circle(screen, (255, 150, 0), 
+                          (int((bullet_x - view_x) * mini_size), int((bullet_y - view_y) * mini_size)), 
+                          explosion_size)
+            
+            # Innere Explosion - helles Gelb
+            inner_size = max(2, int(explosion_size * 0.6))
+            pg.draw.circle(screen, (255, 255, 100), 
+                          (int((bullet_x - view_x) * mini_size), int((bullet_y - view_y) * mini_size)), 
+                          inner_size)
+            
+            # Zufällige Partikel um die Explosion
+            particles = int(8 * intensity)
+            for i in range(particles):
+                angle = random.uniform(0, 2 * math.pi)
+                dist = random.uniform(explosion_size * 0.5, explosion_size * 2)
+                px = bullet_x + math.cos(angle) * (dist / mini_size)
+                py = bullet_y + math.sin(angle) * (dist / mini_size)
+                size = max(1, int(2 * intensity))
+                pg.draw.circle(screen, (255, 200, 0), 
+                              (int((px - view_x) * mini_size), int((py - view_y) * mini_size)), 
+                              size)
+        else:
+            # Bewegungsspur (kleine Punkte hinter dem Projektil)
+            angle = bullet_pool.angle[slot] + math.pi  # Umgekehrte Richtung
+            for i in range(1, 10, 2):
+                trace_x = bullet_x - math.cos(angle) * (i * 0.1)
+                trace_y = bullet_y - math.sin(angle) * (i * 0.1)
+                trace_size = 3 - (i // 3)
+                pg.draw.circle(screen, (200, 200, 0), 
+                              (int((trace_x - view_x) * mini_size), int((trace_y - view_y) * mini_size)), 
+                              trace_size)
+            
+            # Hauptprojektil - gelb und größer
+            pg.draw.circle(screen, (255, 255, 0), 
+                          (int((bullet_x - view_x) * mini_size), int((bullet_y - view_y) * mini_size)), 
+                          3)
+
     # Spieler auf der Karte zeichnen - Größer und auffälliger
     player_radius = 4
     # Hinterer Kreis (Schatten/Halo)
     pg.draw.circle(screen, (0, 100, 0), 
-                  (int(player_x * mini_size), int(player_y * mini_size)), 
+                  (int((player_x - view_x) * mini_size), int((player_y - view_y) * mini_size)), 
                   player_radius + 2)
     # Hauptkreis (Spieler)
     pg.draw.circle(screen, (0, 255, 0), 
-                  (int(player_x * mini_size), int(player_y * mini_size)), 
+                  (int((player_x - view_x) * mini_size), int((player_y - view_y) * mini_size)), 
                   player_radius)
     
     # Blickrichtung als Dreieck (intuitiver als Linie)
@@ -1486,25 +4190,26 @@ def draw_minimap(screen):
     
     # Zeichne gefülltes Dreieck für die Richtung
     pg.draw.polygon(screen, (0, 255, 0), [
-        (int(player_x * mini_size), int(player_y * mini_size)),
-        (int(x1 * mini_size), int(y1 * mini_size)),
-        (int(end_x * mini_size), int(end_y * mini_size)),
-        (int(x2 * mini_size), int(y2 * mini_size))
+        (int((player_x - view_x) * mini_size), int((player_y - view_y) * mini_size)),
+        (int((x1 - view_x) * mini_size), int((y1 - view_y) * mini_size)),
+        (int((end_x - view_x) * mini_size), int((end_y - view_y) * mini_size)),
+        (int((x2 - view_x) * mini_size), int((y2 - view_y) * mini_size))
     ])
+    screen.set_clip(None)
 
 
-def handle_movement(keys):
-    """Spielerbewegung und Kollisionserkennung"""
+def handle_movement(keys, elapsed=1.0):
+    """Spielerbewegung und Kollisionserkennung (für `elapsed` Referenz-Ticks)"""
     global player_x, player_y, player_angle
     
     # Bewegungsfaktor - noch etwas langsamer für bessere Kontrolle
-    move_speed = 0.03
+    move_speed = 0.03 * elapsed
     
     # Drehen
     if keys[pg.K_LEFT]:
-        player_angle -= ROT_SPEED
+        player_angle -= ROT_SPEED * elapsed
     if keys[pg.K_RIGHT]:
-        player_angle += ROT_SPEED
+        player_angle += ROT_SPEED * elapsed
     
     # Bewegungsrichtung
     dx = 0
@@ -1541,30 +4246,32 @@ def handle_movement(keys):
         
         # Separate Kollisionsprüfung für X und Y
         # Dies erlaubt das Gleiten an Wänden entlang
-        if game_map[int(next_y)][int(player_x)] == 0:
+        if not game_map.is_wall(player_x, next_y):
             player_y = next_y
         
-        if game_map[int(player_y)][int(next_x)] == 0:
+        if not game_map.is_wall(next_x, player_y):
             player_x = next_x
             
         # Überprüfen auf Kollision mit Gegnern und zurückstoßen
-        for enemy in enemies:
-            if enemy.active:
-                enemy_dist = math.sqrt((enemy.x - player_x)**2 + (enemy.y - player_y)**2)
-                if enemy_dist < 0.7:  # Kollisionsabstand mit Gegner
-                    # Berechne Richtungsvektor vom Gegner weg
-                    push_dx = player_x - enemy.x
-                    push_dy = player_y - enemy.y
+        # (nur Gegner in der Nähe über das Gitter, Reihenfolge wie in der Gegnerliste)
+        for slot in enemy_store.neighbors(player_x, player_y, 0.7).tolist():
+            enemy_x = enemy_store.x[slot]
+            enemy_y = enemy_store.y[slot]
+            enemy_dist = math.sqrt((enemy_x - player_x)**2 + (enemy_y - player_y)**2)
+            if enemy_dist < 0.7:  # Kollisionsabstand mit Gegner
+                # Berechne Richtungsvektor vom Gegner weg
+                push_dx = player_x - enemy_x
+                push_dy = player_y - enemy_y
+                
+                # Normalisieren
+                push_length = math.sqrt(push_dx*push_dx + push_dy*push_dy)
+                if push_length > 0:
+                    push_dx /= push_length
+                    push_dy /= push_length
                     
-                    # Normalisieren
-                    push_length = math.sqrt(push_dx*push_dx + push_dy*push_dy)
-                    if push_length > 0:
-                        push_dx /= push_length
-                        push_dy /= push_length
-                        
-                        # Spieler leicht wegschieben
-                        player_x += push_dx * 0.05
-                        player_y += push_dy * 0.05
+                    # Spieler leicht wegschieben
+                    player_x += push_dx * 0.05
+                    player_y += push_dy * 0.05
 
 
 def add_random_walls():
@@ -1588,7 +4295,7 @@ def add_random_walls():
         dist_to_player = math.sqrt((x - player_x)**2 + (y - player_y)**2)
         
         if dist_to_player > safe_radius:
-            game_map[y][x] = 1
+            game_map.set_cell(x, y, 1)
             wall_count += 1
         
         attempts += 1
@@ -1600,7 +4307,7 @@ def add_random_walls():
         for x in range(MAP_SIZE):
             if x == int(player_x) and y == int(player_y):
                 row += "P "  # Spieler
-            elif game_map[y][x] == 1:
+            elif game_map.cell(x, y) == 1:
                 row += "# "  # Wand
             else:
                 row += ". "  # Leerer Platz
@@ -1609,15 +4316,22 @@ def add_random_walls():
 def spawn_enemies(num_enemies=5):
     """Fügt Gegner an strategischen Positionen hinzu, gut verteilt über die Karte"""
     
+    # Suchbereich um den Spieler (auf kleinen Karten die ganze Karte ohne Rand),
+    # mit einer Zelle Rand für die Nachbarprüfung
+    row_lo = max(1, int(player_y) - SPAWN_SEARCH_RADIUS)
+    row_hi = min(MAP_SIZE - 1, int(player_y) + SPAWN_SEARCH_RADIUS + 1)
+    col_lo = max(1, int(player_x) - SPAWN_SEARCH_RADIUS)
+    col_hi = min(MAP_SIZE - 1, int(player_x) + SPAWN_SEARCH_RADIUS + 1)
+    area = game_map.window(row_lo - 1, row_hi + 1, col_lo - 1, col_hi + 1)
+    free_cells = [(x + col_lo, y + row_lo) for y, x in np.argwhere(area[1:-1, 1:-1] == 0).tolist()]
+
     # Potenzielle Positionen vorberechnen
     valid_positions = []
-    for y in range(1, MAP_SIZE-1):
-        for x in range(1, MAP_SIZE-1):
-            if game_map[y][x] == 0:  # Freier Platz
-                dist_to_player = math.sqrt((x - player_x)**2 + (y - player_y)**2)
-                # Mindestabstand zum Spieler (5-6 Einheiten) für faireres Spiel
-                if dist_to_player > 5:
-                    valid_positions.append((x + 0.5, y + 0.5))  # Mitte der Zelle
+    for x, y in free_cells:  # Freier Platz
+        dist_to_player = math.sqrt((x - player_x)**2 + (y - player_y)**2)
+        # Mindestabstand zum Spieler (5-6 Einheiten) für faireres Spiel
+        if dist_to_player > 5:
+            valid_positions.append((x + 0.5, y + 0.5))  # Mitte der Zelle
     
     # Gegner spawnen
     spawned = 0
@@ -1635,7 +4349,7 @@ def spawn_enemies(num_enemies=5):
         far_enemies = min(num_enemies // 2 + 1, len(valid_positions))
         for i in range(far_enemies):
             x, y = valid_positions[i]
-            enemies.append(Enemy(x, y))
+            Enemy(x, y)
             spawned += 1
         
         # Übrige Gegner gut über die Karte verteilen
@@ -1653,13 +4367,13 @@ def spawn_enemies(num_enemies=5):
                 # Prüfe, ob der Abstand zu bereits gespawnten Gegnern groß genug ist
                 # (für bessere Verteilung)
                 too_close = False
-                for enemy in enemies:
+                for enemy in enemy_store.live_enemies:
                     if math.sqrt((x - enemy.x)**2 + (y - enemy.y)**2) < 3.0:
                         too_close = True
                         break
                 
                 if not too_close:
-                    enemies.append(Enemy(x, y))
+                    Enemy(x, y)
                     spawned += 1
     
     # Wenn nicht genug Gegner gespawnt wurden, feste Positionen versuchen
@@ -1680,20 +4394,19 @@ def spawn_enemies(num_enemies=5):
         
         # Zufällige Positionen in der Nähe von Wänden (guter Deckungsbereich)
         wall_adjacency = []
-        for y in range(1, MAP_SIZE-1):
-            for x in range(1, MAP_SIZE-1):
-                if game_map[y][x] == 0:  # Freier Platz
-                    # Prüfe, ob Position neben einer Wand ist
-                    has_wall_neighbor = False
-                    for ny, nx in [(y-1,x), (y+1,x), (y,x-1), (y,x+1)]:
-                        if 0 <= ny < MAP_SIZE and 0 <= nx < MAP_SIZE and game_map[ny][nx] == 1:
-                            has_wall_neighbor = True
-                            break
-                    
-                    if has_wall_neighbor:
-                        dist_to_player = math.sqrt((x - player_x)**2 + (y - player_y)**2)
-                        if dist_to_player > 4:
-                            wall_adjacency.append((x + 0.5, y + 0.5))
+        for x, y in free_cells:  # Freier Platz
+            # Prüfe, ob Position neben einer Wand ist
+            ay, ax = y - row_lo + 1, x - col_lo + 1
+            has_wall_neighbor = False
+            for ny, nx in [(ay-1,ax), (ay+1,ax), (ay,ax-1), (ay,ax+1)]:
+                if area[ny, nx] == 1:
+                    has_wall_neighbor = True
+                    break
+            
+            if has_wall_neighbor:
+                dist_to_player = math.sqrt((x - player_x)**2 + (y - player_y)**2)
+                if dist_to_player > 4:
+                    wall_adjacency.append((x + 0.5, y + 0.5))
         
         # Mische die wandnahen Positionen und füge sie zu den Testpositionen hinzu
         random.shuffle(wall_adjacency)
@@ -1701,22 +4414,22 @@ def spawn_enemies(num_enemies=5):
         
         # Versuche jede Position
         for x, y in test_positions:
-            if game_map[int(y)][int(x)] == 0:
+            if not game_map.is_wall(x, y):
                 # Prüfe Abstand zu vorhandenen Gegnern
                 too_close = False
-                for enemy in enemies:
+                for enemy in enemy_store.live_enemies:
                     if math.sqrt((x - enemy.x)**2 + (y - enemy.y)**2) < 2.0:
                         too_close = True
                         break
                 
                 if not too_close:
-                    enemies.append(Enemy(x, y))
+                    Enemy(x, y)
                     spawned += 1
                     if spawned >= num_enemies:
                         break
     
     # Teile dem Benutzer mit, wo Gegner spawnen und in welchem Startzustand
-    for enemy in enemies:
+    for enemy in enemy_store.live_enemies:
         dist = math.sqrt((enemy.x-player_x)**2 + (enemy.y-player_y)**2)
         print(f"Gegner '{enemy.name}' erscheint bei ({enemy.x:.1f}, {enemy.y:.1f}), "
               f"Abstand zum Spieler: {dist:.1f}, Zustand: {enemy.movement_state}")
@@ -1725,28 +4438,26 @@ def spawn_enemies(num_enemies=5):
 
 def fire_weapon():
     """Feuert eine Kugel in Blickrichtung des Spielers"""
-    global player_ammo, bullets
+    global player_ammo
     if player_ammo <= 0:
         return
     
     # Reduziere Munition
     player_ammo -= 1
     
-    # Erstelle neuen Schuss
-    new_bullet = Bullet(player_x, player_y, player_angle)
-    bullets.append(new_bullet)
+    # Neuen Schuss im Pool anlegen
+    bullet_pool.spawn(player_x, player_y, player_angle)
     
     # Debug-Ausgabe für Schüsse - immer anzeigen
     print(f"Schuss abgefeuert! Position: ({player_x:.1f}, {player_y:.1f}), Winkel: {player_angle:.2f}")
     print(f"Verbleibende Munition: {player_ammo}")
     
     # Prüfen, ob Gegner in der Nähe sind
+    # Gegner in 5 Einheiten Umkreis (über das Gitter statt über alle Gegner)
     nearby_enemies = []
-    for enemy in enemies:
-        if enemy.active:
-            dist = math.sqrt((enemy.x - player_x)**2 + (enemy.y - player_y)**2)
-            if dist < 5.0:  # Gegner in 5 Einheiten Umkreis
-                nearby_enemies.append((enemy, dist))
+    for slot in enemy_store.neighbors(player_x, player_y, 5.0).tolist():
+        enemy = enemy_store.live_enemies[enemy_store.dense_index[slot]]
+        nearby_enemies.append((enemy, math.hypot(enemy.x - player_x, enemy.y - player_y)))
     
     # Zeige die nächsten Gegner an
     if nearby_enemies:
@@ -1759,17 +4470,47 @@ def fire_weapon():
     if shoot_sound:
         shoot_sound.play()
 
-def update_bullets():
-    """Aktualisiert alle aktiven Projektile"""
-    # Liste mit allen aktiven Kugeln beibehalten
-    global bullets
-    # Kopiere die Liste und entferne inaktive Kugeln
-    bullets = [bullet for bullet in bullets if bullet.active and bullet.update()]
+def update_bullets(elapsed=1.0):
+    """Aktualisiert alle aktiven Projektile in einem vektorisierten Durchlauf"""
+    bullet_pool.update(elapsed)
+
+def store_previous_state():
+    """Merkt sich die Spielerposition vor einem Simulationsschritt"""
+    global prev_player_x, prev_player_y, prev_player_angle
+    prev_player_x, prev_player_y, prev_player_angle = player_x, player_y, player_angle
+    # (Gegner und Kugeln merken sich ihre vorherige Position selbst in EnemyStore.update
+    # bzw. BulletPool.update, Gegner über die Dauer ihres eigenen Updates)
+
+@contextmanager
+def interpolated_state(alpha):
+    """
+    Setzt für die Dauer des Renderns den zwischen vorherigem und aktuellem Tick
+    überblendeten Zustand ein (alpha = Bruchteil des laufenden Ticks) und stellt
+    danach den Simulationszustand wieder her.
+    """
+    global player_x, player_y, player_angle
+    saved_player = (player_x, player_y, player_angle)
+    saved_enemies = (enemy_store.x, enemy_store.y)
+    saved_bullets = (bullet_pool.x, bullet_pool.y)
+
+    player_x = prev_player_x + (player_x - prev_player_x) * alpha
+    player_y = prev_player_y + (player_y - prev_player_y) * alpha
+    player_angle = prev_player_angle + (player_angle - prev_player_angle) * alpha
+    enemy_store.x, enemy_store.y = enemy_store.interpolated_positions(
+        alpha, SIM_REFERENCE_RATE / SIM_TICK_RATE)
+    bullet_pool.x, bullet_pool.y = bullet_pool.interpolated_positions(alpha)
+    try:
+        yield
+    finally:
+        player_x, player_y, player_angle = saved_player
+        enemy_store.x, enemy_store.y = saved_enemies
+        bullet_pool.x, bullet_pool.y = saved_bullets
 
-def update_enemies():
-    """Aktualisiert alle Gegner"""
-    for enemy in enemies:
-        enemy.update()
+def update_enemies(elapsed=1.0):
+    """Aktualisiert die fälligen Gegner (Detailstufen und Zeitbudget siehe AIScheduler)"""
+    global player_health
+    path_service.begin_tick()
+    player_health -= ai_scheduler.update(enemy_store, player_x, player_y, elapsed)
 
 def draw_help_overlay(screen, font):
     """Zeichnet ein Hilfe-Overlay während des Spiels"""
@@ -1930,8 +4671,234 @@ def test_projection_algorithm():
     
     print("=========================\n")
 
-def main():
+def build_level_pvs(path, workers):
+    """
+    Berechnet das PVS einer Kartendatei mit `workers` Prozessen und legt es
+    als DATEI.pvs daneben ab (Aufruf: python main.py --build-pvs DATEI [PROZESSE]).
+    """
+    load_level(path)
+    start_time = time.perf_counter()
+    pvs = PotentiallyVisibleSet.build(workers=workers, path=path + ".pvs")
+    elapsed = time.perf_counter() - start_time
+
+    block = 1 << 20  # Offsets blockweise lesen, die Tabelle kann größer als der Speicher sein
+    free_cells = sum(int(np.count_nonzero(np.diff(pvs.offsets[i:i + block + 1].astype(np.int64))))
+                     for i in range(0, pvs.offsets.size - 1, block))
+    size = int(pvs.offsets[-1])
+    print(f"PVS für {path}: {free_cells} freie Zellen in {elapsed:.1f}s mit {workers} Prozessen "
+          f"({elapsed * 1e3 / max(free_cells, 1):.1f} ms pro Zelle), {size / 1e6:.1f} MB komprimiert "
+          f"({size / max(free_cells, 1):.1f} Byte pro Zelle statt {(pvs.side ** 2 + 7) // 8})")
+
+
+def benchmark_strip_renderer(worker_counts=(1, 2, 4, 8), column_counts=(800, 1920, 3840), frames=60):
+    """
+    Vergleicht das Streifen-Rendering mit 1, 2, 4 und 8 Prozessen bei
+    verschiedenen Spaltenanzahlen (Aufruf: python main.py --benchmark-strips).
+    Gemessen wird nur das Raycasting inklusive Spannenberechnung, ohne Anzeige.
+    """
+    global player_x, player_y
+
+    # Karte wie beim Spielstart aufbauen
+    game_map.reset(MAP_SIZE)
+    player_x, player_y = MAP_SIZE // 2 + 0.5, MAP_SIZE // 2 + 0.5
+    add_random_walls()
+
+    print("\n==== BENCHMARK STREIFEN-RENDERING ====")
+    print(f"Karte: {MAP_SIZE}x{MAP_SIZE}, {frames} Frames pro Messung, "
+          f"{multiprocessing.cpu_count()} CPU-Kerne")
+    print(f"{'Spalten':>8} {'Modus':>14} {'ms/Frame':>10} {'Speedup':>8}")
+
+    bench_camera = Camera()
+    for num_columns in column_counts:
+        bench_camera.configure(FOV, num_columns)
+
+        # Referenz: Einzelprozess mit dem Batch-Raycaster
+        start_time = time.perf_counter()
+        for frame in range(frames):
+            view_angle = frame * 0.01
+            distances, sides = cast_rays_batch(player_x, player_y, None,
+                                               directions=bench_camera.ray_directions(view_angle))
+            wall_spans(distances, bench_camera.fisheye_correction, HEIGHT)
+        baseline = (time.perf_counter() - start_time) / frames * 1000
+        print(f"{num_columns:>8} {'im Prozess':>14} {baseline:>10.2f} {1.0:>8.2f}")
+
+        for num_workers in worker_counts:
+            renderer = StripRenderer(num_workers, num_columns)
+            try:
+                renderer.render(player_x, player_y, 0.0, bench_camera, HEIGHT)  # Aufwärmen
+                start_time = time.perf_counter()
+                for frame in range(frames):
+                    renderer.render(player_x, player_y, frame * 0.01, bench_camera, HEIGHT)
+                elapsed = (time.perf_counter() - start_time) / frames * 1000
+            finally:
+                renderer.close()
+            print(f"{num_columns:>8} {f'{num_workers} Worker':>14} {elapsed:>10.2f} {baseline / elapsed:>8.2f}")
+
+    print("=====================================\n")
+
+
+def benchmark_maps(size, rng):
+    """
+    Testkarten für die Raycasting-Benchmarks: eine offene Halle mit vereinzelten
+    Säulen und ein Labyrinth mit 3 Zellen breiten Gängen, jeweils mit Außenwänden.
+    Rückgabe: ((Name, Zellen), ...) und ein in beiden Karten freier Startpunkt.
+    """
+    # Offene Halle mit vereinzelten Säulen
+    open_cells = (rng.random((size, size)) < 0.002).astype(np.uint8)
+
+    # Labyrinth aus 3 Zellen breiten Gängen (Tiefensuche über ein Raster von Räumen)
+    maze_cells = np.ones((size, size), dtype=np.uint8)
+    rooms = (size - 1) // 4
+    visited = np.zeros((rooms, rooms), dtype=bool)
+    stack = [(0, 0)]
+    visited[0, 0] = True
+    maze_cells[1:4, 1:4] = 0
+    while stack:
+        row, col = stack[-1]
+        options = [(row + dr, col + dc) for dr, dc in ((-1, 0), (1, 0), (0, -1), (0, 1))
+                   if 0 <= row + dr < rooms and 0 <= col + dc < rooms and not visited[row + dr, col + dc]]
+        if not options:
+            stack.pop()
+            continue
+        next_row, next_col = options[rng.integers(len(options))]
+        visited[next_row, next_col] = True
+        maze_cells[4*next_row+1:4*next_row+4, 4*next_col+1:4*next_col+4] = 0
+        # Durchbruch zwischen den beiden Räumen
+        maze_cells[4*min(row, next_row)+1:4*max(row, next_row)+4,
+                   4*min(col, next_col)+1:4*max(col, next_col)+4] = 0
+        stack.append((next_row, next_col))
+
+    center = 4 * (rooms // 2) + 2.5  # Mitte eines Labyrinthraums, in der Halle frei
+    open_cells[int(center)-2:int(center)+3, int(center)-2:int(center)+3] = 0
+    for cells in (open_cells, maze_cells):
+        cells[[0, -1], :] = 1  # Außenwände
+        cells[:, [0, -1]] = 1
+    return (("offen", open_cells), ("Labyrinth", maze_cells)), center
+
+
+def benchmark_empty_space_skipping(size=512, frames=30, scalar_frames=3):
+    """
+    Vergleicht das Raycasting mit und ohne Distanzfeld auf einer offenen
+    Karte und einem Labyrinth (Aufruf: python main.py --benchmark-skipping).
+    Gemessen werden Batch- und Einzelstrahl-Raycaster über eine volle Drehung.
+    """
+    global game_map, MAP_SIZE, player_x, player_y, RAY_SKIP_EMPTY
+    rng = np.random.default_rng(7)
+    maps, center = benchmark_maps(size, rng)
+
+    print("\n==== BENCHMARK LEERE BEREICHE ÜBERSPRINGEN ====")
+    print(f"Karten: {size}x{size}, {NUM_RAYS} Strahlen, Batch {frames} Frames, "
+          f"Einzelstrahlen {scalar_frames} Frames, Distanz gekappt bei {DISTANCE_FIELD_MAX}")
+    print(f"{'Karte':>10} {'Raycaster':>10} {'ohne ms':>9} {'mit ms':>9} {'Speedup':>8} {'Abweichungen':>13}")
+
+    bench_camera = Camera()
+    bench_camera.configure(FOV, NUM_RAYS)
+    for name, cells in maps:
+        game_map = GameMap(size, cells)
+        MAP_SIZE = size
+        player_x = player_y = center
+
+        # Aufbau des kompletten Felds (sonst beim ersten Strahl)
+        start_time = time.perf_counter()
+        distance_field.sync()
+        distance_field.chunk(0, 0)
+        build_ms = (time.perf_counter() - start_time) * 1000
+        print(f"{name:>10} {'Feldaufbau':>10} {'':>9} {build_ms:>9.1f}")
+
+        # Einzelne Zellen umschalten und wieder zurücksetzen (inkrementelle Aktualisierung)
+        toggles = rng.integers(1, size - 1, size=(50, 2))
+        start_time = time.perf_counter()
+        for col, row in toggles:
+            value = game_map.cell(col, row)
+            game_map.set_cell(col, row, 1 - value)
+            distance_field.sync()
+            game_map.set_cell(col, row, value)
+            distance_field.sync()
+        update_ms = (time.perf_counter() - start_time) / (2 * len(toggles)) * 1000
+        print(f"{name:>10} {'Änderung':>10} {'':>9} {update_ms:>9.2f}")
+
+        views = [frame * 2 * math.pi / frames for frame in range(frames)]
+        results = {}
+        for RAY_SKIP_EMPTY in (False, True):
+            start_time = time.perf_counter()
+            batch = [cast_rays_batch(player_x, player_y, None,
+                                     directions=bench_camera.ray_directions(view)) for view in views]
+            batch_ms = (time.perf_counter() - start_time) / frames * 1000
+
+            start_time = time.perf_counter()
+            scalar = [[trace_ray(angle)[0] for angle in bench_camera.ray_angles(view)]
+                      for view in views[:scalar_frames]]
+            scalar_ms = (time.perf_counter() - start_time) / scalar_frames * 1000
+            results[RAY_SKIP_EMPTY] = (batch, scalar, batch_ms, scalar_ms)
+
+        (plain_batch, plain_scalar, plain_batch_ms, plain_scalar_ms) = results[False]
+        (skip_batch, skip_scalar, skip_batch_ms, skip_scalar_ms) = results[True]
+        batch_diff = sum(int(np.count_nonzero(np.abs(a[0] - b[0]) > 1e-9))
+                         for a, b in zip(plain_batch, skip_batch))
+        scalar_diff = int(np.count_nonzero(np.abs(np.array(plain_scalar) - np.array(skip_scalar)) > 1e-9))
+        print(f"{name:>10} {'Batch':>10} {plain_batch_ms:>9.2f} {skip_batch_ms:>9.2f} "
+              f"{plain_batch_ms / skip_batch_ms:>8.2f} {batch_diff:>13}")
+        print(f"{name:>10} {'Einzeln':>10} {plain_scalar_ms:>9.2f} {skip_scalar_ms:>9.2f} "
+              f"{plain_scalar_ms / skip_scalar_ms:>8.2f} {scalar_diff:>13}")
+
+    print("=============================================\n")
+
+
+def benchmark_wall_segments(sizes=(512, 2048), frames=30):
+    """
+    Vergleicht das Raster-DDA (cast_rays_batch) mit dem Segment-Renderer
+    (cast_rays_segments) auf offenen Hallen und Labyrinthen verschiedener
+    Größe über eine volle Drehung (Aufruf: python main.py --benchmark-segments).
+    """
+    global game_map, MAP_SIZE, player_x, player_y
+    rng = np.random.default_rng(7)
+
+    print("\n==== BENCHMARK SEGMENT-RENDERER ====")
+    print(f"{NUM_RAYS} Strahlen, {frames} Frames, Kacheln {WALL_SEGMENT_TILE}x{WALL_SEGMENT_TILE}, "
+          f"Überspringen leerer Bereiche {'an' if RAY_SKIP_EMPTY else 'aus'}")
+    print(f"{'Karte':>16} {'Segmente':>9} {'Aufbau ms':>10} {'DDA ms':>9} {'Segm. ms':>9} "
+          f"{'Speedup':>8} {'Abweichungen':>13}")
+
+    bench_camera = Camera()
+    bench_camera.configure(FOV, NUM_RAYS)
+    views = [frame * 2 * math.pi / frames for frame in range(frames)]
+    for size in sizes:
+        maps, center = benchmark_maps(size, rng)
+        for name, cells in maps:
+            game_map = GameMap(size, cells)
+            MAP_SIZE = size
+            player_x = player_y = center
+
+            # Erste volle Drehung: extrahiert alle Kacheln in Reichweite
+            start_time = time.perf_counter()
+            for view in views:
+                cast_rays_segments(player_x, player_y, None, directions=bench_camera.ray_directions(view))
+            build_ms = (time.perf_counter() - start_time) * 1000
+            segment_count = sum(len(tile) for tile in wall_segments.cache.values())
+
+            start_time = time.perf_counter()
+            grid = [cast_rays_batch(player_x, player_y, None, directions=bench_camera.ray_directions(view))
+                    for view in views]
+            grid_ms = (time.perf_counter() - start_time) / frames * 1000
+
+            start_time = time.perf_counter()
+            segments = [cast_rays_segments(player_x, player_y, None, directions=bench_camera.ray_directions(view))
+                        for view in views]
+            segment_ms = (time.perf_counter() - start_time) / frames * 1000
+
+            # Seiten zählen nur bei Treffern (bei DEPTH nach MAX_RAY_STEPS dürfen sie abweichen)
+            mismatches = sum(int(np.count_nonzero((a[0] != b[0]) | ((a[1] != b[1]) & (a[0] < DEPTH))))
+                             for a, b in zip(grid, segments))
+            label = f"{name} {size}"
+            print(f"{label:>16} {segment_count:>9} {build_ms:>10.1f} {grid_ms:>9.2f} {segment_ms:>9.2f} "
+                  f"{grid_ms / segment_ms:>8.2f} {mismatches:>13}")
+
+    print("====================================\n")
+
+
+def main(level=None):
     global player_angle, player_x, player_y, player_health, player_ammo, player_score, shoot_sound, shooting_cooldown
+    global strip_renderer, prev_player_angle, potentially_visible_set
     
     # Neue Variable für Hilfe-Overlay
     show_help_overlay = False
@@ -1959,27 +4926,29 @@ def main():
         pass  # Sound ist optional
     
     # Alles zurücksetzen
-    global enemies, bullets
-    enemies = []
-    bullets = []
+    bullet_pool.clear()
+    enemy_store.clear()
     player_health = 100
     player_ammo = 50
     player_score = 0
     shooting_cooldown = 0
     
-    # Karte zurücksetzen (sicherstellen, dass genug freier Platz ist)
-    global game_map
-    game_map = np.zeros((MAP_SIZE, MAP_SIZE), dtype=int)
-    game_map[0, :] = 1  # Obere Wand
-    game_map[:, 0] = 1  # Linke Wand
-    game_map[MAP_SIZE-1, :] = 1  # Untere Wand
-    game_map[:, MAP_SIZE-1] = 1  # Rechte Wand
-    
-    # Spieler weit weg von den Wänden positionieren
-    player_x, player_y = MAP_SIZE // 2, MAP_SIZE // 2
-    
-    # Nur wenige Wände für bessere Navigation und Übersichtlichkeit
-    add_random_walls()
+    if level is None:
+        # Karte zurücksetzen (sicherstellen, dass genug freier Platz ist)
+        game_map.reset(MAP_SIZE)
+        
+        # Spieler weit weg von den Wänden positionieren
+        player_x, player_y = MAP_SIZE // 2, MAP_SIZE // 2
+        
+        # Nur wenige Wände für bessere Navigation und Übersichtlichkeit
+        add_random_walls()
+
+        # Sichtbarkeit aller Zellen vorberechnen (die kleine Karte ändert sich danach nicht mehr)
+        potentially_visible_set = PotentiallyVisibleSet.build(workers=PVS_BUILD_WORKERS)
+    else:
+        # Große Karte aus einer Kacheldatei, Start in der (freien) Kartenmitte
+        load_level(level)
+        player_x, player_y = MAP_SIZE // 2 + 0.5, MAP_SIZE // 2 + 0.5
     
     # Verbesserten Startbildschirm anzeigen
     show_start_screen = True
@@ -2160,10 +5129,18 @@ def main():
     shooting_cooldown = 0
     game_over = False
     
+    # Fester Simulationstakt: der Akkumulator sammelt die echte Frame-Zeit,
+    # pro vollem Tick wird die Simulation genau einmal weitergeschaltet
+    tick_seconds = 1.0 / SIM_TICK_RATE
+    tick_elapsed = SIM_REFERENCE_RATE / SIM_TICK_RATE  # Dauer eines Ticks in Referenz-Ticks
+    accumulator = 0.0
+    store_previous_state()
+
     # Spielschleife
     while running:
-        # Delta-Zeit für gleichmäßige Bewegung
-        dt = clock.tick(60) / 1000.0
+        # Frame-Zeit (Rendering durch MAX_FRAME_RATE begrenzt bzw. bei 0 ungebremst)
+        frame_seconds = clock.tick(MAX_FRAME_RATE) / 1000.0
+        accumulator += min(frame_seconds, MAX_SIM_STEPS_PER_FRAME * tick_seconds)
         
         for event in pg.event.get():
             if event.type == pg.QUIT:
@@ -2181,6 +5158,8 @@ def main():
             elif event.type == pg.MOUSEMOTION:
                 mouse_rel = pg.mouse.get_rel()
                 player_angle += mouse_rel[0] * 0.004
+                # Mausdrehung sofort zeigen, nicht über den Tick überblenden
+                prev_player_angle += mouse_rel[0] * 0.004
             # Schießen mit Mausklick
             elif event.type == pg.MOUSEBUTTONDOWN and event.button == 1 and shooting_cooldown <= 0:
                 fire_weapon()
@@ -2194,35 +5173,46 @@ def main():
         # Spieler-Input verarbeiten
         keys = pg.key.get_pressed()
         
-        # Game Over Check
-        if player_health <= 0:
-            game_over = True
-        
-        if not game_over:
-            handle_movement(keys)
+        # SIMULATION im festen Takt, unabhängig von der Bildrate
+        while accumulator >= tick_seconds:
+            accumulator -= tick_seconds
+
+            # Game Over Check
+            if player_health <= 0:
+                game_over = True
+            if game_over:
+                continue
+
+            store_previous_state()
+            handle_movement(keys, tick_elapsed)
             
             # Projektile aktualisieren
-            update_bullets()
+            update_bullets(tick_elapsed)
             
             # Gegner aktualisieren
-            update_enemies()
+            update_enemies(tick_elapsed)
             
             # Schuss-Cooldown
             if shooting_cooldown > 0:
-                shooting_cooldown -= 1
+                shooting_cooldown = max(0, shooting_cooldown - tick_elapsed)
                 
             # Nachspawnen von Gegnern, wenn alle tot sind
-            if not enemy_spawn_scheduled and all(not enemy.active for enemy in enemies):
+            if not enemy_spawn_scheduled and enemy_store.live_count == 0:
                 spawn_enemies(min(3 + player_score // 300, 8))  # Schwierigkeit steigt mit Punktzahl
+
+        if player_health <= 0:
+            game_over = True
         
         # Bildschirm löschen
         screen.fill(BLACK)
         
-        # 3D-Umgebung zeichnen
-        draw_3d_view(screen)
-        
-        # Minimap zeichnen
-        draw_minimap(screen)
+        # Welt im zwischen zwei Ticks überblendeten Zustand zeichnen
+        with interpolated_state(accumulator / tick_seconds):
+            # 3D-Umgebung zeichnen
+            draw_3d_view(screen)
+            
+            # Minimap zeichnen
+            draw_minimap(screen)
         
         # HUD zeichnen
         draw_hud(screen, font)
@@ -2255,15 +5245,42 @@ def main():
         elif show_help_overlay:
             draw_help_overlay(screen, font)
         
-        # FPS anzeigen
-        fps_text = font.render(f"FPS: {int(clock.get_fps())}", True, WHITE)
+        # FPS anzeigen (bei dynamischer Auflösung mit interner Auflösung)
+        fps_label = f"FPS: {int(clock.get_fps())}"
+        if DYNAMIC_RESOLUTION:
+            view_w, view_h = dynamic_resolution.view_size()
+            fps_label += f" ({view_w}x{view_h})"
+        fps_text = font.render(fps_label, True, WHITE)
         screen.blit(fps_text, (10, 10))
         
         # Bildschirm aktualisieren
         pg.display.flip()
+
+        # Arbeitszeit des Frames (ohne Wartezeit von clock.tick) für die dynamische Auflösung
+        if DYNAMIC_RESOLUTION:
+            dynamic_resolution.record_frame(clock.get_rawtime())
     
+    # Prozesspool des Streifen-Renderings beenden
+    if strip_renderer is not None:
+        strip_renderer.close()
+        strip_renderer = None
+
     pg.quit()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    multiprocessing.freeze_support()  # Für Worker-Prozesse in gepackten Builds
+    if "--benchmark-strips" in sys.argv:
+        benchmark_strip_renderer()
+    elif "--benchmark-skipping" in sys.argv:
+        benchmark_empty_space_skipping()
+    elif "--benchmark-segments" in sys.argv:
+        benchmark_wall_segments()
+    elif "--build-pvs" in sys.argv:
+        args = sys.argv[sys.argv.index("--build-pvs") + 1:]
+        build_level_pvs(args[0], int(args[1]) if len(args) > 1 else multiprocessing.cpu_count())
+    elif "--make-level" in sys.argv:
+        args = sys.argv[sys.argv.index("--make-level") + 1:]
+        generate_level(args[0], int(args[1]) if len(args) > 1 else 4096)
+    else:
+        main(sys.argv[sys.argv.index("--level") + 1] if "--level" in sys.argv else None)
\ No newline at end of file
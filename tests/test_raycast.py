@@ -0,0 +1,110 @@
+"""
+Alle Raycaster müssen dieselben Treffer liefern wie der skalare DDA-Kern
+trace_ray: der Batch-Raycaster, das adaptive Raycasting, der Segment-Renderer,
+die Kugel-DDA sweep_walls und jeweils mit und ohne RAY_SKIP_EMPTY.
+"""
+import math
+import os
+
+import numpy as np
+import pytest
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import main  # noqa: E402
+
+SEEDS = range(20)
+MAP_SIZE = 48
+NUM_RAYS = 96
+
+
+def random_level(seed):
+    """Zufällige Karte mit Außenwänden und eine freie Startposition darauf"""
+    rng = np.random.default_rng(seed)
+    density = (0.04, 0.15, 0.3)[seed % 3]
+    cells = (rng.random((MAP_SIZE, MAP_SIZE)) < density).astype(np.uint8)
+    cells[[0, -1], :] = 1
+    cells[:, [0, -1]] = 1
+    free_rows, free_cols = np.nonzero(cells == 0)
+    pick = rng.integers(len(free_rows))
+    origin = (free_cols[pick] + rng.random(), free_rows[pick] + rng.random())
+    angles = rng.uniform(0, 2 * math.pi) + np.linspace(0, 2 * math.pi, NUM_RAYS, endpoint=False)
+    return cells, origin, angles
+
+
+@pytest.fixture(params=SEEDS)
+def level(request, monkeypatch):
+    """Setzt Karte und Spielerposition eines Zufallslevels als globalen Zustand"""
+    cells, (x, y), angles = random_level(request.param)
+    monkeypatch.setattr(main, "game_map", main.GameMap(MAP_SIZE, cells))
+    monkeypatch.setattr(main, "MAP_SIZE", MAP_SIZE)
+    monkeypatch.setattr(main, "player_x", x)
+    monkeypatch.setattr(main, "player_y", y)
+    return x, y, angles
+
+
+@pytest.fixture(params=[False, True], ids=["plain", "skip-empty"])
+def skip_empty(request, monkeypatch):
+    monkeypatch.setattr(main, "RAY_SKIP_EMPTY", request.param)
+    return request.param
+
+
+def scalar_rays(angles):
+    """Referenz: trace_ray Strahl für Strahl ohne Überspringen freier Bereiche"""
+    saved = main.RAY_SKIP_EMPTY
+    main.RAY_SKIP_EMPTY = False
+    try:
+        hits = [main.trace_ray(angle) for angle in angles.tolist()]
+    finally:
+        main.RAY_SKIP_EMPTY = saved
+    distances = np.array([hit[0] for hit in hits])
+    sides = np.array([hit[1] for hit in hits])
+    return distances, sides
+
+
+def test_skip_empty_matches_plain_stepping(level, monkeypatch):
+    x, y, angles = level
+    expected = scalar_rays(angles)
+    monkeypatch.setattr(main, "RAY_SKIP_EMPTY", True)
+    hits = [main.trace_ray(angle) for angle in angles.tolist()]
+    np.testing.assert_array_equal([hit[0] for hit in hits], expected[0])
+    np.testing.assert_array_equal([hit[1] for hit in hits], expected[1])
+
+
+def test_batch_matches_trace_ray(level, skip_empty):
+    x, y, angles = level
+    distances, sides = main.cast_rays_batch(x, y, angles)
+    expected = scalar_rays(angles)
+    np.testing.assert_array_equal(distances, expected[0])
+    np.testing.assert_array_equal(sides, expected[1])
+
+
+def test_adaptive_matches_trace_ray(level, skip_empty):
+    x, y, angles = level
+    # Aufsteigend sortierte Winkel wie die Spalten der Ansicht
+    angles = np.sort(angles)
+    distances, sides = main.cast_rays_adaptive(angles)
+    expected = scalar_rays(angles)
+    np.testing.assert_array_equal(distances, expected[0])
+    np.testing.assert_array_equal(sides, expected[1])
+
+
+def test_segments_match_trace_ray(level):
+    x, y, angles = level
+    distances, sides = main.cast_rays_segments(x, y, angles)
+    expected = scalar_rays(angles)
+    np.testing.assert_array_equal(distances, expected[0])
+    np.testing.assert_array_equal(sides, expected[1])
+
+
+def test_sweep_walls_matches_trace_ray(level):
+    x, y, angles = level
+    # Außenwände: jeder Strahl trifft innerhalb der Kartendiagonale
+    max_dist = 2.0 * MAP_SIZE
+    distances, hit = main.sweep_walls(np.full(angles.shape, x), np.full(angles.shape, y),
+                                      np.cos(angles), np.sin(angles), max_dist)
+    expected = scalar_rays(angles)
+    assert hit.all()
+    # Gleiche Wandzelle, der Abstand wird aber über eine andere Formel berechnet
+    np.testing.assert_allclose(distances, expected[0], rtol=1e-12)